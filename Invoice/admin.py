@@ -20,11 +20,31 @@ permission system directly within the Django admin interface.
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, WorkEntry, Price, ClientProject
+from .models import User, WorkEntry, Price, ClientProject, PurgeJob
+from .purge import soft_delete
+
+
+class SoftDeleteAdminMixin:
+    """
+    Deletes through soft_delete(): the object is hidden at once and its
+    dependent rows are purged in the background by purge_deleted.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        # Listing every cascading row would load them all; the confirmation
+        # page names the selected objects only.
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        soft_delete(obj, requested_by=request.user)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            soft_delete(obj, requested_by=request.user)
 
 
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(SoftDeleteAdminMixin, UserAdmin):
     """
     Customizes the UserAdmin to enforce strict role-based permissions.
     - Admins can only add new users.
@@ -112,10 +132,10 @@ class PriceAdmin(admin.ModelAdmin):
         return qs.filter(managed_by=request.user)
 
 @admin.register(ClientProject)
-class ClientProjectAdmin(admin.ModelAdmin):
+class ClientProjectAdmin(SoftDeleteAdminMixin, admin.ModelAdmin):
     """Admin configuration for the ClientProject model."""
-    list_display = ('name', 'start_date', 'managed_by')
-    list_filter = ('managed_by',)
+    list_display = ('name', 'start_date', 'end_date', 'status', 'managed_by')
+    list_filter = ('status', 'managed_by')
     search_fields = ('name',)
 
     def save_model(self, request, obj, form, change):
@@ -136,13 +156,23 @@ class ClientProjectAdmin(admin.ModelAdmin):
 class WorkEntryAdmin(admin.ModelAdmin):
     """Admin configuration for the WorkEntry model."""
     list_display = ('user', 'project', 'category', 'quantity', 'date')
-    list_filter = ('date', 'category', 'project__name')
-    search_fields = ('user__username', 'project__name', 'category')
+    list_filter = ('date', 'price__category', 'project__name')
+    search_fields = ('user__username', 'project__name', 'price__category', 'legacy_category')
+    list_select_related = ('user', 'project', 'price')
     
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        if request.user.is_superuser or request.user.role == 'super_admin':
+        if request.user.is_superuser:
             return qs
-        if request.user.role == 'admin':
-            return qs.filter(project__managed_by=request.user)
-        return qs.filter(user=request.user)
\ No newline at end of file
+        return qs.for_user(request.user)
+
+
+@admin.register(PurgeJob)
+class PurgeJobAdmin(admin.ModelAdmin):
+    """Read-only progress of background deletions."""
+    list_display = ('label', 'status', 'deleted_rows', 'total_rows', 'progress', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = [field.name for field in PurgeJob._meta.fields if field.name != 'status']
+
+    def has_add_permission(self, request):
+        return False
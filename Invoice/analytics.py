@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         analytics.py
+# Purpose:      Shared query builders for the dashboards and analytics APIs.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Dashboard query builders for the Invoice application.
+
+The functions here only build lazy querysets and shape their results, so the
+same analytics can be evaluated by the synchronous views and, with Django's
+async ORM, by the async read endpoints.
+"""
+
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractWeekDay
+from django.utils import timezone
+
+from .models import WorkEntry, work_entry_category
+
+WEEKDAY_NAMES = {
+    1: 'Sunday', 2: 'Monday', 3: 'Tuesday', 4: 'Wednesday',
+    5: 'Thursday', 6: 'Friday', 7: 'Saturday',
+}
+
+
+def filter_work_entries(queryset, project=None, user=None, start_date=None, end_date=None):
+    """
+    Applies the project/user/date-range filters shared by the dashboard page
+    and the dashboard API. Empty values are ignored.
+    """
+    if project:
+        queryset = queryset.filter(project_id=project)
+    if user:
+        queryset = queryset.filter(user_id=user)
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+    return queryset
+
+
+def dashboard_entries_for(user):
+    """Returns the work entries an admin-level user's dashboard covers."""
+    if user.role in ('super_admin', 'admin'):
+        return WorkEntry.objects.for_user(user)
+    return WorkEntry.objects.none()
+
+
+def dashboard_querysets(entries_qs):
+    """Returns the lazy aggregation querysets behind the dashboard cards and charts."""
+    now = timezone.now()
+    return {
+        'current_month_entries': entries_qs.filter(date__year=now.year, date__month=now.month),
+        'busiest_day': (
+            entries_qs.annotate(weekday=ExtractWeekDay('date'))
+            .values('weekday').annotate(count=Count('id')).order_by('-count')
+        ),
+        'most_productive_user': (
+            entries_qs.values('user__username')
+            .annotate(total_quantity=Sum('quantity')).order_by('-total_quantity')
+        ),
+        # Grouped by price id; the name rides along for the chart labels.
+        'category': (
+            entries_qs.values('price', category=work_entry_category())
+            .annotate(count=Count('id')).order_by('-count')
+        ),
+        'monthly': (
+            entries_qs.values('date__year', 'date__month')
+            .annotate(count=Count('id')).order_by('date__year', 'date__month')
+        ),
+    }
+
+
+def summarize_dashboard(current_month_entries, busiest_day, most_productive_user, category, monthly):
+    """
+    Shapes evaluated dashboard querysets (a count, two first() rows and two
+    row lists) into card values and chart series.
+    """
+    return {
+        'current_month_entries': current_month_entries,
+        'busiest_day': WEEKDAY_NAMES.get(busiest_day['weekday'], 'N/A') if busiest_day else 'N/A',
+        'most_productive_user': most_productive_user['user__username'] if most_productive_user else 'N/A',
+        'pie_chart_labels': [item['category'] for item in category],
+        'pie_chart_data': [item['count'] for item in category],
+        'bar_chart_labels': [f"{item['date__year']}-{item['date__month']:02d}" for item in monthly],
+        'bar_chart_data': [item['count'] for item in monthly],
+    }
@@ -19,15 +19,23 @@ All URLs defined here are prefixed with '/api/' by the root URL configuration.
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from . import async_views
 from .views import (
     RegisterView,
     ProfileView,
     WorkEntryListCreateView,
     DashboardView,
     PriceListCreateView,
+    PriceImportView,
+    PriceAdjustView,
     PriceDetailView,
+    TeamImportView,
     ClientProjectListCreateView,
-    ExportWorkEntriesXLSXView
+    ExportWorkEntriesXLSXView,
+    PivotReportView,
+    PivotReportXLSXView,
+    SyncView,
+    BatchView,
 )
 
 urlpatterns = [
@@ -41,8 +49,23 @@ urlpatterns = [
     path('work-entries/', WorkEntryListCreateView.as_view(), name='work_entry_api'),
     path('dashboard/', DashboardView.as_view(), name='dashboard_api'),
     path('prices/', PriceListCreateView.as_view(), name='price_list_create_api'),
+    path('prices/import/', PriceImportView.as_view(), name='price_import_api'),
+    path('prices/adjust/', PriceAdjustView.as_view(), name='price_adjust_api'),
     # Using <int:id> because the Price model uses a default integer primary key.
     path('prices/<int:id>/', PriceDetailView.as_view(), name='price_detail_api'),
     path('projects/', ClientProjectListCreateView.as_view(), name='client_projects_api'),
+    path('team/import/', TeamImportView.as_view(), name='team_import_api'),
     path('export/xlsx/', ExportWorkEntriesXLSXView.as_view(), name='export_xlsx_api'),
+    path('reports/pivot/', PivotReportView.as_view(), name='pivot_report_api'),
+    path('reports/pivot/xlsx/', PivotReportXLSXView.as_view(), name='pivot_report_xlsx_api'),
+    path('sync/', SyncView.as_view(), name='sync_api'),
+
+    # --- Async (ASGI) Read Endpoints ---
+    path('async/dashboard/', async_views.dashboard_view, name='dashboard_async_api'),
+    path('async/dashboard/charts/', async_views.dashboard_charts_view, name='dashboard_charts_async_api'),
+    path('async/dashboard/stream/', async_views.dashboard_stream_view, name='dashboard_stream_async_api'),
+    path('async/work-entries/', async_views.work_entry_list_view, name='work_entry_async_api'),
+
+    # --- Batching ---
+    path('batch/', BatchView.as_view(), name='batch_api'),
 ]
\ No newline at end of file
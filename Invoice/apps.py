@@ -22,4 +22,8 @@ class InvoiceConfig(AppConfig):
     Configuration class for the 'Invoice' application.
     """
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'Invoice'
\ No newline at end of file
+    name = 'Invoice'
+
+    def ready(self):
+        # Registers the model signal receivers and the connection setup.
+        from . import db, signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         archive.py
+# Purpose:      Moves old work entries and finished projects out of hot paths.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Archival of old work entries.
+
+archive_batch() moves entries dated before a horizon from WorkEntry into
+ArchivedWorkEntry, one transaction per batch, and refresh_monthly_totals()
+rebuilds WorkEntryMonthlyTotal for the months that were moved. The dashboard
+and sync queries only look at recent data, so keeping years of old rows out
+of WorkEntry keeps that table and its indexes small.
+
+Archived entries leave sync clients through ordinary tombstones, as a fresh
+snapshot would no longer contain them. Invoices and exports read both tables
+when asked to, through work_entries_for().
+
+archive_finished_projects() marks projects whose end_date has passed as
+archived, which takes them out of the project dropdowns and lists.
+"""
+
+import datetime
+from collections import defaultdict
+from itertools import chain
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .analytics import filter_work_entries
+from .caching import PROJECTS, bump_change_stamp
+from .models import ArchivedWorkEntry, ClientProject, WorkEntry, WorkEntryMonthlyTotal, work_entry_category
+from .sync import UPSERT, record_changes, record_entry_tombstones
+
+DEFAULT_ARCHIVE_MONTHS = 24
+
+ARCHIVE_FIELDS = (
+    'id', 'user_id', 'project_id', 'tenant_id', 'price_id',
+    'legacy_category', 'quantity', 'date', 'updated_at',
+)
+
+
+def check_raw_deletable(model):
+    """
+    Refuses to bulk-delete ``model`` rows with QuerySet._raw_delete(), which
+    skips the delete collector, once another model has a relation to it:
+    those rows would be left dangling instead of cascaded.
+    """
+    related = [f"{rel.related_model._meta.label}.{rel.field.name}" for rel in model._meta.related_objects]
+    if related:
+        raise RuntimeError(
+            f"{model._meta.label} is referenced by {', '.join(related)}; "
+            "handle these before deleting it with _raw_delete().")
+
+
+def archive_horizon(months=None, today=None):
+    """
+    Returns the first day of the month ``months`` (default
+    WORK_ENTRY_ARCHIVE_MONTHS) before the current one; entries dated before
+    it are archived.
+    """
+    if months is None:
+        months = getattr(settings, 'WORK_ENTRY_ARCHIVE_MONTHS', DEFAULT_ARCHIVE_MONTHS)
+    today = today or timezone.localdate()
+    index = today.year * 12 + today.month - 1 - months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def archive_batch(before, batch_size=5000):
+    """
+    Moves up to ``batch_size`` entries dated before ``before`` into the
+    archive. Returns the number moved and the set of months they fell in.
+    """
+    with transaction.atomic():
+        rows = list(
+            WorkEntry.objects.filter(date__lt=before).order_by('id')
+            .values(*ARCHIVE_FIELDS, 'user__managed_by_id')[:batch_size]
+        )
+        if not rows:
+            return 0, set()
+
+        ArchivedWorkEntry.objects.bulk_create(
+            [ArchivedWorkEntry(**{field: row[field] for field in ARCHIVE_FIELDS}) for row in rows],
+            ignore_conflicts=True,
+        )
+
+        # The rows were moved, not deleted: skip the per-row delete signals,
+        # record the tombstones in bulk and delete in one statement.
+        # _raw_delete() bypasses the delete collector, which is only safe
+        # while no model has a ForeignKey to WorkEntry; add one and this
+        # must handle it first.
+        check_raw_deletable(WorkEntry)
+        record_entry_tombstones(rows)
+        moved = WorkEntry.objects.filter(id__in=[row['id'] for row in rows])
+        moved._raw_delete(moved.db)
+
+    return len(rows), {row['date'].replace(day=1) for row in rows}
+
+
+@transaction.atomic
+def refresh_monthly_totals(months):
+    """Rebuilds WorkEntryMonthlyTotal for the given months from the archive."""
+    months = sorted(months)
+    if not months:
+        return 0
+    WorkEntryMonthlyTotal.objects.filter(month__in=months).delete()
+    totals = (
+        ArchivedWorkEntry.objects
+        .annotate(month=TruncMonth('date'))
+        .filter(month__in=months)
+        .values('month', 'tenant', 'user', 'project', 'price', category=work_entry_category())
+        .annotate(quantity_total=Sum('quantity'), entry_count=Count('id'))
+        .order_by()
+    )
+    created = WorkEntryMonthlyTotal.objects.bulk_create(
+        [
+            WorkEntryMonthlyTotal(
+                month=row['month'], tenant_id=row['tenant'], user_id=row['user'],
+                project_id=row['project'], price_id=row['price'], category=row['category'] or '',
+                quantity=row['quantity_total'], entry_count=row['entry_count'],
+            )
+            for row in totals
+        ],
+        batch_size=1000,
+    )
+    return len(created)
+
+
+def work_entries_for(user, filters=None, include_archived=False, select_related=('price',)):
+    """
+    Returns the entries ``user`` may see matching the dashboard-style
+    ``filters``, ordered by date. With ``include_archived``, archived entries
+    come first (they are all older) and the result is a list.
+    """
+    filters = filters or {}
+    live = filter_work_entries(WorkEntry.objects.for_user(user), **filters)
+    live = live.select_related(*select_related).order_by('date', 'id')
+    if not include_archived:
+        return live
+    archived = filter_work_entries(ArchivedWorkEntry.objects.for_user(user), **filters)
+    archived = archived.select_related(*select_related).order_by('date', 'id')
+    return list(chain(archived, live))
+
+
+@transaction.atomic
+def archive_finished_projects(today=None):
+    """
+    Archives active projects whose end_date is before ``today``. Returns how
+    many were archived. Projects are never reactivated here: an admin may
+    extend a project and set it active again by hand.
+    """
+    today = today or timezone.localdate()
+    finished = list(
+        ClientProject.objects.active().filter(end_date__lt=today).values_list('id', 'managed_by_id'))
+    if not finished:
+        return 0
+    ClientProject.objects.filter(id__in=[project_id for project_id, _ in finished]).update(
+        status='archived', updated_at=timezone.now())
+
+    # update() sends no signals: record the sync changes and bump the caches here.
+    by_tenant = defaultdict(list)
+    for project_id, tenant_id in finished:
+        by_tenant[tenant_id].append(project_id)
+    for tenant_id, project_ids in by_tenant.items():
+        record_changes(ClientProject, project_ids, UPSERT, tenant_id)
+    tenant_ids = list(by_tenant)
+    transaction.on_commit(lambda: bump_change_stamp(PROJECTS, *tenant_ids))
+    return len(finished)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         async_views.py
+# Purpose:      Async read-only API endpoints served under ASGI.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Async versions of the read-heavy API endpoints.
+
+DRF views are synchronous, so under an ASGI server each one holds a thread
+for its whole duration. These endpoints are native Django async views using
+the async ORM; a slow aggregation only suspends its own coroutine. They
+return the same JSON as their DRF counterparts and accept the same session
+or JWT authentication, and count against the same throttles.
+
+dashboard_stream_view pushes new work entries to open dashboards as
+Server-Sent Events; see live.py.
+
+Run under ASGI with, for example:
+    gunicorn Invoice_project.asgi:application -k uvicorn.workers.UvicornWorker
+"""
+
+import asyncio
+import functools
+import math
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework import exceptions
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import live
+from .analytics import dashboard_entries_for, dashboard_querysets, filter_work_entries, summarize_dashboard
+from .authentication import CachedJWTAuthentication
+from .models import WorkEntry
+from .renderers import FastJSONRenderer
+from .serializers import (
+    DashboardFilterSerializer, WorkDashboardValuesSerializer,
+    WorkEntryValuesSerializer, split_query_param,
+)
+
+_renderer = FastJSONRenderer()
+
+
+def _json_response(data, status=200):
+    return HttpResponse(_renderer.render(data), status=status, content_type='application/json')
+
+
+async def _authenticate(request):
+    """Resolves the API user from a JWT bearer token or the session."""
+    if request.META.get('HTTP_AUTHORIZATION'):
+        try:
+            result = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+        except exceptions.AuthenticationFailed:
+            return None
+        return result[0] if result else None
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+def _throttle_wait(request, view):
+    """
+    Runs the default API throttles as a DRF view would; returns the seconds
+    to wait, or None when the request is allowed.
+    """
+    waits = [throttle.wait() for throttle in (cls() for cls in api_settings.DEFAULT_THROTTLE_CLASSES)
+             if not throttle.allow_request(request, view)]
+    return max(waits) if waits else None
+
+
+def async_api_view(view_func):
+    """Authenticates and throttles an async GET endpoint and maps API errors to JSON."""
+    @functools.wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return _json_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+        request.user = await _authenticate(request)
+        if request.user is None:
+            return _json_response({'detail': 'Authentication credentials were not provided.'}, status=401)
+        wait = await sync_to_async(_throttle_wait)(request, view_func)
+        if wait is not None:
+            response = _json_response(exceptions.Throttled(wait).detail, status=429)
+            response['Retry-After'] = str(math.ceil(wait))
+            return response
+        try:
+            return await view_func(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return _json_response(exc.detail, status=exc.status_code)
+    return wrapper
+
+
+async def _paginate(request, rows, serializer):
+    """
+    Mirrors LimitOffsetPagination: unpaginated without ?limit=, otherwise a
+    {count, next, previous, results} page.
+    """
+    limit = request.GET.get('limit')
+    if not limit:
+        return serializer.to_representation([row async for row in rows])
+    try:
+        limit = max(int(limit), 1)
+        offset = max(int(request.GET.get('offset', 0)), 0)
+    except ValueError:
+        raise exceptions.ValidationError({'limit': 'A valid integer is required.'})
+
+    count = await rows.acount()
+    page = [row async for row in rows[offset:offset + limit]]
+    url = request.build_absolute_uri()
+    next_url = None
+    if offset + limit < count:
+        next_url = replace_query_param(replace_query_param(url, 'limit', limit), 'offset', offset + limit)
+    previous_url = None
+    if offset > 0:
+        previous_url = replace_query_param(url, 'limit', limit)
+        previous_url = (remove_query_param(previous_url, 'offset') if offset - limit <= 0
+                        else replace_query_param(previous_url, 'offset', offset - limit))
+    return {
+        'count': count, 'next': next_url, 'previous': previous_url,
+        'results': serializer.to_representation(page),
+    }
+
+
+def _filtered_dashboard_entries(request):
+    """Role-scoped dashboard entries with the validated query filters applied."""
+    filters = DashboardFilterSerializer(data=request.GET)
+    filters.is_valid(raise_exception=True)
+    return filter_work_entries(dashboard_entries_for(request.user), **filters.validated_data)
+
+
+@async_api_view
+async def dashboard_view(request):
+    """Async counterpart of DashboardView."""
+    serializer = WorkDashboardValuesSerializer(fields=split_query_param(request.GET.get('fields')) or None)
+    rows = serializer.get_rows(_filtered_dashboard_entries(request).order_by('-date', '-id'))
+    return _json_response(await _paginate(request, rows, serializer))
+
+
+@async_api_view
+async def work_entry_list_view(request):
+    """Async counterpart of the WorkEntryListCreateView list (?fields= supported)."""
+    queryset = WorkEntry.objects.for_user(request.user)
+    serializer = WorkEntryValuesSerializer(fields=split_query_param(request.GET.get('fields')) or None)
+    return _json_response(await _paginate(request, serializer.get_rows(queryset.order_by('id')), serializer))
+
+
+@async_api_view
+async def dashboard_charts_view(request):
+    """The dashboard page's cards and chart series as JSON."""
+    analytics = dashboard_querysets(_filtered_dashboard_entries(request))
+    summary = summarize_dashboard(
+        current_month_entries=await analytics['current_month_entries'].acount(),
+        busiest_day=await analytics['busiest_day'].afirst(),
+        most_productive_user=await analytics['most_productive_user'].afirst(),
+        category=[row async for row in analytics['category']],
+        monthly=[row async for row in analytics['monthly']],
+    )
+    return _json_response(summary)
+
+
+# Seconds between keep-alive comments, so proxies don't close an idle stream.
+STREAM_HEARTBEAT = 15
+
+
+async def _dashboard_events(channel):
+    queue = live.subscribe(channel)
+    try:
+        # Browsers reconnect on their own; ask them to wait 5 s first.
+        yield b"retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            yield b"event: entries\ndata: " + _renderer.render(event) + b"\n\n"
+    finally:
+        live.unsubscribe(channel, queue)
+
+
+@async_api_view
+async def dashboard_stream_view(request):
+    """
+    Streams work entries created in the user's tenant as Server-Sent Events.
+    Under WSGI the stream would hold a worker thread forever, so it answers
+    204 instead, which also tells EventSource not to reconnect.
+    """
+    if request.user.role not in ('super_admin', 'admin'):
+        return _json_response({'detail': 'You do not have permission to perform this action.'}, status=403)
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(
+        _dashboard_events(live.channel_for(request.user)), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream.
+    return response
@@ -18,29 +18,61 @@ Custom Django Authentication Backends.
 
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.db.models import Value
+from django.db.models.functions import Lower
+
+from . import usercache
 
 
 class EmailBackend(ModelBackend):
     """
     Authenticates a user via their email address.
+
+    This is the only login backend: it replaces ModelBackend's own lookup
+    rather than running in front of it, so every attempt costs one query and
+    one password hash, whether or not the user exists.
     """
     def authenticate(self, request, username=None, password=None, **kwargs):
         """
         Overrides the default authenticate method to use email.
-        The 'username' argument here is expected to be an email address.
+        The login form passes the email as 'username'; the JWT token view
+        passes it as 'email' (User.USERNAME_FIELD). Emails match
+        case-insensitively through the lower(email) index.
         """
-        UserModel = get_user_model()
-        try:
-            user = UserModel.objects.get(email=username)
-            if user.check_password(password):
-                return user
-        except UserModel.DoesNotExist:
+        email = kwargs.get(get_user_model().USERNAME_FIELD, username)
+        if email is None or password is None:
+            return None
+
+        user = self._get_user_by_email(email)
+        if user is None:
+            # Hash anyway, so unknown emails take as long as wrong passwords.
+            get_user_model()().set_password(password)
             return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def _get_user_by_email(self, email):
+        """
+        Returns the user whose email matches case-insensitively. Emails are
+        only unique case-sensitively, so an exact match wins if several
+        users share the address in different cases.
+        """
+        UserModel = get_user_model()
+        candidates = list(
+            UserModel.objects
+            .alias(email_lower=Lower('email'))
+            .filter(email_lower=Lower(Value(email)))[:2]
+        )
+        if len(candidates) == 1:
+            return candidates[0]
+        return next((user for user in candidates if user.email == email), None)
 
     def get_user(self, user_id):
         """
         Overrides the default get_user method.
+        Session requests resolve their user here on every request, so the
+        lookup goes through the per-worker user cache.
         """
-        UserModel = get_user_model()
-        # .first() returns the object or None, elegantly handling the try/except.
-        return UserModel.objects.filter(pk=user_id).first()
\ No newline at end of file
+        user = usercache.get_user(user_id)
+        return user if self.user_can_authenticate(user) else None
\ No newline at end of file
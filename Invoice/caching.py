@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         caching.py
+# Purpose:      Per-tenant change stamps for HTTP conditional requests.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Change stamps for the Invoice application's cacheable API resources.
+
+Each (scope, tenant) pair - e.g. the prices owned by one admin - has a change
+stamp in the shared cache. The stamp is bumped whenever a row in that scope is
+written, so a view can answer If-None-Match / If-Modified-Since requests by
+comparing stamps instead of querying rows.
+"""
+
+import time
+
+from django.core.cache import cache
+
+# Stamp shared by every tenant, used for super admins who see all rows.
+ALL_TENANTS = 'all'
+
+PRICES = 'prices'
+PROJECTS = 'projects'
+
+# Stamps only need to outlive the clients' cached copies; a missing stamp is
+# simply re-created, which invalidates those copies.
+STAMP_TIMEOUT = 60 * 60 * 24 * 30
+
+
+def _stamp_key(scope, tenant):
+    return f"changestamp:{scope}:{tenant}"
+
+
+def tenant_for_user(user):
+    """Returns the tenant whose rows the given user's lists are built from."""
+    if user.role == 'super_admin':
+        return ALL_TENANTS
+    return user.pk
+
+
+def get_change_stamp(scope, tenant):
+    """
+    Returns the change stamp (whole seconds since the epoch) for a scope.
+    A missing stamp is initialised to the current time.
+    """
+    key = _stamp_key(scope, tenant)
+    stamp = cache.get(key)
+    if stamp is None:
+        stamp = int(time.time())
+        if not cache.add(key, stamp, STAMP_TIMEOUT):
+            stamp = cache.get(key, stamp)
+    return stamp
+
+
+def bump_change_stamp(scope, *tenants):
+    """
+    Marks a scope as changed for the given tenants and for super admins.
+
+    Stamps always move forward by at least one second, so Last-Modified
+    (which only has second resolution) changes with every bump.
+    """
+    now = int(time.time())
+    keys = [_stamp_key(scope, tenant) for tenant in {*tenants, ALL_TENANTS} if tenant is not None]
+    current = cache.get_many(keys)
+    cache.set_many(
+        {key: max(now, current.get(key, 0) + 1) for key in keys},
+        STAMP_TIMEOUT,
+    )
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         db.py
+# Purpose:      Per-connection database tuning.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Database connection setup for the Invoice application.
+
+SQLite's defaults (rollback journal, full fsync, no busy wait) make
+concurrent gunicorn workers fail with "database is locked". Every new SQLite
+connection is switched to WAL, which lets readers run alongside the single
+writer, with synchronous=NORMAL (safe under WAL), a busy timeout so a writer
+waits for the lock instead of failing, and memory-mapped reads.
+
+The pragmas can be overridden with the SQLITE_PRAGMAS setting. Imported from
+InvoiceConfig.ready(), which connects the receiver.
+"""
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # milliseconds
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def sqlite_pragmas():
+    return {**DEFAULT_SQLITE_PRAGMAS, **getattr(settings, 'SQLITE_PRAGMAS', {})}
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    """Applies the SQLite pragmas to a newly opened connection."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name} = {value}")
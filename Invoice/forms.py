@@ -16,6 +16,8 @@
 Django Forms for the Invoice application.
 """
 
+from decimal import Decimal
+
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from .models import User, WorkEntry, ClientProject, Price
@@ -24,18 +26,18 @@ from .models import User, WorkEntry, ClientProject, Price
 class WorkEntryForm(forms.ModelForm):
     """
     A form for users to submit their work entries.
-    The label for 'category' is customized to 'Folder Name'.
+    The label for 'price' is customized to 'Folder Name'.
     """
-    # The 'category' field is now a dropdown menu linked to the Price model
-    category = forms.ModelChoiceField(
+    # The 'price' field is a dropdown of the admin's price categories
+    price = forms.ModelChoiceField(
         queryset=Price.objects.none(),
-        label="Folder Name", # <-- This is the change
+        label="Folder Name",
         widget=forms.Select(attrs={'class': 'form-select'})
     )
     
     class Meta:
         model = WorkEntry
-        fields = ['project', 'category', 'quantity', 'date']
+        fields = ['project', 'price', 'quantity', 'date']
         widgets = {
             'project': forms.Select(attrs={'class': 'form-select'}),
             'quantity': forms.NumberInput(attrs={'class': 'form-control'}),
@@ -49,18 +51,68 @@ class WorkEntryForm(forms.ModelForm):
         if user and user.role == 'user' and user.managed_by:
             admin_user = user.managed_by
             # The dropdowns will be filtered based on the user's admin
-            self.fields['project'].queryset = ClientProject.objects.filter(managed_by=admin_user)
-            self.fields['category'].queryset = Price.objects.filter(managed_by=admin_user)
+            self.fields['project'].queryset = ClientProject.objects.active().filter(managed_by=admin_user)
+            self.fields['price'].queryset = Price.objects.filter(managed_by=admin_user)
             # The text shown in the dropdown will be the category name from the Price model
-            self.fields['category'].label_from_instance = lambda obj: obj.category
+            self.fields['price'].label_from_instance = lambda obj: obj.category
+
+
+
+class WorkEntryRowForm(forms.Form):
+    """
+    One row of the multi-row work entry page. The project and price choices
+    are passed in already fetched, so validating a row runs no queries.
+    """
+    project = forms.TypedChoiceField(
+        coerce=int,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    price = forms.TypedChoiceField(
+        coerce=int,
+        label="Folder Name",
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    quantity = forms.IntegerField(
+        min_value=0,
+        widget=forms.NumberInput(attrs={'class': 'form-control'})
+    )
+    date = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
+    )
+
+    def __init__(self, *args, project_choices=(), price_choices=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['project'].choices = [('', '---------'), *project_choices]
+        self.fields['price'].choices = [('', '---------'), *price_choices]
+
+
+class BaseWorkEntryFormSet(forms.BaseFormSet):
+    """Formset of WorkEntryRowForm rows; blank extra rows are ignored."""
+
+    def entries(self, **fields):
+        """Returns unsaved WorkEntry objects for the filled-in rows."""
+        return [
+            WorkEntry(
+                project_id=form.cleaned_data['project'],
+                price_id=form.cleaned_data['price'],
+                quantity=form.cleaned_data['quantity'],
+                date=form.cleaned_data['date'],
+                **fields,
+            )
+            for form in self.forms
+            if form.has_changed() and form.cleaned_data
+        ]
 
-    def save(self, commit=True):
-        # The form returns a Price object, so we extract the category name string to save
-        price_object = self.cleaned_data.get('category')
-        if price_object:
-            self.instance.category = price_object.category
-        return super().save(commit)
 
+WorkEntryFormSet = forms.formset_factory(
+    WorkEntryRowForm,
+    formset=BaseWorkEntryFormSet,
+    extra=1,
+    min_num=1,
+    validate_min=True,
+    max_num=100,
+    validate_max=True,
+)
 
 
 class PriceForm(forms.ModelForm):
@@ -79,6 +131,33 @@ class PriceForm(forms.ModelForm):
         self.fields['category'].label = "Folder Name"
 
 
+class PriceImportForm(forms.Form):
+    """Upload form for importing a price book from a CSV or XLSX file."""
+    file = forms.FileField(
+        label="Price Book (.csv or .xlsx)",
+        help_text="Columns: Folder Name, Rate. Existing folder names are updated.",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.xlsx'}),
+    )
+
+
+class PriceAdjustForm(forms.Form):
+    """Form for raising or lowering every rate by a percentage."""
+    percent = forms.DecimalField(
+        label="Adjust All Rates (%)",
+        max_digits=6, decimal_places=2, min_value=Decimal('-99.99'), max_value=1000,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
+    )
+
+
+class TeamImportForm(forms.Form):
+    """Upload form for adding several team members from a CSV or XLSX file."""
+    file = forms.FileField(
+        label="Team Roster (.csv or .xlsx)",
+        help_text="Columns: Username, Email. Each new user is emailed a temporary password.",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.xlsx'}),
+    )
+
+
 class AdminUserCreationForm(UserCreationForm):
     """A form for admins to create new users under their management."""
     class Meta:
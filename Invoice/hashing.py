@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         hashing.py
+# Purpose:      Parallel password hashing for bulk user creation.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Hashes many passwords at once in a process pool.
+
+A PBKDF2 hash is deliberately slow and holds the GIL, so hashing the
+passwords for a few hundred new users one after another takes minutes.
+hash_passwords() spreads them over worker processes instead.
+
+This module must not import models: the pool's worker processes import it
+before Django is set up (that is what _init_worker does).
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Below this many passwords, starting the pool costs more than it saves.
+PARALLEL_THRESHOLD = 8
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def _make_password(raw_password):
+    from django.contrib.auth.hashers import make_password
+    return make_password(raw_password)
+
+
+def hash_passwords(raw_passwords, workers=None):
+    """
+    Returns make_password() of each raw password, in order. ``workers``
+    defaults to the PASSWORD_HASH_WORKERS setting, then the CPU count.
+    """
+    from django.conf import settings
+
+    raw_passwords = list(raw_passwords)
+    workers = workers or getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1
+    workers = min(workers, len(raw_passwords))
+    if workers <= 1 or len(raw_passwords) < PARALLEL_THRESHOLD:
+        return [_make_password(raw_password) for raw_password in raw_passwords]
+
+    # Spawned (not forked) workers: forking a threaded web server process is
+    # unsafe, so each worker sets Django up from scratch.
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'Invoice_project.settings'),),
+    ) as pool:
+        chunksize = max(1, len(raw_passwords) // (workers * 4))
+        return list(pool.map(_make_password, raw_passwords, chunksize=chunksize))
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         idempotency.py
+# Purpose:      Idempotency-Key support for the API create endpoints.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Safe retries of create requests.
+
+A client that sends ``Idempotency-Key: <unique value>`` with a POST to an
+endpoint using IdempotentCreateMixin (or to the batch endpoint, where the
+key covers the whole batch) gets the same response for every retry of that
+request, and the objects are created once. The key row is inserted in
+the same transaction as the object and holds its response, so:
+
+- a retry after the first request committed replays the stored response
+  (with ``Idempotent-Replayed: true``) without validating or inserting;
+- a retry racing the first request waits on the unique (user, key) index
+  and then replays its response;
+- a request that failed left nothing behind and can be retried as is.
+
+Reusing a key for a different request is refused with 422. Keys are scoped
+to the user and expire after IDEMPOTENCY_KEY_TTL_HOURS; the
+purge_idempotency_keys command deletes expired ones.
+"""
+
+import datetime
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+MAX_KEY_LENGTH = 255
+DEFAULT_TTL_HOURS = 24
+
+
+def request_hash(request):
+    """Fingerprints the method, path and parsed body of a request."""
+    body = json.dumps(request.data, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(f"{request.method}|{request.path}|{body}".encode()).hexdigest()
+
+
+def claim_key(user, key, fingerprint):
+    """
+    Returns ``user``'s live IdempotencyKey for ``key``, inserting an
+    unanswered one (status_code None) if there is none. Must be called in a
+    transaction, which the new row's answer is saved in.
+    """
+    now = timezone.now()
+    existing = IdempotencyKey.objects.filter(user=user, key=key).first()
+    if existing is not None:
+        if existing.expires_at > now:
+            return existing
+        existing.delete()
+
+    ttl = datetime.timedelta(hours=getattr(settings, 'IDEMPOTENCY_KEY_TTL_HOURS', DEFAULT_TTL_HOURS))
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(
+                user=user, key=key, request_hash=fingerprint, expires_at=now + ttl)
+    except IntegrityError:
+        # A concurrent request with the same key committed first.
+        return IdempotencyKey.objects.get(user=user, key=key)
+
+
+def purge_expired_keys(batch_size=5000):
+    """Deletes expired keys in batches; returns how many were deleted."""
+    deleted = 0
+    while True:
+        ids = list(
+            IdempotencyKey.objects.filter(expires_at__lte=timezone.now())
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
+
+
+def idempotent_response(request, handler):
+    """
+    Returns ``handler()``'s response, or, for a request carrying an
+    Idempotency-Key that was already answered, the stored response. The
+    handler runs in the transaction that records its response.
+    """
+    key = request.META.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return handler()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise ValidationError({'Idempotency-Key': f"Must be 1 to {MAX_KEY_LENGTH} characters long."})
+
+    fingerprint = request_hash(request)
+    with transaction.atomic():
+        record = claim_key(request.user, key, fingerprint)
+        if record.status_code is None:
+            # Errors roll the key back with everything else.
+            response = handler()
+            record.status_code = response.status_code
+            record.response_body = response.data
+            record.save(update_fields=['status_code', 'response_body'])
+            return response
+
+    if record.request_hash != fingerprint:
+        return Response(
+            {'detail': "This Idempotency-Key was already used for a different request."},
+            status=422,
+        )
+    return Response(record.response_body, status=record.status_code,
+                    headers={'Idempotent-Replayed': 'true'})
+
+
+class IdempotentCreateMixin:
+    """Makes a CreateModelMixin view honour the Idempotency-Key header."""
+
+    def create(self, request, *args, **kwargs):
+        return idempotent_response(request, lambda: super(IdempotentCreateMixin, self).create(request, *args, **kwargs))
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         importers.py
+# Purpose:      Spreadsheet parsing and bulk write helpers for imports.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Bulk import helpers for the Invoice application.
+
+Uploaded CSV/XLSX files are parsed into plain row dicts, every row is
+validated before anything is written, and the writes go out as batched
+statements inside one transaction.
+"""
+
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+from zipfile import BadZipFile
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Max, Value
+from django.db.models.functions import Lower, Round
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from .caching import PRICES, bump_change_stamp
+from .hashing import hash_passwords
+from .models import Price, User
+from .outbox import queue_emails, welcome_email
+from .sync import UPSERT, record_changes
+
+BATCH_SIZE = 500
+
+# Header names accepted for each price-book column (compared lower-cased).
+CATEGORY_HEADERS = ('category', 'folder name', 'folder')
+RATE_HEADERS = ('rate', 'price', 'rate ($)')
+# Header names accepted for each team roster column.
+USERNAME_HEADERS = ('username', 'user name', 'name')
+EMAIL_HEADERS = ('email', 'email address', 'e-mail')
+
+MAX_TEAM_ROWS = 1000
+
+
+class ImportValidationError(Exception):
+    """Raised when an upload or bulk change cannot be applied; carries the errors."""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def read_table(uploaded_file):
+    """
+    Reads a CSV or XLSX upload into a list of dicts keyed by lower-cased
+    header. Returns (rows, header); blank rows are skipped.
+    """
+    name = (uploaded_file.name or '').lower()
+    if name.endswith('.xlsx'):
+        try:
+            workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+        except (BadZipFile, InvalidFileException, KeyError):
+            raise ImportValidationError(["The file is not a valid .xlsx workbook."])
+        try:
+            lines = workbook.active.iter_rows(values_only=True)
+            header = next(lines, None) or ()
+            table = [list(line) for line in lines]
+        finally:
+            workbook.close()
+    elif name.endswith('.csv'):
+        text = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+        try:
+            lines = csv.reader(text)
+            header = next(lines, None) or ()
+            table = list(lines)
+        except (UnicodeDecodeError, csv.Error):
+            raise ImportValidationError(["The file is not a valid UTF-8 CSV file."])
+        finally:
+            text.detach()
+    else:
+        raise ImportValidationError(["Unsupported file type. Upload a .csv or .xlsx file."])
+
+    header = [str(cell or '').strip().lower() for cell in header]
+    rows = []
+    for cells in table:
+        if not any(cell not in (None, '') for cell in cells):
+            continue
+        rows.append(dict(zip(header, cells)))
+    return rows, header
+
+
+def _pick_column(header, candidates):
+    for candidate in candidates:
+        if candidate in header:
+            return candidate
+    return None
+
+
+def parse_price_book(rows, header):
+    """
+    Validates price-book rows and returns an ordered {category: rate} dict.
+    Raises ImportValidationError listing every invalid row; later duplicates win.
+    """
+    category_column = _pick_column(header, CATEGORY_HEADERS)
+    rate_column = _pick_column(header, RATE_HEADERS)
+    if not category_column or not rate_column:
+        raise ImportValidationError(["The file needs a 'Folder Name' (or 'Category') column and a 'Rate' column."])
+
+    max_length = Price._meta.get_field('category').max_length
+    rate_field = Price._meta.get_field('rate')
+    max_whole_digits = rate_field.max_digits - rate_field.decimal_places
+
+    rates, errors = {}, []
+    # Row 1 is the header, so data starts on row 2.
+    for row_number, row in enumerate(rows, start=2):
+        category = str(row.get(category_column) or '').strip()
+        raw_rate = row.get(rate_column)
+        if not category:
+            errors.append(f"Row {row_number}: folder name is required.")
+            continue
+        if len(category) > max_length:
+            errors.append(f"Row {row_number}: folder name is longer than {max_length} characters.")
+            continue
+        try:
+            rate = Decimal(str(raw_rate).strip().lstrip('$'))
+        except (InvalidOperation, ValueError):
+            errors.append(f"Row {row_number}: '{raw_rate}' is not a valid rate.")
+            continue
+        if not rate.is_finite() or rate < 0 or rate.adjusted() >= max_whole_digits:
+            errors.append(f"Row {row_number}: '{raw_rate}' is not a valid rate.")
+            continue
+        rates[category] = rate.quantize(Decimal(1).scaleb(-rate_field.decimal_places))
+
+    if errors:
+        raise ImportValidationError(errors)
+    if not rates:
+        raise ImportValidationError(["The file does not contain any prices."])
+    return rates
+
+
+def upsert_prices(owner, rates):
+    """
+    Creates or updates the owner's prices from a {category: rate} dict with
+    batched INSERT ... ON CONFLICT statements in a single transaction.
+    Returns a {'created': n, 'updated': n} summary.
+    """
+    prices = [Price(managed_by=owner, category=category, rate=rate) for category, rate in rates.items()]
+
+    with transaction.atomic():
+        existing = set(
+            Price.objects.filter(managed_by=owner, category__in=list(rates))
+            .values_list('category', flat=True)
+        )
+        Price.objects.bulk_create(
+            prices,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['managed_by', 'category'],
+            update_fields=['rate', 'updated_at'],
+        )
+        price_ids = Price.objects.filter(
+            managed_by=owner, category__in=list(rates)).values_list('id', flat=True)
+        record_changes(Price, list(price_ids), UPSERT, owner.pk)
+        # bulk_create() sends no signals, so invalidate the price caches once.
+        transaction.on_commit(lambda: bump_change_stamp(PRICES, owner.pk))
+
+    return {'created': len(rates) - len(existing), 'updated': len(existing)}
+
+
+def adjust_prices(queryset, percent):
+    """
+    Scales every rate in the queryset by ``percent`` (e.g. 5 or -2.5) in a
+    single UPDATE, rounding to cents. Returns the number of rows changed.
+    Raises ImportValidationError, changing nothing, if a rate would no longer
+    fit the rate column.
+    """
+    factor = Decimal(1) + Decimal(percent) / Decimal(100)
+    rate_field = Price._meta.get_field('rate')
+    max_whole_digits = rate_field.max_digits - rate_field.decimal_places
+    new_rate = ExpressionWrapper(
+        Round(F('rate') * Value(factor), rate_field.decimal_places),
+        output_field=DecimalField(max_digits=rate_field.max_digits, decimal_places=rate_field.decimal_places),
+    )
+    with transaction.atomic():
+        highest = queryset.aggregate(highest=Max('rate'))['highest']
+        if highest is not None:
+            new_highest = (highest * factor).quantize(Decimal(1).scaleb(-rate_field.decimal_places))
+            if new_highest.adjusted() >= max_whole_digits:
+                raise ImportValidationError(
+                    [f"Adjusting by {percent}% would raise the rate {highest} beyond the largest rate allowed."])
+        rows = list(queryset.values_list('id', 'managed_by_id'))
+        updated = queryset.update(rate=new_rate, updated_at=timezone.now())
+        owners = {}
+        for price_id, owner_id in rows:
+            owners.setdefault(owner_id, []).append(price_id)
+        for owner_id, price_ids in owners.items():
+            record_changes(Price, price_ids, UPSERT, owner_id)
+        transaction.on_commit(lambda: bump_change_stamp(PRICES, *owners))
+    return updated
+
+
+def parse_team_roster(rows, header):
+    """
+    Validates team roster rows and returns a list of (username, email).
+    Raises ImportValidationError listing every invalid row, including
+    duplicates within the file and usernames or emails already taken.
+    """
+    username_column = _pick_column(header, USERNAME_HEADERS)
+    email_column = _pick_column(header, EMAIL_HEADERS)
+    if not username_column or not email_column:
+        raise ImportValidationError(["The file needs a 'Username' column and an 'Email' column."])
+    if len(rows) > MAX_TEAM_ROWS:
+        raise ImportValidationError([f"The file has {len(rows)} rows; at most {MAX_TEAM_ROWS} can be imported at once."])
+
+    max_length = User._meta.get_field('username').max_length
+    members, errors = [], []
+    seen_usernames, seen_emails = {}, {}
+    # Row 1 is the header, so data starts on row 2.
+    for row_number, row in enumerate(rows, start=2):
+        username = str(row.get(username_column) or '').strip()
+        email = str(row.get(email_column) or '').strip()
+        if not username or not email:
+            errors.append(f"Row {row_number}: username and email are required.")
+            continue
+        if len(username) > max_length:
+            errors.append(f"Row {row_number}: username is longer than {max_length} characters.")
+            continue
+        try:
+            User.username_validator(username)
+            validate_email(email)
+        except ValidationError as exc:
+            errors.append(f"Row {row_number}: {' '.join(exc.messages)}")
+            continue
+        if username in seen_usernames:
+            errors.append(f"Row {row_number}: username '{username}' repeats row {seen_usernames[username]}.")
+            continue
+        if email.lower() in seen_emails:
+            errors.append(f"Row {row_number}: email '{email}' repeats row {seen_emails[email.lower()]}.")
+            continue
+        seen_usernames[username] = seen_emails[email.lower()] = row_number
+        members.append((row_number, username, email))
+
+    if members:
+        taken_usernames = set(
+            User.objects.filter(username__in=[username for _, username, _ in members])
+            .values_list('username', flat=True)
+        )
+        taken_emails = {
+            email.lower() for email in
+            User.objects.alias(email_lower=Lower('email'))
+            .filter(email_lower__in=[email.lower() for _, _, email in members])
+            .values_list('email', flat=True)
+        }
+        for row_number, username, email in members:
+            if username in taken_usernames:
+                errors.append(f"Row {row_number}: username '{username}' is already taken.")
+            elif email.lower() in taken_emails:
+                errors.append(f"Row {row_number}: email '{email}' is already registered.")
+
+    if errors:
+        raise ImportValidationError(errors)
+    if not members:
+        raise ImportValidationError(["The file does not contain any team members."])
+    return [(username, email) for _, username, email in members]
+
+
+def create_team_members(admin, members):
+    """
+    Creates regular users managed by ``admin`` from (username, email) pairs,
+    with random passwords hashed in parallel, and queues their welcome
+    emails. Users and emails are written in one transaction; raises
+    ImportValidationError if a username or email was taken meanwhile.
+    """
+    passwords = [get_random_string(length=12) for _ in members]
+    users = [
+        User(username=username, email=email, role='user', managed_by=admin, password=password_hash)
+        for (username, email), password_hash in zip(members, hash_passwords(passwords))
+    ]
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+            queue_emails(
+                welcome_email(user, password, admin.username)
+                for user, password in zip(users, passwords)
+            )
+    except IntegrityError:
+        # parse_team_roster() checked for taken names, but another request
+        # may have claimed one since.
+        raise ImportValidationError(
+            ["A username or email in the file has just been taken. Please check the file and try again."])
+    return users
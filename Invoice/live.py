@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         live.py
+# Purpose:      In-process fan-out of new work entries to live dashboards.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Live dashboard updates.
+
+Each open dashboard stream (async_views.dashboard_stream_view) subscribes an
+asyncio queue to its tenant's channel: the admin's id, or ALL_TENANTS for
+super admins. When work entries are created, publish_entries() sends them,
+once the transaction commits, to every queue subscribed to their tenant or
+to ALL_TENANTS. Each entry carries its chart labels (month and category), so
+a dashboard can update its table and chart series without re-running any
+aggregation, and a filtered dashboard can skip entries outside its filters.
+
+The broadcaster lives in the process memory: streams only see entries
+written by the same process, which is the case when the whole site runs
+under one ASGI worker. Writes from other processes show up on reload.
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+from django.urls import reverse
+
+from .caching import ALL_TENANTS, tenant_for_user
+
+# Events a slow client may fall behind by before further ones are dropped.
+QUEUE_SIZE = 100
+
+_subscribers = defaultdict(set)  # channel -> {(loop, queue)}
+_lock = threading.Lock()
+
+
+def channel_for(user):
+    """Returns the channel an admin-level user's dashboard listens on."""
+    return str(tenant_for_user(user))
+
+
+def subscribe(channel):
+    """Registers a queue on ``channel`` for the running event loop and returns it."""
+    queue = asyncio.Queue(QUEUE_SIZE)
+    with _lock:
+        _subscribers[channel].add((asyncio.get_running_loop(), queue))
+    return queue
+
+
+def unsubscribe(channel, queue):
+    with _lock:
+        subscribers = _subscribers.get(channel, set())
+        subscribers.difference_update({item for item in subscribers if item[1] is queue})
+        if not subscribers:
+            _subscribers.pop(channel, None)
+
+
+def has_subscribers(*channels):
+    with _lock:
+        return any(_subscribers.get(channel) for channel in channels)
+
+
+def _offer(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        pass  # The client is too far behind; it catches up on reload.
+
+
+def publish(channel, event):
+    """Hands ``event`` to every queue on ``channel``; safe from any thread."""
+    with _lock:
+        subscribers = list(_subscribers.get(channel, ()))
+    for loop, queue in subscribers:
+        try:
+            loop.call_soon_threadsafe(_offer, queue, event)
+        except RuntimeError:  # The stream's event loop has closed.
+            unsubscribe(channel, queue)
+
+
+def entry_payload(entry):
+    """The dashboard's view of one entry (user, project and price loaded)."""
+    return {
+        'id': entry.id,
+        'user': entry.user.username,
+        'user_id': str(entry.user_id),
+        'project': entry.project.name if entry.project_id else None,
+        'project_id': entry.project_id,
+        'category': entry.category,
+        'quantity': entry.quantity,
+        'date': entry.date.isoformat(),
+        'month': entry.date.strftime('%Y-%m'),
+        'invoice_url': reverse('generate_invoice', args=[entry.project_id]) if entry.project_id else None,
+    }
+
+
+def _send(entry_ids):
+    from .models import WorkEntry
+
+    by_channel = defaultdict(list)
+    entries = WorkEntry.objects.filter(pk__in=entry_ids).select_related('user', 'project', 'price').order_by('id')
+    for entry in entries:
+        payload = entry_payload(entry)
+        by_channel[ALL_TENANTS].append(payload)
+        if entry.tenant_id is not None:
+            by_channel[str(entry.tenant_id)].append(payload)
+    for channel, payloads in by_channel.items():
+        publish(channel, {'entries': payloads})
+
+
+def publish_entries(entries):
+    """
+    Sends newly created work entries to the dashboards of their tenant once
+    the current transaction commits. Costs nothing while nobody listens.
+    """
+    channels = {ALL_TENANTS, *(str(entry.tenant_id) for entry in entries if entry.tenant_id)}
+    if not entries or not has_subscribers(*channels):
+        return
+    entry_ids = [entry.pk for entry in entries]
+    transaction.on_commit(lambda: _send(entry_ids))
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         archive_projects.py
+# Purpose:      Archives projects whose end date has passed.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Marks active projects whose end_date is in the past as archived. Meant to
+run daily (e.g. from cron):
+
+Usage:  python manage.py archive_projects
+"""
+
+from django.core.management.base import BaseCommand
+
+from Invoice.archive import archive_finished_projects
+
+
+class Command(BaseCommand):
+    help = "Archives active projects whose end date has passed."
+
+    def handle(self, *args, **options):
+        count = archive_finished_projects()
+        self.stdout.write(f"Archived {count} project(s).")
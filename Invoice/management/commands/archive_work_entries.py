@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         archive_work_entries.py
+# Purpose:      Moves old work entries into the archive table.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Moves work entries older than the archive horizon out of WorkEntry.
+
+Usage:  python manage.py archive_work_entries               (WORK_ENTRY_ARCHIVE_MONTHS)
+        python manage.py archive_work_entries --months 12
+        python manage.py archive_work_entries --dry-run
+
+Whole months are moved, in batches that each commit on their own, so the
+command can be stopped and rerun at any time. Monthly totals are rebuilt
+for the months that were moved.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Invoice.archive import archive_batch, archive_horizon, refresh_monthly_totals
+from Invoice.models import WorkEntry
+
+
+class Command(BaseCommand):
+    help = "Archives work entries older than the given number of months."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=None,
+                            help="Keep this many whole months before the current one live.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report how many entries would be archived.")
+
+    def handle(self, *args, **options):
+        if options['months'] is not None and options['months'] < 0:
+            raise CommandError("--months must not be negative.")
+        before = archive_horizon(options['months'])
+
+        if options['dry_run']:
+            count = WorkEntry.objects.filter(date__lt=before).count()
+            self.stdout.write(f"{count} entries dated before {before} would be archived.")
+            return
+
+        total, months = 0, set()
+        while True:
+            moved, batch_months = archive_batch(before, options['batch_size'])
+            if not moved:
+                break
+            total += moved
+            months |= batch_months
+            self.stdout.write(f"Archived {total} entries...")
+        totals = refresh_monthly_totals(months)
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {total} entries dated before {before}; "
+            f"{totals} monthly totals rebuilt for {len(months)} month(s)."
+        ))
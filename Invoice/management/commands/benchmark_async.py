@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         benchmark_async.py
+# Purpose:      Concurrent throughput benchmark for the sync and async APIs.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Compares concurrent-request throughput of the WSGI (DRF) read endpoints and
+their async ASGI counterparts, in-process.
+
+Usage:  python manage.py benchmark_async --rows 5000 --requests 200 --concurrency 20
+
+The WSGI side drives the test Client from a thread pool, the way a threaded
+WSGI server would; the ASGI side drives AsyncClient from one event loop.
+Sample rows are committed for the run (worker threads use their own
+connections) and deleted afterwards. For production numbers, run the same
+requests against gunicorn (WSGI) and gunicorn + uvicorn workers (ASGI).
+"""
+
+import asyncio
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+
+from Invoice.models import ClientProject, Price, User, WorkEntry
+
+ENDPOINTS = (
+    ('dashboard', '/api/dashboard/?limit=50', '/api/async/dashboard/?limit=50'),
+    ('work entries', '/api/work-entries/?fields=id,quantity,date', '/api/async/work-entries/?fields=id,quantity,date'),
+    ('charts', None, '/api/async/dashboard/charts/'),
+)
+
+
+class Command(BaseCommand):
+    help = "Benchmarks concurrent throughput of the sync vs. async read endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20)
+
+    def handle(self, *args, **options):
+        admin = self._create_sample_rows(options['rows'])
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                self._run(admin, options)
+        finally:
+            User.objects.filter(pk=admin.pk).delete()
+            User.objects.filter(email='bench-async-user@example.com').delete()
+
+    def _run(self, admin, options):
+        for label, sync_path, async_path in ENDPOINTS:
+            sync_rate = self._bench_sync(admin, sync_path or '/dashboard/', options)
+            async_rate = self._bench_async(admin, async_path, options)
+            self.stdout.write(
+                f"{label:<13} WSGI: {sync_rate:>8.1f} req/s   ASGI: {async_rate:>8.1f} req/s"
+                + ("   (WSGI side: dashboard page)" if sync_path is None else "")
+            )
+
+    def _check(self, path, response):
+        if response.status_code != 200:
+            raise CommandError(f"GET {path} returned {response.status_code}.")
+
+    def _bench_sync(self, admin, path, options):
+        def worker(count):
+            client = Client()
+            client.force_login(admin)
+            for _ in range(count):
+                self._check(path, client.get(path))
+            connections.close_all()
+
+        concurrency = options['concurrency']
+        per_worker = max(options['requests'] // concurrency, 1)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(worker, [per_worker] * concurrency))
+        return per_worker * concurrency / (time.perf_counter() - start)
+
+    def _bench_async(self, admin, path, options):
+        concurrency = options['concurrency']
+        per_worker = max(options['requests'] // concurrency, 1)
+        client = Client()
+        client.force_login(admin)
+        cookies = client.cookies
+
+        async def worker():
+            async_client = AsyncClient()
+            async_client.cookies = cookies
+            for _ in range(per_worker):
+                self._check(path, await async_client.get(path))
+
+        async def run():
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+        start = time.perf_counter()
+        asyncio.run(run())
+        return per_worker * concurrency / (time.perf_counter() - start)
+
+    def _create_sample_rows(self, rows):
+        admin = User.objects.create_user(
+            username='bench-async-admin', email='bench-async-admin@example.com', role='admin')
+        user = User.objects.create_user(
+            username='bench-async-user', email='bench-async-user@example.com', managed_by=admin)
+        project = ClientProject.objects.create(
+            name='Async Benchmark', start_date=datetime.date.today(), created_by=admin, managed_by=admin)
+        prices = Price.objects.bulk_create(
+            Price(category=f'Folder {i}', rate='1.00', managed_by=admin) for i in range(25))
+        today = datetime.date.today()
+        WorkEntry.objects.bulk_create(
+            WorkEntry(user=user, project=project, tenant=admin, price=prices[i % 25],
+                      quantity=i % 40 + 1, date=today - datetime.timedelta(days=i % 365))
+            for i in range(rows)
+        )
+        return admin
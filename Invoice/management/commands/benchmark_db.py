@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         benchmark_db.py
+# Purpose:      Concurrent read/write benchmark for the configured database.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Runs a mix of dashboard-style reads and work entry inserts from several
+threads at once against the database in DATABASES['default'], and reports
+operations per second, latency percentiles and "database is locked" errors.
+
+Usage:  python manage.py benchmark_db --threads 8 --ops 200 --write-ratio 0.2
+        DATABASE_URL=postgres://... python manage.py benchmark_db
+
+Run it once per backend to compare SQLite (with the pragmas from
+Invoice/db.py) against PostgreSQL. Sample rows are committed for the run
+(each thread uses its own connection) and deleted afterwards.
+"""
+
+import datetime
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections, transaction
+from django.db.models import Count, Sum
+
+from Invoice.models import ClientProject, Price, User, WorkEntry
+
+
+class Command(BaseCommand):
+    help = "Benchmarks concurrent reads and writes against the configured database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--ops', type=int, default=200, help="Operations per thread.")
+        parser.add_argument('--write-ratio', type=float, default=0.2)
+
+    def handle(self, *args, **options):
+        admin, user, project, prices = self._create_sample_rows(options['rows'])
+        try:
+            self._run(admin, user, project, prices, options)
+        finally:
+            User.objects.filter(email='bench-db-user@example.com').delete()
+            User.objects.filter(pk=admin.pk).delete()
+
+    def _run(self, admin, user, project, prices, options):
+        today = datetime.date.today()
+
+        def read():
+            entries = WorkEntry.objects.for_user(admin).filter(date__gte=today - datetime.timedelta(days=30))
+            entries.aggregate(total=Sum('quantity'), count=Count('id'))
+            list(entries.select_related('price').order_by('-date')[:50])
+
+        def write():
+            with transaction.atomic():
+                WorkEntry.objects.create(
+                    user=user, project=project, price=random.choice(prices),
+                    quantity=random.randint(1, 40), date=today)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            latencies, locked = [], 0
+            for _ in range(options['ops']):
+                operation = write if rng.random() < options['write_ratio'] else read
+                start = time.perf_counter()
+                try:
+                    operation()
+                except OperationalError as exc:
+                    if 'locked' not in str(exc):
+                        raise
+                    locked += 1
+                latencies.append(time.perf_counter() - start)
+            connections.close_all()
+            return latencies, locked
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            results = list(pool.map(worker, range(options['threads'])))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for thread_latencies, _ in results for latency in thread_latencies)
+        locked = sum(thread_locked for _, thread_locked in results)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+        self.stdout.write(
+            f"{connection.vendor}: {len(latencies) / elapsed:.1f} ops/s over {options['threads']} threads   "
+            f"p50 {statistics.median(latencies) * 1000:.1f} ms   p95 {p95 * 1000:.1f} ms   "
+            f"locked errors: {locked}"
+        )
+
+    def _create_sample_rows(self, rows):
+        admin = User.objects.create_user(
+            username='bench-db-admin', email='bench-db-admin@example.com', role='admin')
+        user = User.objects.create_user(
+            username='bench-db-user', email='bench-db-user@example.com', managed_by=admin)
+        project = ClientProject.objects.create(
+            name='DB Benchmark', start_date=datetime.date.today(), created_by=admin, managed_by=admin)
+        prices = Price.objects.bulk_create(
+            Price(category=f'Folder {i}', rate='1.00', managed_by=admin) for i in range(25))
+        today = datetime.date.today()
+        WorkEntry.objects.bulk_create(
+            WorkEntry(user=user, project=project, tenant=admin, price=prices[i % 25],
+                      quantity=i % 40 + 1, date=today - datetime.timedelta(days=i % 365))
+            for i in range(rows)
+        )
+        return admin, user, project, prices
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         benchmark_login.py
+# Purpose:      Microbenchmark for the login authentication path.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Measures login attempts per second and queries per attempt through the
+configured AUTHENTICATION_BACKENDS, for successful logins, wrong passwords
+and unknown emails, as the login form and the JWT token view call them.
+
+Usage:  python manage.py benchmark_login --attempts 10
+
+The sample user is created inside a transaction that is rolled back
+afterwards. Times are dominated by the password hasher, so attempts per
+second should be roughly equal across the three cases.
+"""
+
+import time
+
+from django.contrib.auth import authenticate
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from Invoice.models import User
+
+EMAIL = 'bench-login@example.com'
+PASSWORD = 'bench-login-password'
+
+
+class Command(BaseCommand):
+    help = "Benchmarks login throughput through the authentication backends."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=10)
+
+    def handle(self, *args, **options):
+        attempts = options['attempts']
+
+        with transaction.atomic():
+            User.objects.create_user(username='bench-login', email=EMAIL, password=PASSWORD)
+            cases = [
+                ('success', {'username': EMAIL.upper(), 'password': PASSWORD}, True),
+                ('success (JWT)', {'email': EMAIL, 'password': PASSWORD}, True),
+                ('wrong password', {'username': EMAIL, 'password': 'wrong'}, False),
+                ('unknown email', {'username': 'nobody@example.com', 'password': PASSWORD}, False),
+            ]
+            for label, credentials, expected in cases:
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    for _ in range(attempts):
+                        user = authenticate(None, **credentials)
+                    elapsed = time.perf_counter() - start
+                if (user is not None) != expected:
+                    self.stderr.write(f"{label}: unexpected result {user!r}")
+                self.stdout.write(
+                    f"{label:<15} {attempts / elapsed:>8.1f} logins/s   "
+                    f"{len(queries) / attempts:.1f} queries/attempt"
+                )
+            transaction.set_rollback(True)
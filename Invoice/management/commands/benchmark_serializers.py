@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         benchmark_serializers.py
+# Purpose:      Microbenchmark for the API list serialization paths.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Compares rows per second for the ModelSerializer + JSONRenderer list path and
+the ValuesSerializer + FastJSONRenderer path on the same work entries.
+
+Usage:  python manage.py benchmark_serializers --rows 20000 --repeat 3
+
+Sample rows are created inside a transaction that is rolled back afterwards.
+"""
+
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from Invoice.models import ClientProject, Price, User, WorkEntry
+from Invoice.renderers import FastJSONRenderer
+from Invoice.serializers import (
+    WorkDashboardSerializer, WorkDashboardValuesSerializer,
+    WorkEntrySerializer, WorkEntryValuesSerializer,
+)
+
+
+class Command(BaseCommand):
+    help = "Benchmarks ModelSerializer vs. values()-based list serialization."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+
+        with transaction.atomic():
+            queryset = self._create_sample_rows(rows)
+            cases = [
+                ('WorkEntry', WorkEntrySerializer, WorkEntryValuesSerializer, queryset),
+                ('Dashboard', WorkDashboardSerializer, WorkDashboardValuesSerializer,
+                 queryset.select_related('user', 'project')),
+            ]
+            for label, model_serializer, values_serializer, qs in cases:
+                before = self._time(repeat, lambda: JSONRenderer().render(
+                    model_serializer(qs.all(), many=True).data))
+                after = self._time(repeat, lambda: FastJSONRenderer().render(
+                    values_serializer().to_representation(values_serializer().get_rows(qs.all()))))
+                self.stdout.write(
+                    f"{label:<10} ModelSerializer: {rows / before:>10,.0f} rows/s   "
+                    f"ValuesSerializer: {rows / after:>10,.0f} rows/s   "
+                    f"({before / after:.1f}x)"
+                )
+            transaction.set_rollback(True)
+
+    def _time(self, repeat, func):
+        """Returns the best wall-clock time over `repeat` runs."""
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    def _create_sample_rows(self, rows):
+        admin = User.objects.create_user(
+            username='bench-admin', email='bench-admin@example.com', role='admin')
+        user = User.objects.create_user(
+            username='bench-user', email='bench-user@example.com', managed_by=admin)
+        project = ClientProject.objects.create(
+            name='Benchmark Project', start_date=datetime.date.today(),
+            created_by=admin, managed_by=admin)
+        prices = Price.objects.bulk_create(
+            Price(category=f'Folder {i}', rate='1.00', managed_by=admin) for i in range(25))
+        today = datetime.date.today()
+        WorkEntry.objects.bulk_create(
+            WorkEntry(user=user, project=project, tenant=admin, price=prices[i % 25],
+                      quantity=i % 40 + 1, date=today - datetime.timedelta(days=i % 365))
+            for i in range(rows)
+        )
+        return WorkEntry.objects.filter(project=project).select_related('price').order_by('-date')
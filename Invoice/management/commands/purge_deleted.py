@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         purge_deleted.py
+# Purpose:      Purges deleted projects and users in the background.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Runs the queued PurgeJobs: deletes the work entries of deleted projects and
+users in batches, then the objects themselves.
+
+Usage:  python manage.py purge_deleted               (run what is queued, then exit)
+        python manage.py purge_deleted --loop        (keep polling, e.g. as a service)
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from Invoice.purge import DEFAULT_BATCH_SIZE, claim_purge_job, run_purge_job
+
+
+class Command(BaseCommand):
+    help = "Purges soft-deleted projects and users in bounded batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep polling for new jobs instead of exiting.")
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help="Seconds to wait between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            while (job := claim_purge_job()) is not None:
+                self.stdout.write(f"Deleting {job.label}: {job.total_rows} dependent rows.")
+                try:
+                    run_purge_job(job, options['batch_size'], progress=self._report)
+                except Exception as exc:  # Recorded on the job; go on with the next one.
+                    self.stderr.write(f"Deleting {job.label} failed: {exc}")
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"Deleted {job.label}."))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def _report(self, job):
+        self.stdout.write(f"  {job.deleted_rows}/{job.total_rows} rows ({job.progress}%)")
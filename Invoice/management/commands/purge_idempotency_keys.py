@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         purge_idempotency_keys.py
+# Purpose:      Deletes expired idempotency keys.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Deletes stored Idempotency-Key responses past their expiry. Meant to run
+daily (e.g. from cron):
+
+Usage:  python manage.py purge_idempotency_keys
+"""
+
+from django.core.management.base import BaseCommand
+
+from Invoice.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Deletes expired idempotency keys."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        count = purge_expired_keys(options['batch_size'])
+        self.stdout.write(f"Deleted {count} expired idempotency key(s).")
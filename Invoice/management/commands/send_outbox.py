@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         send_outbox.py
+# Purpose:      Sends queued emails from the email outbox.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Drains the email outbox through the configured EMAIL_BACKEND.
+
+Usage:  python manage.py send_outbox               (send what is due, then exit)
+        python manage.py send_outbox --loop        (keep polling, e.g. as a service)
+
+With the console backend (the local default) messages are printed to
+stdout instead of being delivered.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from Invoice.outbox import MAX_ATTEMPTS, send_due_emails
+
+
+class Command(BaseCommand):
+    help = "Sends due emails from the outbox in batches over one connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS)
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep polling for new emails instead of exiting.")
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help="Seconds to wait between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            total_sent = total_failed = 0
+            while True:
+                sent, failed = send_due_emails(options['batch_size'], options['max_attempts'])
+                total_sent += sent
+                total_failed += failed
+                # A short batch means nothing else is due right now.
+                if sent + failed < options['batch_size']:
+                    break
+            if total_sent or total_failed or not options['loop']:
+                self.stdout.write(f"Sent {total_sent} email(s), {total_failed} failed.")
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
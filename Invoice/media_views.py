@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         media_views.py
+# Purpose:      Authenticated serving of uploaded project attachments.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Serves files under MEDIA_URL to the users allowed to see them.
+
+A file is served if it is the attachment of a project the user can access.
+The response is either handed to the front-end server (ATTACHMENT_SENDFILE
+set to 'x-accel-redirect' for nginx or 'x-sendfile' for Apache/lighttpd) or
+streamed from disk in chunks, with single-range requests answered by a 206.
+Content-addressed files never change, so they are cached for a year.
+
+Uploads are untrusted and served from the app's own origin, so only the
+types in INLINE_CONTENT_TYPES are shown in the browser; everything else
+(HTML, SVG, ...) is sent as a download. Every response is also sandboxed
+and exempt from MIME sniffing, so a file cannot run script as the viewer.
+"""
+
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, quote_etag
+from rest_framework import exceptions
+
+from .authentication import CachedJWTAuthentication
+from .models import ClientProject
+from .storage import content_digest
+
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+# Types that cannot carry script; SVG is deliberately not among them.
+INLINE_CONTENT_TYPES = {
+    'application/pdf', 'image/gif', 'image/jpeg', 'image/png', 'image/webp',
+}
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _request_user(request):
+    """Returns the session or JWT user, or None for anonymous requests."""
+    if request.META.get('HTTP_AUTHORIZATION'):
+        try:
+            result = CachedJWTAuthentication().authenticate(request)
+        except exceptions.AuthenticationFailed:
+            return None
+        if result:
+            return result[0]
+    return request.user if request.user.is_authenticated else None
+
+
+def _visible_projects(user):
+    if user.role == 'super_admin':
+        return ClientProject.objects.all()
+    if user.role == 'admin':
+        return ClientProject.objects.filter(managed_by=user)
+    if user.managed_by_id:
+        return ClientProject.objects.filter(managed_by_id=user.managed_by_id)
+    return ClientProject.objects.none()
+
+
+def _parse_range(header, size):
+    """
+    Returns (start, end) for a single satisfiable byte range, None to serve
+    the whole file (no header, or one we don't handle such as multi-range),
+    or False if the range is not satisfiable.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # A suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def media_view(request, name):
+    """Serves one stored media file after an access check."""
+    user = _request_user(request)
+    if user is None:
+        return redirect_to_login(request.get_full_path())
+
+    name = name.lstrip('/')
+    if not _visible_projects(user).filter(attachment=name).exists():
+        raise Http404("File not found.")
+
+    storage = ClientProject._meta.get_field('attachment').storage
+    try:
+        path = storage.path(name)
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        raise Http404("File not found.")
+
+    digest = content_digest(name)
+    etag = quote_etag(digest or f"{stat.st_size:x}-{int(stat.st_mtime):x}")
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        return not_modified
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    sendfile = getattr(settings, 'ATTACHMENT_SENDFILE', None)
+    byte_range = None if sendfile else _parse_range(request.META.get('HTTP_RANGE'), stat.st_size)
+    if request.META.get('HTTP_IF_RANGE') and request.META['HTTP_IF_RANGE'] != etag:
+        byte_range = None
+
+    if sendfile == 'x-accel-redirect':
+        # nginx serves the file (and any Range) from its internal location.
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = getattr(settings, 'ATTACHMENT_ACCEL_PREFIX', '/protected-media/') + name
+    elif sendfile == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    elif byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{stat.st_size}"
+        return response
+    elif byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(path, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f"bytes {start}-{end}/{stat.st_size}"
+    else:
+        # FileResponse streams the open file in chunks (or via wsgi.file_wrapper).
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+
+    response['Content-Disposition'] = content_disposition_header(
+        content_type not in INLINE_CONTENT_TYPES, os.path.basename(name))
+    response['X-Content-Type-Options'] = 'nosniff'
+    response['Content-Security-Policy'] = 'sandbox'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if digest:
+        patch_cache_control(response, private=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Invoice', '0008_remove_templateitem_template_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workentry',
+            index=models.Index(fields=['project', 'date'], name='workentry_project_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workentry',
+            index=models.Index(fields=['user', 'date'], name='workentry_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-19 09:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Invoice', '0010_price_clientproject_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workentry',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('upsert', 'Created or Updated'), ('delete', 'Deleted')], max_length=6)),
+                ('tenant_id', models.UUIDField(blank=True, null=True)),
+                ('owner_id', models.UUIDField(blank=True, null=True)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tenant_id', 'id'], name='changelog_tenant_seq_idx'), models.Index(fields=['owner_id', 'id'], name='changelog_owner_seq_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models, transaction
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 5000
+
+
+def backfill_tenants(apps, schema_editor):
+    """Copies each project's managing admin onto its work entries, in id-range batches."""
+    WorkEntry = apps.get_model('Invoice', 'WorkEntry')
+    ClientProject = apps.get_model('Invoice', 'ClientProject')
+    db_alias = schema_editor.connection.alias
+
+    entries = WorkEntry.objects.using(db_alias)
+    bounds = entries.aggregate(low=models.Min('id'), high=models.Max('id'))
+    if bounds['low'] is None:
+        return
+    managing_admin = Subquery(
+        ClientProject.objects.using(db_alias)
+        .filter(pk=OuterRef('project_id')).values('managed_by_id')[:1]
+    )
+    for start in range(bounds['low'], bounds['high'] + 1, BATCH_SIZE):
+        with transaction.atomic(using=db_alias):
+            entries.filter(
+                id__gte=start, id__lt=start + BATCH_SIZE, project__isnull=False,
+            ).update(tenant_id=managing_admin)
+
+
+class Migration(migrations.Migration):
+
+    # Each backfill batch commits on its own.
+    atomic = False
+
+    dependencies = [
+        ('Invoice', '0012_user_email_lower_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workentry',
+            name='tenant',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tenant_work_entries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_tenants, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='workentry',
+            index=models.Index(fields=['tenant', 'date'], name='workentry_tenant_date_idx'),
+        ),
+    ]
@@ -0,0 +1,111 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:40
+
+from collections import Counter, defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 5000
+
+
+def _match(prices, category):
+    """
+    Returns the id of the price in ``prices`` ({name: [(category, id)]})
+    that ``category`` names: an exact match, else the only case-insensitive
+    one. Ambiguous names match nothing.
+    """
+    candidates = prices.get(category.strip().lower(), ())
+    exact = [price_id for name, price_id in candidates if name == category.strip()]
+    if len(exact) == 1:
+        return exact[0]
+    if len(candidates) == 1:
+        return candidates[0][1]
+    return None
+
+
+def link_prices(apps, schema_editor):
+    """
+    Points each work entry at the Price its category names among the prices
+    of the entry's admin (the project's managing admin, else the user's),
+    falling back to the system prices that no admin manages. Another
+    admin's price is never used: it would put their rate on this tenant's
+    invoices. Entries that match nothing, or only ambiguously, keep their
+    legacy_category text and are reported.
+    """
+    WorkEntry = apps.get_model('Invoice', 'WorkEntry')
+    Price = apps.get_model('Invoice', 'Price')
+    db_alias = schema_editor.connection.alias
+
+    # admin id (None for system prices) -> lower-cased name -> [(name, id)]
+    by_admin = defaultdict(lambda: defaultdict(list))
+    for price_id, admin_id, category in Price.objects.using(db_alias).values_list('id', 'managed_by_id', 'category'):
+        by_admin[admin_id][category.strip().lower()].append((category.strip(), price_id))
+    system_prices = by_admin.get(None, {})
+
+    entries = WorkEntry.objects.using(db_alias)
+    bounds = entries.aggregate(low=models.Min('id'), high=models.Max('id'))
+    if bounds['low'] is None:
+        return
+
+    orphans = Counter()
+    for start in range(bounds['low'], bounds['high'] + 1, BATCH_SIZE):
+        batch = entries.filter(id__gte=start, id__lt=start + BATCH_SIZE).values_list(
+            'id', 'legacy_category', 'tenant_id', 'user__managed_by_id')
+        linked = []
+        for entry_id, category, tenant_id, user_admin_id in batch:
+            admin_id = tenant_id or user_admin_id
+            price_id = _match(by_admin.get(admin_id, {}), category) if admin_id else None
+            if price_id is None:
+                price_id = _match(system_prices, category)
+            if price_id is None:
+                orphans[category] += 1
+            else:
+                linked.append(WorkEntry(id=entry_id, price_id=price_id))
+        with transaction.atomic(using=db_alias):
+            WorkEntry.objects.using(db_alias).bulk_update(linked, ['price'], batch_size=1000)
+
+    if orphans:
+        print(f"\n  {sum(orphans.values())} work entries match no price and keep their legacy category:")
+        for category, count in orphans.most_common():
+            print(f"    {category!r}: {count}")
+
+
+def restore_categories(apps, schema_editor):
+    """Copies the linked price's category back into legacy_category."""
+    WorkEntry = apps.get_model('Invoice', 'WorkEntry')
+    Price = apps.get_model('Invoice', 'Price')
+    db_alias = schema_editor.connection.alias
+    WorkEntry.objects.using(db_alias).filter(price__isnull=False).update(
+        legacy_category=models.Subquery(
+            Price.objects.using(db_alias).filter(pk=models.OuterRef('price_id')).values('category')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    # Each backfill batch commits on its own.
+    atomic = False
+
+    dependencies = [
+        ('Invoice', '0013_workentry_tenant'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='workentry',
+            old_name='category',
+            new_name='legacy_category',
+        ),
+        migrations.AlterField(
+            model_name='workentry',
+            name='legacy_category',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='workentry',
+            name='price',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='work_entries', to='Invoice.price'),
+        ),
+        migrations.RunPython(link_prices, restore_categories),
+    ]
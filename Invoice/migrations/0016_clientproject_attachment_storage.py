@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:36
+
+import Invoice.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Invoice', '0015_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='clientproject',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, storage=Invoice.storage.attachment_storage, upload_to='project_attachments/', validators=[Invoice.storage.validate_attachment_size]),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Invoice', '0016_clientproject_attachment_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedWorkEntry',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('legacy_category', models.CharField(blank=True, max_length=100)),
+                ('quantity', models.PositiveIntegerField()),
+                ('date', models.DateField()),
+                ('updated_at', models.DateTimeField()),
+                ('price', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='+', to='Invoice.price')),
+                ('project', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='Invoice.clientproject')),
+                ('tenant', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', 'date'], name='archivedentry_project_date_idx'), models.Index(fields=['user', 'date'], name='archivedentry_user_date_idx'), models.Index(fields=['tenant', 'date'], name='archivedentry_tenant_date_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkEntryMonthlyTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month.')),
+                ('category', models.CharField(blank=True, max_length=100)),
+                ('quantity', models.PositiveBigIntegerField()),
+                ('entry_count', models.PositiveIntegerField()),
+                ('price', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='Invoice.price')),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='Invoice.clientproject')),
+                ('tenant', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tenant', 'month'], name='monthlytotal_tenant_month_idx'), models.Index(fields=['month'], name='monthlytotal_month_idx')],
+            },
+        ),
+    ]
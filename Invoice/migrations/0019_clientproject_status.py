@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Invoice', '0018_soft_delete_purgejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clientproject',
+            name='status',
+            field=models.CharField(choices=[('active', 'Active'), ('archived', 'Archived')], default='active', max_length=8),
+        ),
+        migrations.AddIndex(
+            model_name='clientproject',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('status', 'active')), fields=['managed_by', 'name'], name='project_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientproject',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('status', 'active')), fields=['end_date'], name='project_active_end_idx'),
+        ),
+    ]
@@ -15,7 +15,29 @@
 
 import uuid
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
+from django.db.models.functions import Coalesce, Lower
+from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .storage import attachment_storage, validate_attachment_size
+
+
+class SoftDeleteManager(models.Manager):
+    """
+    Default manager that hides rows marked deleted; they are removed later by
+    the purge_deleted command (see Invoice/purge.py).
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class UserManager(BaseUserManager):
+    """The auth UserManager, hiding users marked deleted."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
 
 
 class User(AbstractUser):
@@ -39,19 +61,71 @@ class User(AbstractUser):
         blank=True,
         related_name='managed_users'
     )
+    # Set when the user is deleted; the row is purged in the background.
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = UserManager()
+    all_objects = BaseUserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Logins look users up by case-insensitive email.
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+        ]
 
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
 
 
+class ClientProjectQuerySet(models.QuerySet):
+    """QuerySet for ClientProject with the active/archived split."""
+
+    def active(self):
+        """Projects still taking work: what dropdowns and lists show by default."""
+        return self.filter(status='active')
+
+
+# Partial index condition: the rows the hot project lists read.
+ACTIVE_PROJECTS = models.Q(status='active', deleted_at__isnull=True)
+
+
 class ClientProject(models.Model):
     """Represents a client project owned by an admin."""
+    STATUS_CHOICES = (
+        ('active', 'Active'),
+        ('archived', 'Archived'),
+    )
+
     name = models.CharField(max_length=255)
     start_date = models.DateField()
     end_date = models.DateField(null=True, blank=True)
-    attachment = models.FileField(upload_to='project_attachments/', null=True, blank=True)
+    attachment = models.FileField(
+        upload_to='project_attachments/',
+        storage=attachment_storage,
+        validators=[validate_attachment_size],
+        null=True,
+        blank=True
+    )
     created_by = models.ForeignKey(User, related_name='projects_created', on_delete=models.CASCADE)
     managed_by = models.ForeignKey(User, related_name='managed_projects', on_delete=models.CASCADE, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Set when the project is deleted; the row and its work entries are
+    # purged in the background.
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Archived projects (set by the archive_projects command once end_date has
+    # passed) drop out of the dropdowns but stay reachable for invoices.
+    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default='active')
+
+    objects = SoftDeleteManager.from_queryset(ClientProjectQuerySet)()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # Only active projects are indexed, so the indexes stay small as
+            # finished projects pile up.
+            models.Index(fields=['managed_by', 'name'], condition=ACTIVE_PROJECTS, name='project_active_name_idx'),
+            models.Index(fields=['end_date'], condition=ACTIVE_PROJECTS, name='project_active_end_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -62,6 +136,7 @@ class Price(models.Model):
     category = models.CharField(max_length=100)
     rate = models.DecimalField(max_digits=10, decimal_places=2)
     managed_by = models.ForeignKey(User, related_name='managed_prices', on_delete=models.CASCADE, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         # A category name must be unique per admin.
@@ -73,14 +148,286 @@ class Price(models.Model):
         return f"({owner}) {self.category}: ${self.rate}"
 
 
+def work_entry_category():
+    """
+    Expression for a work entry's category name in queries, matching
+    WorkEntry.category.
+    """
+    return Coalesce('price__category', 'legacy_category')
+
+
+class WorkEntryQuerySet(models.QuerySet):
+    """QuerySet for WorkEntry with role-based scoping."""
+
+    def visible(self):
+        """
+        Excludes the entries of soft-deleted projects and users, which stay
+        in the table until purge_deleted removes them.
+        """
+        return self.exclude(project__deleted_at__isnull=False).exclude(user__deleted_at__isnull=False)
+
+    def for_user(self, user):
+        """
+        Returns the entries a user may see: everything for super admins,
+        their tenant's entries for admins and their own for regular users.
+        """
+        if user.role == 'super_admin':
+            return self.visible()
+        if user.role == 'admin':
+            return self.filter(tenant=user).visible()
+        return self.filter(user=user).visible()
+
+
 class WorkEntry(models.Model):
     """A single log of work done by a user."""
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     project = models.ForeignKey(ClientProject, on_delete=models.CASCADE, null=True, blank=True)
-    category = models.CharField(max_length=100)
+    # The admin managing the project, copied from it on save so tenant-scoped
+    # queries don't have to join ClientProject. Indexed by (tenant, date).
+    tenant = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=False,
+        related_name='tenant_work_entries'
+    )
+    price = models.ForeignKey(
+        Price,
+        # Prices can't be deleted while entries use them, except together
+        # with their admin (whose projects and entries cascade too).
+        on_delete=models.RESTRICT,
+        null=True,
+        blank=True,
+        related_name='work_entries'
+    )
+    # The free-text category entries were stored with before they referenced
+    # Price. Only shown for old entries whose category matched no price.
+    legacy_category = models.CharField(max_length=100, blank=True, editable=False)
     quantity = models.PositiveIntegerField()
     date = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = WorkEntryQuerySet.as_manager()
+
+    class Meta:
+        # Support the dashboard's project/user filters combined with date ranges.
+        indexes = [
+            models.Index(fields=['project', 'date'], name='workentry_project_date_idx'),
+            models.Index(fields=['user', 'date'], name='workentry_user_date_idx'),
+            models.Index(fields=['tenant', 'date'], name='workentry_tenant_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.tenant_id = self.project.managed_by_id if self.project_id else None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'project' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'tenant'}
+        super().save(*args, **kwargs)
+
+    @property
+    def category(self):
+        """The entry's category (folder) name."""
+        return self.price.category if self.price_id else self.legacy_category
 
     def __str__(self):
         project_name = self.project.name if self.project else "No Project"
-        return f"{self.user.username} | {self.quantity} of {self.category} for {project_name}"
\ No newline at end of file
+        return f"{self.user.username} | {self.quantity} of {self.category} for {project_name}"
+
+
+class ArchivedWorkEntry(models.Model):
+    """
+    A work entry moved out of WorkEntry by the archive_work_entries command.
+    Keeps the original id and columns, so invoices and exports can read it
+    alongside the live entries when asked (see Invoice/archive.py).
+    """
+    id = models.BigIntegerField(primary_key=True)
+    # Reverse accessors are left out: archived entries are only read through
+    # this model. The indexes below cover the cascades.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False, related_name='+')
+    project = models.ForeignKey(
+        ClientProject, on_delete=models.CASCADE, null=True, blank=True, db_index=False, related_name='+')
+    tenant = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, db_index=False, related_name='+')
+    price = models.ForeignKey(Price, on_delete=models.RESTRICT, null=True, blank=True, related_name='+')
+    legacy_category = models.CharField(max_length=100, blank=True)
+    quantity = models.PositiveIntegerField()
+    date = models.DateField()
+    updated_at = models.DateTimeField()
+
+    objects = WorkEntryQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'date'], name='archivedentry_project_date_idx'),
+            models.Index(fields=['user', 'date'], name='archivedentry_user_date_idx'),
+            models.Index(fields=['tenant', 'date'], name='archivedentry_tenant_date_idx'),
+        ]
+
+    @property
+    def category(self):
+        """The entry's category (folder) name."""
+        return self.price.category if self.price_id else self.legacy_category
+
+    def __str__(self):
+        return f"Archived entry {self.id} ({self.date})"
+
+
+class WorkEntryMonthlyTotal(models.Model):
+    """
+    Totals of archived work entries per month, user, project and category,
+    so month-level reports don't need the archive.
+    """
+    month = models.DateField(help_text="First day of the month.")
+    tenant = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, db_index=False, related_name='+')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    project = models.ForeignKey(ClientProject, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    price = models.ForeignKey(Price, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    category = models.CharField(max_length=100, blank=True)
+    quantity = models.PositiveBigIntegerField()
+    entry_count = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant', 'month'], name='monthlytotal_tenant_month_idx'),
+            models.Index(fields=['month'], name='monthlytotal_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} | {self.category}: {self.quantity}"
+
+
+class ChangeLog(models.Model):
+    """
+    Append-only record of writes to synced models. The auto-increment id is
+    the sync sequence; 'delete' rows are the tombstones of deleted objects.
+    """
+    ACTION_CHOICES = (
+        ('upsert', 'Created or Updated'),
+        ('delete', 'Deleted'),
+    )
+
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=6, choices=ACTION_CHOICES)
+    # Owning admin of the row, and the submitting user for work entries.
+    tenant_id = models.UUIDField(null=True, blank=True)
+    owner_id = models.UUIDField(null=True, blank=True)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant_id', 'id'], name='changelog_tenant_seq_idx'),
+            models.Index(fields=['owner_id', 'id'], name='changelog_owner_seq_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.action} {self.model}:{self.object_id}"
+
+
+class EmailOutbox(models.Model):
+    """
+    An email waiting to be sent by the send_outbox command. Rows are written
+    in the same transaction as the change that triggers them, so a message is
+    queued if and only if that change commits.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    # Bodies may contain credentials, so they are cleared once sent.
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # End of the lease of the sender working on a 'sending' row.
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
+
+
+class PurgeJob(models.Model):
+    """
+    Background deletion of a project or user marked deleted, together with
+    the work entries that depend on it. Run by the purge_deleted command in
+    bounded batches, recording progress as it goes.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    model = models.CharField(max_length=20)
+    object_id = models.CharField(max_length=64)
+    label = models.CharField(max_length=255)
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default='pending')
+    total_rows = models.PositiveBigIntegerField(default=0)
+    deleted_rows = models.PositiveBigIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='purgejob_status_idx'),
+        ]
+
+    @property
+    def progress(self):
+        """Percentage of the dependent rows deleted so far."""
+        if self.status == 'done':
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(99, self.deleted_rows * 100 // self.total_rows)
+
+    def __str__(self):
+        return f"Delete {self.label} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    The response to a create request sent with an Idempotency-Key header.
+    A retry with the same key gets this response back instead of creating
+    the object again, until the key expires. See Invoice/idempotency.py.
+    """
+    # Covered by the (user, key) constraint.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False, related_name='+')
+    key = models.CharField(max_length=255)
+    # Fingerprint of the method, path and body the key was first used with.
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.status_code or 'pending'})"
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         outbox.py
+# Purpose:      Transactional email outbox and its batch sender.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Outbox-based email delivery.
+
+Views queue messages with queue_email() / queue_emails() inside the
+transaction that creates whatever the email is about, and return without
+talking to the mail server. The send_outbox management command drains the
+queue with send_due_emails(): a batch at a time, over one connection from
+get_connection(), retrying failures with exponential backoff. Batches are
+leased (status 'sending') rather than kept locked while the mail server is
+talked to.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+MAX_ATTEMPTS = 5
+# Delay before retry n is RETRY_BASE * 2**(n - 1): 1, 2, 4, 8 minutes.
+RETRY_BASE = datetime.timedelta(minutes=1)
+# How long a sender may hold a claimed batch before another may take it over.
+SEND_LEASE = datetime.timedelta(minutes=10)
+
+# Fields written once an email was sent or failed.
+OUTCOME_FIELDS = ['status', 'attempts', 'last_error', 'next_attempt_at', 'locked_until', 'sent_at', 'body', 'html_body']
+
+
+def _outbox_row(to_email, subject, body, html_body=''):
+    return EmailOutbox(to_email=to_email, subject=subject, body=body, html_body=html_body)
+
+
+def queue_email(to_email, subject, body, html_body=''):
+    """Queues one email for the sender."""
+    row = _outbox_row(to_email, subject, body, html_body)
+    row.save()
+    return row
+
+
+def queue_emails(messages):
+    """Queues (to_email, subject, body, html_body) tuples with one INSERT."""
+    return EmailOutbox.objects.bulk_create(
+        [_outbox_row(*message) for message in messages], batch_size=500)
+
+
+def welcome_email(user, password, admin_name):
+    """
+    Returns the (to_email, subject, body, html_body) of a new user's welcome
+    email, for queue_email() / queue_emails().
+    """
+    message = render_to_string('welcome_email.html', {
+        'user': user,
+        'password': password,
+        'admin_name': admin_name,
+    })
+    return user.email, 'Welcome to InvoiceApp!', message, message
+
+
+def _build_message(row, connection):
+    message = EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[row.to_email],
+        connection=connection,
+    )
+    if row.html_body:
+        message.attach_alternative(row.html_body, 'text/html')
+    return message
+
+
+def _record_failure(row, exc, now, max_attempts):
+    """Counts a failed attempt and schedules the retry, or gives up."""
+    row.attempts += 1
+    row.last_error = f"{type(exc).__name__}: {exc}"
+    row.locked_until = None
+    if row.attempts >= max_attempts:
+        row.status = 'failed'
+    else:
+        row.status = 'pending'
+        row.next_attempt_at = now + RETRY_BASE * 2 ** (row.attempts - 1)
+
+
+def claim_due_emails(batch_size=100, now=None):
+    """
+    Leases up to ``batch_size`` due emails to the caller in one short
+    transaction and returns them. Rows are picked with SELECT ... FOR UPDATE
+    SKIP LOCKED where the database supports it, so several senders can run
+    side by side. A lease left behind by a sender that died is taken over
+    once it runs out.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        rows = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status='pending', next_attempt_at__lte=now)
+                | Q(status='sending', locked_until__lte=now)
+            )
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if rows:
+            locked_until = now + SEND_LEASE
+            EmailOutbox.objects.filter(id__in=[row.id for row in rows]).update(
+                status='sending', locked_until=locked_until)
+            for row in rows:
+                row.status, row.locked_until = 'sending', locked_until
+    return rows
+
+
+def _record_sent(row):
+    row.attempts += 1
+    row.status = 'sent'
+    row.sent_at = timezone.now()
+    row.body = row.html_body = ''
+    row.last_error = ''
+    row.locked_until = None
+
+
+def send_due_emails(batch_size=100, max_attempts=MAX_ATTEMPTS, connection=None):
+    """
+    Sends one batch of due emails and returns (sent, failed) counts.
+
+    The batch is leased in a short transaction and sent outside of any, so a
+    slow mail server never holds a database lock; each outcome is then saved
+    on its own. An email whose outcome was not saved (the sender died) is
+    sent again once its lease runs out.
+    """
+    now = timezone.now()
+    rows = claim_due_emails(batch_size, now)
+    if not rows:
+        return 0, 0
+
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as exc:  # The whole batch is retried later.
+        for row in rows:
+            _record_failure(row, exc, now, max_attempts)
+        EmailOutbox.objects.bulk_update(rows, OUTCOME_FIELDS)
+        return 0, len(rows)
+
+    sent = failed = 0
+    try:
+        for row in rows:
+            try:
+                _build_message(row, connection).send()
+            except Exception as exc:  # Any transport error is retried.
+                _record_failure(row, exc, now, max_attempts)
+                failed += 1
+            else:
+                _record_sent(row)
+                sent += 1
+            row.save(update_fields=OUTCOME_FIELDS)
+    finally:
+        connection.close()
+    return sent, failed
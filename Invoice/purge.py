@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         purge.py
+# Purpose:      Soft deletion and batched background purging.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Deletion of projects and users without loading their work entries.
+
+Django's delete() collects every cascading row into memory before deleting
+it, which times out (or runs out of memory) for a project with hundreds of
+thousands of entries. soft_delete() instead marks the object deleted, which
+hides it from the default managers at once, and queues a PurgeJob.
+run_purge_job() (from the purge_deleted command) then deletes the dependent
+work entries in bounded batches, recording progress, and finally deletes the
+object itself, whose remaining cascades are small.
+"""
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .archive import check_raw_deletable
+from .models import ArchivedWorkEntry, ClientProject, PurgeJob, User, WorkEntry
+from .sync import ENTRY_OWNER_FIELDS, record_entry_tombstones
+
+PURGEABLE_MODELS = {model._meta.model_name: model for model in (ClientProject, User)}
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+def _dependent_filters(obj):
+    """Returns the Q filters selecting the work entries deleted along with ``obj``."""
+    if isinstance(obj, ClientProject):
+        return [Q(project=obj)]
+    # A user's own entries, and for an admin those of their projects and prices.
+    return [Q(user=obj), Q(tenant=obj), Q(project__created_by=obj), Q(price__managed_by=obj)]
+
+
+def _dependent_querysets(obj):
+    for model in (WorkEntry, ArchivedWorkEntry):
+        for condition in _dependent_filters(obj):
+            yield model.objects.filter(condition)
+
+
+def _count_dependents(obj):
+    condition = Q()
+    for part in _dependent_filters(obj):
+        condition |= part
+    return sum(model.objects.filter(condition).count() for model in (WorkEntry, ArchivedWorkEntry))
+
+
+@transaction.atomic
+def soft_delete(obj, requested_by=None):
+    """
+    Marks a project or user deleted and queues its purge. Returns the
+    PurgeJob. A deleted user can no longer log in, and their email and
+    username are released straight away.
+    """
+    label = f"{obj._meta.verbose_name} '{obj}'"
+    obj.deleted_at = timezone.now()
+    update_fields = ['deleted_at']
+    if isinstance(obj, User):
+        obj.is_active = False
+        obj.email = f"deleted-{obj.pk}@deleted.invalid"
+        obj.username = f"deleted-{obj.pk}"
+        update_fields += ['is_active', 'email', 'username']
+    else:
+        update_fields.append('updated_at')
+    # Saving sends the usual signals: caches are bumped and sync clients see
+    # the project leave their scope.
+    obj.save(update_fields=update_fields)
+
+    return PurgeJob.objects.create(
+        model=obj._meta.model_name, object_id=str(obj.pk), label=label,
+        total_rows=_count_dependents(obj), requested_by=requested_by,
+    )
+
+
+def claim_purge_job():
+    """Marks the oldest pending job running and returns it, or None."""
+    with transaction.atomic():
+        job = (
+            PurgeJob.objects.select_for_update(skip_locked=True)
+            .filter(status='pending').order_by('id').first()
+        )
+        if job is None:
+            return None
+        job.status = 'running'
+        job.started_at = job.started_at or timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+    return job
+
+
+def _delete_batch(queryset, batch_size):
+    """Deletes up to ``batch_size`` rows of ``queryset``; returns how many."""
+    model = queryset.model
+    with transaction.atomic():
+        if model is WorkEntry:
+            rows = list(queryset.order_by().values(*ENTRY_OWNER_FIELDS)[:batch_size])
+            record_entry_tombstones(rows)
+            ids = [row['id'] for row in rows]
+        else:
+            ids = list(queryset.order_by().values_list('id', flat=True)[:batch_size])
+        if ids:
+            # Nothing references work entries, so the rows can go in one
+            # statement without the collector; tombstones are recorded above.
+            check_raw_deletable(model)
+            batch = model.objects.filter(id__in=ids)
+            batch._raw_delete(batch.db)
+    return len(ids)
+
+
+def run_purge_job(job, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Deletes the job's dependent work entries batch by batch, then the object
+    itself. ``progress(job)`` is called after each batch. A failed job keeps
+    its error and can be set back to pending; every step is safe to repeat.
+    """
+    model = PURGEABLE_MODELS[job.model]
+    try:
+        obj = model.all_objects.filter(pk=job.object_id).first()
+        if obj is not None:
+            for queryset in _dependent_querysets(obj):
+                while deleted := _delete_batch(queryset, batch_size):
+                    job.deleted_rows += deleted
+                    job.save(update_fields=['deleted_rows'])
+                    if progress:
+                        progress(job)
+            # What is left (prices, empty projects, totals) is small.
+            model.all_objects.filter(pk=obj.pk).delete()
+    except Exception as exc:
+        job.status = 'failed'
+        job.last_error = f"{type(exc).__name__}: {exc}"
+        job.save(update_fields=['status', 'last_error'])
+        raise
+
+    job.status = 'done'
+    job.finished_at = timezone.now()
+    job.last_error = ''
+    job.save(update_fields=['status', 'finished_at', 'last_error'])
+    return job
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         renderers.py
+# Purpose:      Custom DRF renderers for the Invoice application's API.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+API Renderers for the Invoice application.
+
+FastJSONRenderer encodes responses with orjson when it is installed and falls
+back to DRF's standard JSONRenderer otherwise, so the output is the same JSON
+either way, only produced faster.
+"""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up.
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """A drop-in JSONRenderer that uses orjson for compact output."""
+    _encoder = encoders.JSONEncoder()
+    _options = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if orjson else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Renders compact JSON with orjson. Indented output (as requested by the
+        browsable API) and non-compact settings use the standard renderer.
+        """
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Decimals, lazy strings, datetimes etc. go through DRF's own encoder
+        # so their representation matches the standard renderer exactly.
+        ret = orjson.dumps(data, default=self._encoder.default, option=self._options)
+
+        # Keep the output a strict JavaScript subset, as JSONRenderer does.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
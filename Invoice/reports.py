@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         reports.py
+# Purpose:      Pivot reports over work entries.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Pivot tables of work entries: who did how much of which folder, when.
+
+pivot() groups the entries by a row and a column dimension and computes the
+requested measures in one grouped query, then places the grouped rows into
+per-measure matrices with row, column and grand totals. The database does
+the aggregation, so the Python side only touches one record per cell.
+"""
+
+from collections import namedtuple
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek
+from openpyxl import Workbook
+
+from .models import work_entry_category
+
+# ``key`` identifies a row/column; ``label`` (if set) is shown instead of it.
+Dimension = namedtuple('Dimension', 'title key label format')
+
+DIMENSIONS = {
+    'user': Dimension('User', F('user_id'), F('user__username'), str),
+    'project': Dimension('Project', F('project_id'), F('project__name'), str),
+    'category': Dimension('Folder Name', work_entry_category(), None, str),
+    'day': Dimension('Day', F('date'), None, lambda date: date.isoformat()),
+    'week': Dimension('Week', TruncWeek('date'), None, lambda date: date.strftime('%G-W%V')),
+    'month': Dimension('Month', TruncMonth('date'), None, lambda date: date.strftime('%Y-%m')),
+}
+
+AMOUNT_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+MEASURES = {
+    'count': ('Entries', lambda: Count('id')),
+    'quantity': ('Quantity', lambda: Coalesce(Sum('quantity'), 0)),
+    # Billable amount at the current rate of each entry's price.
+    'amount': ('Amount', lambda: Coalesce(
+        Sum(ExpressionWrapper(F('quantity') * F('price__rate'), output_field=AMOUNT_FIELD)),
+        Value(0), output_field=AMOUNT_FIELD,
+    )),
+}
+
+# Larger tables are refused rather than built.
+MAX_CELLS = 100_000
+
+
+class PivotTooLarge(Exception):
+    pass
+
+
+def _headers(dimension, labels):
+    """Returns the sorted headers of one axis from {key: label}."""
+    def sort_key(item):
+        key, label = item
+        shown = label if dimension.label is not None else key
+        return (shown is None, shown if shown is not None else '')
+
+    headers = []
+    for key, label in sorted(labels.items(), key=sort_key):
+        shown = label if dimension.label is not None else key
+        headers.append({'key': key, 'label': dimension.format(shown) if shown is not None else "(none)"})
+    return headers
+
+
+def pivot(queryset, rows, columns=None, measures=('quantity',)):
+    """
+    Pivots ``queryset`` (work entries) by the ``rows`` and optional
+    ``columns`` dimension names, computing each of ``measures``.
+    """
+    axes = {'row': DIMENSIONS[rows]}
+    if columns:
+        axes['col'] = DIMENSIONS[columns]
+
+    group_by = {}
+    for axis, dimension in axes.items():
+        group_by[axis] = dimension.key
+        if dimension.label is not None:
+            group_by[f'{axis}_label'] = dimension.label
+    records = list(
+        queryset.order_by().values(**group_by)
+        # Prefixed so a measure doesn't shadow the field it sums.
+        .annotate(**{f'measure_{name}': MEASURES[name][1]() for name in measures})
+    )
+
+    labels = {axis: {} for axis in ('row', 'col')}
+    for record in records:
+        labels['row'][record['row']] = record.get('row_label')
+        if columns:
+            labels['col'][record['col']] = record.get('col_label')
+    row_headers = _headers(axes['row'], labels['row'])
+    col_headers = _headers(axes['col'], labels['col']) if columns else [{'key': None, 'label': "Total"}]
+    if len(row_headers) * len(col_headers) > MAX_CELLS:
+        raise PivotTooLarge(
+            f"The report would have {len(row_headers)} x {len(col_headers)} cells; "
+            f"narrow the filters or choose coarser dimensions.")
+
+    row_index = {header['key']: i for i, header in enumerate(row_headers)}
+    col_index = {header['key']: i for i, header in enumerate(col_headers)}
+    values = {name: [[0] * len(col_headers) for _ in row_headers] for name in measures}
+    for record in records:
+        r = row_index[record['row']]
+        c = col_index[record['col']] if columns else 0
+        for name in measures:
+            values[name][r][c] = record[f'measure_{name}']
+
+    return {
+        'rows': {'dimension': rows, 'title': axes['row'].title, 'headers': row_headers},
+        'columns': {
+            'dimension': columns,
+            'title': axes['col'].title if columns else "",
+            'headers': col_headers,
+        },
+        'measures': list(measures),
+        'values': values,
+        'row_totals': {name: [sum(row) for row in matrix] for name, matrix in values.items()},
+        'column_totals': {name: [sum(column) for column in zip(*matrix)] for name, matrix in values.items()},
+        'grand_total': {name: sum(sum(row) for row in matrix) for name, matrix in values.items()},
+    }
+
+
+def pivot_workbook(report):
+    """Writes a pivot() result to a workbook, one sheet per measure."""
+    wb = Workbook(write_only=True)
+    col_labels = [header['label'] for header in report['columns']['headers']]
+    for name in report['measures']:
+        ws = wb.create_sheet(MEASURES[name][0])
+        ws.append([report['rows']['title'], *col_labels, "Total"])
+        for header, row, total in zip(report['rows']['headers'], report['values'][name], report['row_totals'][name]):
+            ws.append([header['label'], *row, total])
+        ws.append(["Total", *report['column_totals'][name], report['grand_total'][name]])
+    return wb
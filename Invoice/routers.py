@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         routers.py
+# Purpose:      Routes analytics and export reads to the read replica.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Read-replica routing for the heavy read paths.
+
+Only code running inside replica_reads() (the dashboard, admin panel,
+invoice and export views, via @use_replica or ReplicaReadMixin) reads from
+the 'replica' alias; everything else, and every write, uses 'default'.
+
+Replicas lag behind the primary, so a user who has just saved something
+would not see it on the dashboard. PrimaryPinningMiddleware pins a user's
+reads to the primary during write requests and, through a short-lived
+cookie, for REPLICA_PIN_SECONDS afterwards.
+"""
+
+import contextvars
+import functools
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+PIN_COOKIE = 'primary_pin'
+DEFAULT_PIN_SECONDS = 5
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+_pinned = contextvars.ContextVar('primary_pinned', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Lets reads in this block go to the replica (unless pinned)."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def pinned_to_primary():
+    """Keeps every read in this block on the primary."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def use_replica(view_func):
+    """Runs a function-based view inside replica_reads()."""
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        with replica_reads():
+            return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaReadMixin:
+    """Runs a DRF view inside replica_reads()."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class ReplicaRouter:
+    """Sends reads to the replica inside replica_reads(), all else to default."""
+
+    def db_for_read(self, model, **hints):
+        if (
+            _replica_reads.get()
+            and not _pinned.get()
+            and REPLICA_DB_ALIAS in settings.DATABASES
+            # Reads inside a transaction must see its own writes.
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_DB_ALIAS
+
+
+class PrimaryPinningMiddleware:
+    """
+    Pins reads to the primary for write requests, and for REPLICA_PIN_SECONDS
+    after a successful one (read-your-writes).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        is_write = request.method not in ('GET', 'HEAD', 'OPTIONS')
+        if not (is_write or PIN_COOKIE in request.COOKIES):
+            return self.get_response(request)
+
+        with pinned_to_primary():
+            response = self.get_response(request)
+        if is_write and response.status_code < 400:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'REPLICA_PIN_SECONDS', DEFAULT_PIN_SECONDS),
+                httponly=True, samesite='Lax',
+                secure=request.is_secure(),
+            )
+        return response
@@ -19,9 +19,12 @@ to native Python datatypes that can then be easily rendered into JSON, XML
 or other content types for use in the REST API.
 """
 
+from decimal import Decimal
+
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
-from .models import User, WorkEntry, Price, ClientProject
+from .models import User, WorkEntry, Price, ClientProject, work_entry_category
+from .reports import DIMENSIONS, MEASURES
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -56,23 +59,87 @@ class RegisterSerializer(serializers.ModelSerializer):
 
 
 class WorkEntrySerializer(serializers.ModelSerializer):
-    """Serializer for creating and listing work entries."""
+    """
+    Serializer for creating and listing work entries.
+    Entries are written with a 'price' id; 'category' is its name.
+    """
+    category = serializers.CharField(read_only=True)
+
     class Meta:
         model = WorkEntry
-        fields = ['id', 'user', 'project', 'category', 'quantity', 'date']
+        fields = ['id', 'user', 'project', 'price', 'category', 'quantity', 'date']
         read_only_fields = ['user']
+        extra_kwargs = {'price': {'required': True, 'allow_null': False}}
+
+    def get_fields(self):
+        """Only offers the projects and prices of the caller's admin."""
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is not None and request.user.role != 'super_admin':
+            user = request.user
+            admin_id = user.pk if user.role == 'admin' else user.managed_by_id
+            fields['project'].queryset = ClientProject.objects.filter(managed_by_id=admin_id)
+            fields['price'].queryset = Price.objects.filter(managed_by_id=admin_id)
+        return fields
+
+    def validate(self, attrs):
+        project = attrs.get('project', getattr(self.instance, 'project', None))
+        price = attrs.get('price', getattr(self.instance, 'price', None))
+        if project and price and price.managed_by_id != project.managed_by_id:
+            raise serializers.ValidationError({'price': "This price does not belong to the project's admin."})
+        return attrs
 
 
 class WorkDashboardSerializer(serializers.ModelSerializer):
     """A read-only serializer for displaying work entries on an admin dashboard."""
     username = serializers.CharField(source='user.username', read_only=True)
-    project_name = serializers.CharField(source='project.name', read_only=True)
+    # Entries without a project get null, as on the values_list() path.
+    project_name = serializers.CharField(source='project.name', read_only=True, default=None)
+    category = serializers.CharField(read_only=True)
 
     class Meta:
         model = WorkEntry
         fields = ['id', 'username', 'project_name', 'category', 'quantity', 'date']
 
 
+class DashboardFilterSerializer(serializers.Serializer):
+    """Validates the optional query parameters accepted by the dashboard API."""
+    project = serializers.IntegerField(required=False)
+    user = serializers.UUIDField(required=False)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        start_date, end_date = attrs.get('start_date'), attrs.get('end_date')
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError("start_date must not be after end_date.")
+        return attrs
+
+
+class ExportFilterSerializer(DashboardFilterSerializer):
+    """Dashboard filters plus whether to include archived entries."""
+    include_archived = serializers.BooleanField(required=False, default=False)
+
+
+class PivotQuerySerializer(DashboardFilterSerializer):
+    """Validates the dimensions, measures and filters of a pivot report."""
+    rows = serializers.ChoiceField(choices=list(DIMENSIONS), default='user')
+    columns = serializers.ChoiceField(choices=list(DIMENSIONS), default='month', allow_blank=True)
+    measures = serializers.CharField(required=False, default='quantity')
+
+    def validate_measures(self, value):
+        measures = split_query_param(value)
+        unknown = [name for name in measures if name not in MEASURES]
+        if unknown or not measures:
+            raise serializers.ValidationError(f"Choose from: {', '.join(MEASURES)}.")
+        return list(dict.fromkeys(measures))
+
+    def validate(self, attrs):
+        if attrs['rows'] == attrs.get('columns'):
+            raise serializers.ValidationError("rows and columns must be different dimensions.")
+        return super().validate(attrs)
+
+
 class PriceSerializer(serializers.ModelSerializer):
     """Serializer for managing prices, intended for admin use."""
     class Meta:
@@ -81,9 +148,237 @@ class PriceSerializer(serializers.ModelSerializer):
         read_only_fields = ['managed_by'] # Owner is set automatically in the view.
 
 
+class PriceImportSerializer(serializers.Serializer):
+    """Validates a price-book upload (CSV or XLSX)."""
+    file = serializers.FileField()
+
+
+class TeamImportSerializer(serializers.Serializer):
+    """Validates a team roster upload (CSV or XLSX)."""
+    file = serializers.FileField()
+
+
+class PriceAdjustSerializer(serializers.Serializer):
+    """Validates a bulk percentage adjustment of the caller's rates."""
+    percent = serializers.DecimalField(max_digits=6, decimal_places=2, min_value=Decimal('-99.99'), max_value=1000)
+
+
+class SyncQuerySerializer(serializers.Serializer):
+    """Validates ?since= (a sync token) and ?limit= for the delta sync API."""
+    since = serializers.IntegerField(required=False, min_value=0)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=5000, default=1000)
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    """A single sub-request of a batch: method, API path and optional JSON body."""
+    method = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False)
+
+    def validate_path(self, value):
+        if not value.startswith('/api/'):
+            raise serializers.ValidationError("Only /api/ paths can be batched.")
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    """An ordered list of sub-requests, optionally run all-or-nothing."""
+    MAX_OPERATIONS = 20
+
+    operations = BatchOperationSerializer(many=True, allow_empty=False, max_length=MAX_OPERATIONS)
+    atomic = serializers.BooleanField(default=False)
+
+
 class ClientProjectSerializer(serializers.ModelSerializer):
     """Serializer for creating and viewing client projects."""
     class Meta:
         model = ClientProject
-        fields = ['id', 'name', 'start_date', 'end_date', 'attachment', 'created_by', 'managed_by']
-        read_only_fields = ['created_by', 'managed_by'] # Owners are set in the view.
\ No newline at end of file
+        fields = ['id', 'name', 'start_date', 'end_date', 'attachment', 'status', 'created_by', 'managed_by']
+        read_only_fields = ['status', 'created_by', 'managed_by'] # Owners are set in the view.
+
+
+# --- Read-only fast serializers for list endpoints ---
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+def split_query_param(value):
+    """Splits a comma-separated query parameter into a list of names."""
+    return [part.strip() for part in (value or '').split(',') if part.strip()]
+
+
+class ValuesSerializer:
+    """
+    A read-only serializer that builds representations straight from
+    ``values_list()`` rows instead of model instances.
+
+    Subclasses declare ``fields`` as ``(name, lookup, converter)`` tuples and
+    may declare ``sideloads`` as ``{name: (fk_lookup, ValuesSerializer)}``.
+    Lookups and converters are compiled once per serializer, so serializing
+    a row is a tuple walk and a ``dict(zip())``. The output matches the
+    equivalent ModelSerializer for the same fields.
+
+    ``fields`` (a subset of names) limits both the output and the selected
+    columns; ``include`` (a subset of ``sideloads``) adds the related objects
+    for the rows, fetched with one query per relation.
+    """
+    model = None
+    fields = ()
+    sideloads = {}
+
+    def __init__(self, context=None, fields=None, include=None):
+        self.context = context or {}
+        declared = {field[0]: field for field in self.fields}
+
+        unknown = [name for name in (fields or ()) if name not in declared]
+        if unknown:
+            raise serializers.ValidationError(
+                {'fields': f"Unknown field(s): {', '.join(unknown)}."})
+        unknown = [name for name in (include or ()) if name not in self.sideloads]
+        if unknown:
+            raise serializers.ValidationError(
+                {'include': f"Cannot include: {', '.join(unknown)}."})
+
+        selected = [declared[name] for name in fields] if fields else list(self.fields)
+        self.include = list(dict.fromkeys(include or ()))
+        self.names = tuple(name for name, _, _ in selected)
+        self.lookups = tuple(lookup for _, lookup, _ in selected)
+        self.converters = tuple(
+            (index, getattr(self, converter) if isinstance(converter, str) else converter)
+            for index, (_, _, converter) in enumerate(selected)
+            if converter is not None
+        )
+
+        # Sideloads need their foreign key even if it was not requested; the
+        # extra columns go after the named ones, so zip() drops them.
+        self.include_columns = {}
+        extra_lookups = []
+        for name in self.include:
+            lookup = self.sideloads[name][0]
+            if lookup in self.lookups:
+                self.include_columns[name] = self.lookups.index(lookup)
+            else:
+                self.include_columns[name] = len(self.lookups) + len(extra_lookups)
+                extra_lookups.append(lookup)
+        self.row_lookups = self.lookups + tuple(extra_lookups)
+
+    @classmethod
+    def from_request(cls, request, context=None):
+        """Builds a serializer from the ?fields= and ?include= parameters."""
+        return cls(
+            context=context,
+            fields=split_query_param(request.query_params.get('fields')) or None,
+            include=split_query_param(request.query_params.get('include')),
+        )
+
+    def get_rows(self, queryset):
+        """Returns a lazy queryset of row tuples for the selected fields."""
+        return queryset.values_list(*self.row_lookups)
+
+    def to_representation(self, rows):
+        """Converts an iterable of row tuples into a list of dicts."""
+        names = self.names
+        if not self.converters:
+            return [dict(zip(names, row)) for row in rows]
+
+        converters = self.converters
+        data = []
+        for row in rows:
+            row = list(row)
+            for index, convert in converters:
+                value = row[index]
+                if value is not None:
+                    row[index] = convert(value)
+            data.append(dict(zip(names, row)))
+        return data
+
+    def get_included(self, rows):
+        """Returns the requested related objects for already-fetched rows."""
+        included = {}
+        for name in self.include:
+            column = self.include_columns[name]
+            ids = {row[column] for row in rows if row[column] is not None}
+            serializer = self.sideloads[name][1](context=self.context)
+            queryset = serializer.get_rows(
+                serializer.model.objects.filter(pk__in=ids).order_by('pk'))
+            included[name] = serializer.to_representation(queryset) if ids else []
+        return included
+
+
+class UserValuesSerializer(ValuesSerializer):
+    """Fast read path matching UserSerializer."""
+    model = User
+    fields = (
+        ('id', 'id', str),
+        ('username', 'username', None),
+        ('email', 'email', None),
+        ('role', 'role', None),
+    )
+
+
+class PriceValuesSerializer(ValuesSerializer):
+    """Fast read path matching PriceSerializer."""
+    model = Price
+    fields = (
+        ('id', 'id', None),
+        ('category', 'category', None),
+        # DRF renders decimals as strings; the DB converter already quantizes.
+        ('rate', 'rate', str),
+        ('managed_by', 'managed_by_id', str),
+    )
+
+
+class ClientProjectValuesSerializer(ValuesSerializer):
+    """Fast read path matching ClientProjectSerializer."""
+    model = ClientProject
+    fields = (
+        ('id', 'id', None),
+        ('name', 'name', None),
+        ('start_date', 'start_date', _isoformat),
+        ('end_date', 'end_date', _isoformat),
+        ('attachment', 'attachment', 'attachment_url'),
+        ('status', 'status', None),
+        ('created_by', 'created_by_id', str),
+        ('managed_by', 'managed_by_id', str),
+    )
+
+    def attachment_url(self, name):
+        """Mirrors serializers.FileField: an absolute URL, or None if empty."""
+        if not name:
+            return None
+        url = ClientProject._meta.get_field('attachment').storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+
+class WorkEntryValuesSerializer(ValuesSerializer):
+    """Fast read path matching WorkEntrySerializer."""
+    model = WorkEntry
+    fields = (
+        ('id', 'id', None),
+        ('user', 'user_id', str),
+        ('project', 'project_id', None),
+        ('price', 'price_id', None),
+        ('category', work_entry_category(), None),
+        ('quantity', 'quantity', None),
+        ('date', 'date', _isoformat),
+    )
+    sideloads = {
+        'project': ('project_id', ClientProjectValuesSerializer),
+        'user': ('user_id', UserValuesSerializer),
+        'price': ('price_id', PriceValuesSerializer),
+    }
+
+
+class WorkDashboardValuesSerializer(ValuesSerializer):
+    """Fast read path matching WorkDashboardSerializer."""
+    model = WorkEntry
+    fields = (
+        ('id', 'id', None),
+        ('username', 'user__username', None),
+        ('project_name', 'project__name', None),
+        ('category', work_entry_category(), None),
+        ('quantity', 'quantity', None),
+        ('date', 'date', _isoformat),
+    )
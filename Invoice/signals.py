@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         signals.py
+# Purpose:      Model signal receivers for the Invoice application.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Signal receivers for the Invoice application.
+Connected in InvoiceConfig.ready().
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import PRICES, PROJECTS, bump_change_stamp
+from . import live, usercache
+from .models import ClientProject, Price, User, WorkEntry
+from .sync import DELETE, UPSERT, record_change, record_changes
+
+
+@receiver([post_save, post_delete], sender=Price)
+def price_changed(sender, instance, **kwargs):
+    """
+    Invalidates cached price lists for the price's owner once the change
+    commits. Bumping earlier would let a concurrent GET cache the old rows
+    under the new stamp.
+    """
+    owner_id = instance.managed_by_id
+    transaction.on_commit(lambda: bump_change_stamp(PRICES, owner_id))
+
+
+@receiver([post_save, post_delete], sender=ClientProject)
+def project_changed(sender, instance, **kwargs):
+    """Invalidates cached project lists for the project's owner once the change commits."""
+    owner_id = instance.managed_by_id
+    transaction.on_commit(lambda: bump_change_stamp(PROJECTS, owner_id))
+
+
+@receiver(post_save, sender=ClientProject)
+def project_tenant_changed(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Moves the project's work entries to its new managing admin when the
+    project is reassigned, keeping WorkEntry.tenant in step with it.
+    """
+    if created or raw:
+        return
+    moved = list(
+        WorkEntry.objects.filter(project=instance).exclude(tenant_id=instance.managed_by_id)
+        .values_list('pk', 'user_id', 'tenant_id')
+    )
+    if not moved:
+        return
+    owner_ids = {pk: user_id for pk, user_id, _ in moved}
+    WorkEntry.objects.filter(pk__in=owner_ids).update(
+        tenant_id=instance.managed_by_id, updated_at=timezone.now())
+    # The new tenant's clients fetch the entries; the old tenant's clients
+    # find them out of scope and drop them.
+    for tenant_id in {instance.managed_by_id, *(old for _, _, old in moved)}:
+        record_changes(WorkEntry, owner_ids, UPSERT, tenant_id, owner_ids)
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Drops the user, and the users they manage, from the user cache."""
+    usercache.invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=WorkEntry)
+@receiver(post_save, sender=Price)
+@receiver(post_save, sender=ClientProject)
+def record_synced_save(sender, instance, raw=False, **kwargs):
+    """Appends a sync ChangeLog entry for a created or updated row."""
+    if not raw:
+        record_change(instance, UPSERT)
+
+
+@receiver(pre_delete, sender=WorkEntry)
+@receiver(pre_delete, sender=Price)
+@receiver(pre_delete, sender=ClientProject)
+def record_synced_delete(sender, instance, **kwargs):
+    """
+    Appends a sync tombstone for a row being deleted. This runs before the
+    delete (in the same transaction) because a cascade may remove the
+    project that scopes a work entry before the entry itself.
+    """
+    record_change(instance, DELETE)
+
+
+@receiver(post_save, sender=WorkEntry)
+def publish_new_entry(sender, instance, created=False, raw=False, **kwargs):
+    """Pushes a newly created entry to open live dashboards."""
+    if created and not raw:
+        live.publish_entries([instance])
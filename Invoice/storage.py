@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         storage.py
+# Purpose:      Content-addressed file storage for project attachments.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Content-addressed storage for uploaded attachments.
+
+Uploads are streamed to a temporary file chunk by chunk while their SHA-256
+is computed, then moved to ``<upload_to>/<aa>/<sha256><ext>``. A file whose
+content is already stored is discarded and the existing copy reused, so
+identical attachments take disk space once. Stored files never change, which
+lets the media view serve them with long-lived cache headers.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.storage import FileSystemStorage
+from django.template.defaultfilters import filesizeformat
+
+DEFAULT_MAX_SIZE = 20 * 1024 * 1024
+
+# Matches the names this storage produces; the digest doubles as an ETag.
+HASHED_NAME_RE = re.compile(r'(?:^|/)[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})(?:\.[^/]*)?$')
+
+
+def attachment_max_size():
+    return getattr(settings, 'ATTACHMENT_MAX_SIZE', DEFAULT_MAX_SIZE)
+
+
+def validate_attachment_size(file):
+    """Rejects uploads larger than ATTACHMENT_MAX_SIZE."""
+    limit = attachment_max_size()
+    if file.size is not None and file.size > limit:
+        raise ValidationError(f"The file is larger than {filesizeformat(limit)}.")
+
+
+def content_digest(name):
+    """Returns the SHA-256 hex digest encoded in a stored name, or None."""
+    match = HASHED_NAME_RE.search(name)
+    return match['digest'] if match else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files after the SHA-256 of their content."""
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is chosen in _save() from the content, and an
+        # existing file with that name is the same file.
+        return name
+
+    def _save(self, name, content):
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        full_directory = self.path(directory)
+        os.makedirs(full_directory, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        limit = attachment_max_size()
+        handle, temp_path = tempfile.mkstemp(dir=full_directory, prefix='.upload-')
+        try:
+            with os.fdopen(handle, 'wb') as temp_file:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    size += len(chunk)
+                    if size > limit:
+                        raise ValidationError(f"The file is larger than {filesizeformat(limit)}.")
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+
+            hex_digest = digest.hexdigest()
+            final_name = os.path.join(directory, hex_digest[:2], hex_digest + extension).replace('\\', '/')
+            final_path = self.path(final_name)
+            if os.path.exists(final_path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                os.replace(temp_path, final_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return final_name
+
+
+def attachment_storage():
+    """Storage for ClientProject.attachment (a callable, so it is not frozen into migrations)."""
+    return ContentAddressedStorage()
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         sync.py
+# Purpose:      Change tracking and delta sync for offline-capable clients.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Delta sync for the Invoice application.
+
+Every write to a synced model appends a ChangeLog row; deletes append a
+tombstone. A client keeps the last sequence number it has seen (the sync
+token) and asks for everything after it, which is an index range scan on
+(tenant, id) and costs in proportion to what changed.
+
+Single-row writes are recorded by signal receivers; bulk writes, which send
+no signals, call record_changes() themselves.
+
+ChangeLog ids are assigned when the row is inserted, not when it commits,
+so on databases with concurrent writers a change can become visible after
+a higher id already has. Tokens therefore never pass a log entry younger
+than SYNC_SETTLE_SECONDS: such entries are still returned, and returned
+again by the next delta, until they are old enough that every transaction
+that could hold a lower id has finished. Re-sent changes are harmless, as
+clients apply them by id.
+"""
+
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import ChangeLog, ClientProject, Price, WorkEntry
+from .serializers import (
+    ClientProjectValuesSerializer, PriceValuesSerializer, WorkEntryValuesSerializer,
+)
+
+UPSERT = 'upsert'
+DELETE = 'delete'
+
+# Synced models: ChangeLog.model label -> (response key, model, serializer).
+SYNCED_MODELS = {
+    'workentry': ('work_entries', WorkEntry, WorkEntryValuesSerializer),
+    'price': ('prices', Price, PriceValuesSerializer),
+    'clientproject': ('projects', ClientProject, ClientProjectValuesSerializer),
+}
+
+DEFAULT_LIMIT = 1000
+
+# Must exceed the longest write transaction.
+DEFAULT_SETTLE_SECONDS = 10
+
+
+def _settled_before():
+    """Returns the time before which every ChangeLog entry has committed."""
+    seconds = getattr(settings, 'SYNC_SETTLE_SECONDS', DEFAULT_SETTLE_SECONDS)
+    return timezone.now() - datetime.timedelta(seconds=seconds)
+
+
+def change_owners(instance):
+    """Returns the (tenant_id, owner_id) that scope a synced object."""
+    if isinstance(instance, WorkEntry):
+        tenant_id = instance.tenant_id
+        if not instance.project_id:
+            tenant_id = instance.user.managed_by_id
+        return tenant_id, instance.user_id
+    return instance.managed_by_id, None
+
+
+def record_change(instance, action):
+    """Appends one ChangeLog row for a saved or deleted object."""
+    tenant_id, owner_id = change_owners(instance)
+    ChangeLog.objects.create(
+        model=instance._meta.model_name, object_id=instance.pk, action=action,
+        tenant_id=tenant_id, owner_id=owner_id,
+    )
+
+
+def record_changes(model, object_ids, action, tenant_id, owner_ids=None):
+    """
+    Appends ChangeLog rows for a bulk write in one INSERT. ``owner_ids`` may
+    map object ids to owners (work entries only).
+    """
+    owner_ids = owner_ids or {}
+    ChangeLog.objects.bulk_create([
+        ChangeLog(
+            model=model._meta.model_name, object_id=object_id, action=action,
+            tenant_id=tenant_id, owner_id=owner_ids.get(object_id),
+        )
+        for object_id in object_ids
+    ], batch_size=1000)
+
+
+# The values() needed by record_entry_tombstones().
+ENTRY_OWNER_FIELDS = ('id', 'user_id', 'project_id', 'tenant_id', 'user__managed_by_id')
+
+
+def record_entry_tombstones(rows):
+    """
+    Appends tombstones for work entries removed in bulk, grouped by tenant as
+    change_owners() would scope them. ``rows`` are ENTRY_OWNER_FIELDS values.
+    """
+    by_tenant = defaultdict(dict)
+    for row in rows:
+        tenant_id = row['tenant_id'] if row['project_id'] else row['user__managed_by_id']
+        by_tenant[tenant_id][row['id']] = row['user_id']
+    for tenant_id, owner_ids in by_tenant.items():
+        record_changes(WorkEntry, owner_ids, DELETE, tenant_id, owner_ids)
+
+
+def scoped_querysets(user):
+    """Returns {label: queryset} of the rows the user may sync."""
+    if user.role == 'super_admin':
+        return {
+            'workentry': WorkEntry.objects.for_user(user),
+            'price': Price.objects.all(),
+            'clientproject': ClientProject.objects.all(),
+        }
+    if user.role == 'admin':
+        return {
+            'workentry': WorkEntry.objects.for_user(user),
+            'price': Price.objects.filter(managed_by=user),
+            'clientproject': ClientProject.objects.filter(managed_by=user),
+        }
+    # Regular users only see their own work entries through the API.
+    return {'workentry': WorkEntry.objects.for_user(user)}
+
+
+def scoped_changelog(user):
+    """Returns the ChangeLog rows visible to the user."""
+    if user.role == 'super_admin':
+        return ChangeLog.objects.all()
+    if user.role == 'admin':
+        return ChangeLog.objects.filter(tenant_id=user.pk)
+    return ChangeLog.objects.filter(owner_id=user.pk, model='workentry')
+
+
+def _empty_payload():
+    return (
+        {key: [] for key, _, _ in SYNCED_MODELS.values()},
+        {key: [] for key, _, _ in SYNCED_MODELS.values()},
+    )
+
+
+def build_snapshot(user, context):
+    """
+    Returns a full sync payload. The token is read before the rows and only
+    covers settled entries, so any change made while the snapshot is built,
+    or still in flight, is replayed by the next delta.
+    """
+    settled = ChangeLog.objects.filter(changed_at__lt=_settled_before())
+    token = settled.aggregate(last=Max('id'))['last'] or 0
+    changes, deleted = _empty_payload()
+    for label, queryset in scoped_querysets(user).items():
+        key, _, serializer_class = SYNCED_MODELS[label]
+        serializer = serializer_class(context=context)
+        changes[key] = serializer.to_representation(serializer.get_rows(queryset.order_by('pk')))
+    return {'token': str(token), 'full': True, 'has_more': False, 'changes': changes, 'deleted': deleted}
+
+
+def build_delta(user, since, context, limit=DEFAULT_LIMIT):
+    """
+    Returns the rows changed and the ids deleted after sequence ``since``,
+    at most ``limit`` log entries at a time. Changed rows are re-read through
+    the user's scoped querysets, one query per model. The next token stops
+    before the first unsettled entry, so those are sent again next time.
+    """
+    settled_before = _settled_before()
+    entries = list(
+        scoped_changelog(user).filter(id__gt=since).order_by('id')
+        .values_list('id', 'model', 'object_id', 'action', 'changed_at')[:limit]
+    )
+
+    # The last action per object wins.
+    latest = {}
+    token = since
+    settled = True
+    for entry_id, label, object_id, action, changed_at in entries:
+        latest[(label, object_id)] = action
+        settled = settled and changed_at < settled_before
+        if settled:
+            token = entry_id
+
+    changes, deleted = _empty_payload()
+    querysets = scoped_querysets(user)
+    upserts = {}
+    for (label, object_id), action in latest.items():
+        if label not in querysets:
+            continue
+        if action == DELETE:
+            deleted[SYNCED_MODELS[label][0]].append(object_id)
+        else:
+            upserts.setdefault(label, set()).add(object_id)
+
+    for label, object_ids in upserts.items():
+        key, _, serializer_class = SYNCED_MODELS[label]
+        serializer = serializer_class(context=context)
+        rows = serializer.to_representation(
+            serializer.get_rows(querysets[label].filter(pk__in=object_ids).order_by('pk')))
+        changes[key] = rows
+        # Rows that no longer exist or left the user's scope are gone for the client.
+        deleted[key].extend(sorted(object_ids - {row['id'] for row in rows}))
+
+    return {
+        # Nothing more is fetched until the unsettled entries settle.
+        'token': str(token), 'full': False, 'has_more': len(entries) == limit and settled,
+        'changes': changes, 'deleted': deleted,
+    }
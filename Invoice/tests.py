@@ -1,3 +1,1268 @@
-from django.test import TestCase
+import asyncio
+import contextlib
+import datetime
+import io
+import json
+import tempfile
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DEFAULT_DB_ALIAS, connection, connections, router
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse
+from django.test import (
+    AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from . import async_views, live, usercache
+from .archive import (
+    archive_batch, archive_finished_projects, archive_horizon, check_raw_deletable,
+    refresh_monthly_totals, work_entries_for,
+)
+from .backends import EmailBackend
+from .db import configure_connection
+from .idempotency import claim_key, purge_expired_keys
+from .importers import (
+    ImportValidationError, adjust_prices, create_team_members, parse_price_book,
+    parse_team_roster, upsert_prices,
+)
+from .models import (
+    ArchivedWorkEntry, ChangeLog, ClientProject, EmailOutbox, IdempotencyKey, Price, PurgeJob, User,
+    WorkEntry, WorkEntryMonthlyTotal,
+)
+from .outbox import MAX_ATTEMPTS, RETRY_BASE, SEND_LEASE, claim_due_emails, queue_email, send_due_emails
+from .purge import soft_delete
+from .renderers import FastJSONRenderer
+from .reports import pivot
+from .routers import (
+    PIN_COOKIE, REPLICA_DB_ALIAS, PrimaryPinningMiddleware, pinned_to_primary,
+    replica_reads, use_replica,
+)
+from .serializers import (
+    ClientProjectSerializer, ClientProjectValuesSerializer, PriceSerializer, PriceValuesSerializer,
+    WorkDashboardSerializer, WorkDashboardValuesSerializer, WorkEntrySerializer, WorkEntryValuesSerializer,
+)
+from .throttling import CacheBucketStore, SQLiteBucketStore, get_bucket_store, throttle_scope
+
+def _read_alias(request=None):
+    return HttpResponse(router.db_for_read(WorkEntry))
+
+
+class MigrationTestCase(TransactionTestCase):
+    """
+    Migrates back to ``migrate_from``, lets ``setUpBeforeMigration()`` add
+    rows through the historical models, then applies ``migrate_to``.
+    """
+    migrate_from = migrate_to = None
+
+    def setUp(self):
+        leaves = MigrationExecutor(connection).loader.graph.leaf_nodes()
+        self.addCleanup(self.migrate, leaves)
+        from_apps = self.migrate([('Invoice', self.migrate_from)])
+        self.setUpBeforeMigration(from_apps)
+        self.apps = self.migrate([('Invoice', self.migrate_to)])
+
+    def migrate(self, targets):
+        """Applies or unapplies migrations up to ``targets``; returns their apps."""
+        executor = MigrationExecutor(connection)
+        # Backfills report on stdout.
+        with contextlib.redirect_stdout(io.StringIO()):
+            executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def setUpBeforeMigration(self, apps):
+        pass
+
+
+class TenantTestCase(TestCase):
+    """An admin with one team member, a project and a price."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='boss', email='boss@example.com', password='pw12345!x', role='admin')
+        cls.member = User.objects.create_user(
+            username='worker', email='worker@example.com', password='pw12345!x', role='user',
+            managed_by=cls.admin)
+        cls.project = ClientProject.objects.create(
+            name='Catalogue', start_date=datetime.date(2025, 1, 1), created_by=cls.admin, managed_by=cls.admin)
+        cls.price = Price.objects.create(category='Shoes', rate='2.50', managed_by=cls.admin)
+
+    def api(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def add_entry(self, quantity=1, date=datetime.date(2025, 1, 2), **fields):
+        fields = {'user': self.member, 'project': self.project, 'price': self.price, **fields}
+        return WorkEntry.objects.create(quantity=quantity, date=date, **fields)
+
+
+@skipUnless(REPLICA_DB_ALIAS in settings.DATABASES, "No replica database configured.")
+class ReplicaRouterTests(SimpleTestCase):
+
+    def test_reads_use_default_outside_replica_reads(self):
+        self.assertEqual(router.db_for_read(WorkEntry), 'default')
+        self.assertEqual(WorkEntry.objects.all().db, 'default')
+
+    def test_reads_use_replica_inside_replica_reads(self):
+        with replica_reads():
+            self.assertEqual(router.db_for_read(WorkEntry), REPLICA_DB_ALIAS)
+            self.assertEqual(WorkEntry.objects.all().db, REPLICA_DB_ALIAS)
+        self.assertEqual(router.db_for_read(WorkEntry), 'default')
+
+    def test_writes_always_use_default(self):
+        with replica_reads():
+            self.assertEqual(router.db_for_write(WorkEntry), 'default')
+
+    def test_pinned_reads_use_default(self):
+        with replica_reads(), pinned_to_primary():
+            self.assertEqual(router.db_for_read(WorkEntry), 'default')
+
+    def test_use_replica_decorator(self):
+        response = use_replica(_read_alias)(RequestFactory().get('/'))
+        self.assertEqual(response.content.decode(), REPLICA_DB_ALIAS)
+
+    def test_replica_is_not_migrated(self):
+        self.assertFalse(router.allow_migrate(REPLICA_DB_ALIAS, 'Invoice'))
+        self.assertTrue(router.allow_migrate('default', 'Invoice'))
+
+
+@skipUnless(REPLICA_DB_ALIAS in settings.DATABASES, "No replica database configured.")
+class PrimaryPinningMiddlewareTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = PrimaryPinningMiddleware(use_replica(_read_alias))
+
+    def test_get_reads_from_replica(self):
+        response = self.middleware(self.factory.get('/'))
+        self.assertEqual(response.content.decode(), REPLICA_DB_ALIAS)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_write_is_pinned_and_sets_cookie(self):
+        response = self.middleware(self.factory.post('/'))
+        self.assertEqual(response.content.decode(), 'default')
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], settings.REPLICA_PIN_SECONDS)
+
+    def test_failed_write_sets_no_cookie(self):
+        middleware = PrimaryPinningMiddleware(lambda request: HttpResponse(status=400))
+        self.assertNotIn(PIN_COOKIE, middleware(self.factory.post('/')).cookies)
+
+    def test_pin_cookie_keeps_reads_on_primary(self):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.assertEqual(self.middleware(request).content.decode(), 'default')
+
+    def test_pin_ends_with_the_request(self):
+        self.middleware(self.factory.post('/'))
+        with replica_reads():
+            self.assertEqual(router.db_for_read(WorkEntry), REPLICA_DB_ALIAS)
+
+
+class ReadYourWritesTests(TestCase):
+
+    def test_reads_in_a_transaction_use_default(self):
+        # TestCase runs each test inside a transaction.
+        with replica_reads():
+            self.assertEqual(router.db_for_read(WorkEntry), 'default')
+
+    def test_login_pins_the_session_to_primary(self):
+        User.objects.create_user(username='pin', email='pin@example.com', password='pw12345!x')
+        response = self.client.post('/login/', {'username': 'pin@example.com', 'password': 'pw12345!x'})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+
+class SoftDeleteVisibilityTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pw12345!x', role='admin')
+        cls.member = User.objects.create_user(
+            username='member', email='member@example.com', password='pw12345!x', role='user',
+            managed_by=cls.admin)
+        cls.project = ClientProject.objects.create(
+            name='Gone', start_date=datetime.date(2025, 1, 1), created_by=cls.admin, managed_by=cls.admin)
+        cls.other = ClientProject.objects.create(
+            name='Kept', start_date=datetime.date(2025, 1, 1), created_by=cls.admin, managed_by=cls.admin)
+        price = Price.objects.create(category='Shoes', rate='2.50', managed_by=cls.admin)
+        for project in (cls.project, cls.other):
+            WorkEntry.objects.create(
+                user=cls.member, project=project, price=price, quantity=1, date=datetime.date(2025, 1, 2))
+
+    def test_deleted_project_entries_are_hidden_before_the_purge(self):
+        soft_delete(self.project, requested_by=self.admin)
+        self.assertTrue(PurgeJob.objects.filter(status='pending').exists())
+        self.assertEqual(WorkEntry.objects.filter(project=self.project).count(), 1)
+
+        for user in (self.admin, self.member):
+            self.assertQuerySetEqual(
+                WorkEntry.objects.for_user(user).values_list('project__name', flat=True), ['Kept'])
+        self.client.force_login(self.admin)
+        response = self.client.get('/api/dashboard/')
+        self.assertEqual([row['project_name'] for row in response.json()], ['Kept'])
+
+    def test_deleted_user_entries_are_hidden_before_the_purge(self):
+        soft_delete(self.member, requested_by=self.admin)
+        self.assertFalse(WorkEntry.objects.for_user(self.admin).exists())
+
+
+class IdempotencyKeyTests(TenantTestCase):
+
+    def setUp(self):
+        self.client = self.api(self.member)
+        self.body = {'project': self.project.pk, 'price': self.price.pk, 'quantity': 4, 'date': '2025-03-01'}
+
+    def test_retry_replays_the_first_response(self):
+        first = self.client.post('/api/work-entries/', self.body, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        retry = self.client.post('/api/work-entries/', self.body, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(WorkEntry.objects.count(), 1)
+
+    def test_reused_key_with_a_different_body_is_refused(self):
+        self.client.post('/api/work-entries/', self.body, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        response = self.client.post(
+            '/api/work-entries/', {**self.body, 'quantity': 5}, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(WorkEntry.objects.count(), 1)
+
+    def test_failed_request_does_not_keep_the_key(self):
+        response = self.client.post(
+            '/api/work-entries/', {**self.body, 'price': None}, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_keys_are_per_user(self):
+        self.client.post('/api/work-entries/', self.body, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        response = self.api(self.admin).post(
+            '/api/prices/', {'category': 'Bags', 'rate': '1.25'}, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        self.assertEqual(response.status_code, 201)
+
+    def test_batched_retry_replays_the_batch(self):
+        batch = {'operations': [{'method': 'POST', 'path': '/api/work-entries/', 'body': self.body}]}
+        first = self.client.post('/api/batch/', batch, format='json', HTTP_IDEMPOTENCY_KEY='b1')
+        retry = self.client.post('/api/batch/', batch, format='json', HTTP_IDEMPOTENCY_KEY='b1')
+        self.assertEqual(first.json()['results'][0]['status'], 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(WorkEntry.objects.count(), 1)
+
+    def test_concurrent_claim_returns_the_winning_record(self):
+        winner = claim_key(self.member, 'k1', 'hash')
+        winner.status_code = 201
+        winner.save()
+        # The loser's lookup ran before the winner committed, so it only
+        # finds out through the unique constraint.
+        with mock.patch('django.db.models.QuerySet.first', return_value=None):
+            record = claim_key(self.member, 'k1', 'hash')
+        self.assertEqual(record.pk, winner.pk)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_expired_keys_are_reusable_and_purged(self):
+        self.client.post('/api/work-entries/', self.body, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+        response = self.client.post(
+            '/api/work-entries/', {**self.body, 'quantity': 5}, format='json', HTTP_IDEMPOTENCY_KEY='k1')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(WorkEntry.objects.count(), 2)
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+        self.assertEqual(purge_expired_keys(), 1)
+
+
+class WorkEntryTenantTests(TenantTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_admin = User.objects.create_user(
+            username='rival', email='rival@example.com', password='pw12345!x', role='admin')
+        cls.other_price = Price.objects.create(category='Bags', rate='9.00', managed_by=cls.other_admin)
+        cls.other_project = ClientProject.objects.create(
+            name='Rival', start_date=datetime.date(2025, 1, 1),
+            created_by=cls.other_admin, managed_by=cls.other_admin)
+
+    def post(self, **body):
+        body = {'quantity': 1, 'date': '2025-03-01', **body}
+        return self.api(self.member).post('/api/work-entries/', body, format='json')
+
+    def test_entry_with_own_admins_price(self):
+        response = self.post(project=self.project.pk, price=self.price.pk)
+        self.assertEqual(response.status_code, 201)
+
+    def test_other_admins_price_is_refused_without_a_project(self):
+        response = self.post(price=self.other_price.pk)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('price', response.json())
+        self.assertFalse(WorkEntry.objects.exists())
+
+    def test_other_admins_project_is_refused(self):
+        response = self.post(project=self.other_project.pk, price=self.price.pk)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('project', response.json())
+
+
+class BucketThrottleTests(TenantTestCase):
+
+    def test_sqlite_bucket_refills_over_time(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteBucketStore(f'{directory}/buckets.sqlite3')
+            self.assertEqual(store.consume('k', 2, 0.5, 100.0), (True, 0.0))
+            self.assertEqual(store.consume('k', 2, 0.5, 100.0), (True, 0.0))
+            self.assertEqual(store.consume('k', 2, 0.5, 100.0), (False, 2.0))
+            self.assertEqual(store.consume('k', 2, 0.5, 102.0), (True, 0.0))
+            store._connection().close()
+
+    def test_cache_bucket_refills_over_time(self):
+        store = CacheBucketStore()
+        key = f'bucket-test-{self.member.pk}'
+        self.assertEqual(store.consume(key, 1, 0.5, 100.0), (True, 0.0))
+        self.assertEqual(store.consume(key, 1, 0.5, 100.0), (False, 2.0))
+        self.assertEqual(store.consume(key, 1, 0.5, 102.0), (True, 0.0))
+
+    @override_settings(THROTTLE_STORE={'BACKEND': 'cache', 'LOCATION': 'default'})
+    def test_store_backend_comes_from_settings(self):
+        get_bucket_store.cache_clear()
+        self.addCleanup(get_bucket_store.cache_clear)
+        self.assertIsInstance(get_bucket_store(), CacheBucketStore)
+
+    def test_buckets_are_per_user(self):
+        store = mock.Mock()
+        store.consume.return_value = (True, 0.0)
+        with mock.patch('Invoice.throttling.get_bucket_store', return_value=store):
+            self.api(self.admin).get('/api/profile/')
+            self.api(self.member).get('/api/profile/')
+        first, second = (call.args[0] for call in store.consume.call_args_list)
+        self.assertIn(str(self.admin.pk), first)
+        self.assertIn(str(self.member.pk), second)
+
+    def test_throttle_scope_decorator_on_plain_views(self):
+        view = throttle_scope('import')(lambda request: HttpResponse('ok'))
+        request = RequestFactory().get('/')
+        request.user = self.admin
+        with self.empty_bucket(wait=0.5):
+            response = view(request)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def empty_bucket(self, wait=12.2):
+        store = mock.Mock()
+        store.consume.return_value = (False, wait)
+        return mock.patch('Invoice.throttling.get_bucket_store', return_value=store)
+
+    def test_empty_bucket_answers_429_with_retry_after(self):
+        with self.empty_bucket():
+            response = self.api(self.admin).get('/api/prices/')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '13')
+
+    def test_async_endpoints_are_throttled(self):
+        request = AsyncRequestFactory().get('/api/async/work-entries/')
+
+        async def auser():
+            return self.member
+        request.auser = auser
+        with self.empty_bucket():
+            response = asyncio.run(async_views.work_entry_list_view(request))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '13')
+
+
+class PriceImportTests(TenantTestCase):
+
+    def test_upsert_creates_and_updates(self):
+        rates = parse_price_book(
+            [{'folder name': 'Shoes', 'rate': '$3.10'}, {'folder name': 'Bags', 'rate': '1.5'}],
+            ['folder name', 'rate'])
+        self.assertEqual(upsert_prices(self.admin, rates), {'created': 1, 'updated': 1})
+        self.assertEqual(
+            dict(Price.objects.filter(managed_by=self.admin).values_list('category', 'rate')),
+            {'Shoes': Decimal('3.10'), 'Bags': Decimal('1.50')})
+
+    def test_invalid_rows_are_all_reported(self):
+        with self.assertRaises(ImportValidationError) as caught:
+            parse_price_book(
+                [{'folder name': '', 'rate': '1'}, {'folder name': 'Hats', 'rate': 'cheap'}],
+                ['folder name', 'rate'])
+        self.assertEqual(len(caught.exception.errors), 2)
+
+    def test_api_import_is_all_or_nothing(self):
+        upload = SimpleUploadedFile('prices.csv', b'Folder Name,Rate\nHats,4\nCaps,-1\n', content_type='text/csv')
+        response = self.api(self.admin).post('/api/prices/import/', {'file': upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Price.objects.filter(category='Hats').exists())
+
+    def test_adjust_scales_and_rounds(self):
+        self.assertEqual(adjust_prices(Price.objects.filter(managed_by=self.admin), Decimal('10.1')), 1)
+        self.price.refresh_from_db()
+        self.assertEqual(self.price.rate, Decimal('2.75'))
+
+    def test_adjust_past_the_largest_rate_is_refused(self):
+        Price.objects.create(category='Gold', rate='50000000.00', managed_by=self.admin)
+        response = self.api(self.admin).post('/api/prices/adjust/', {'percent': '100'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('errors', response.json())
+        self.price.refresh_from_db()
+        self.assertEqual(self.price.rate, Decimal('2.50'))
+
+    def test_html_import_is_throttled(self):
+        store = mock.Mock()
+        store.consume.return_value = (False, 60.0)
+        self.client.force_login(self.admin)
+        with mock.patch('Invoice.throttling.get_bucket_store', return_value=store):
+            response = self.client.post('/manage/prices/import/')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+
+
+class TeamImportTests(TenantTestCase):
+
+    def upload(self, content):
+        return SimpleUploadedFile('team.csv', content, content_type='text/csv')
+
+    def test_roster_creates_members_and_queues_emails(self):
+        response = self.api(self.admin).post(
+            '/api/team/import/', {'file': self.upload(b'Username,Email\nann,ann@example.com\nbob,bob@example.com\n')})
+        self.assertEqual(response.status_code, 201)
+        members = User.objects.filter(managed_by=self.admin, username__in=['ann', 'bob'])
+        self.assertEqual(members.count(), 2)
+        self.assertTrue(all(member.has_usable_password() for member in members))
+        self.assertEqual(EmailOutbox.objects.count(), 2)
+
+    def test_taken_and_repeated_names_are_reported(self):
+        with self.assertRaises(ImportValidationError) as caught:
+            parse_team_roster(
+                [{'username': 'worker', 'email': 'w2@example.com'},
+                 {'username': 'ann', 'email': 'ann@example.com'},
+                 {'username': 'ann', 'email': 'ann2@example.com'}],
+                ['username', 'email'])
+        self.assertEqual(len(caught.exception.errors), 2)
+
+    def test_name_taken_after_validation_is_an_import_error(self):
+        with self.assertRaises(ImportValidationError):
+            create_team_members(self.admin, [('ann', 'ann@example.com'), ('worker', 'w2@example.com')])
+        self.assertFalse(User.objects.filter(username='ann').exists())
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    def test_api_reports_a_race_as_400(self):
+        with mock.patch('Invoice.views.parse_team_roster', return_value=[('worker', 'w2@example.com')]):
+            response = self.api(self.admin).post(
+                '/api/team/import/', {'file': self.upload(b'Username,Email\nworker,w2@example.com\n')})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('errors', response.json())
+
+
+class DashboardFilterTests(TenantTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_project = ClientProject.objects.create(
+            name='Brochure', start_date=datetime.date(2025, 1, 1), created_by=cls.admin, managed_by=cls.admin)
+
+    def setUp(self):
+        self.add_entry(date=datetime.date(2025, 1, 5))
+        self.add_entry(date=datetime.date(2025, 2, 5))
+        self.add_entry(date=datetime.date(2025, 2, 6), project=self.other_project)
+
+    def dashboard(self, user=None, **params):
+        return self.api(user or self.admin).get('/api/dashboard/', params)
+
+    def test_filters_by_project_and_date_range(self):
+        response = self.dashboard(project=self.project.pk, start_date='2025-02-01', end_date='2025-02-28')
+        self.assertEqual([row['date'] for row in response.json()], ['2025-02-05'])
+
+    def test_rows_are_newest_first(self):
+        dates = [row['date'] for row in self.dashboard().json()]
+        self.assertEqual(dates, ['2025-02-06', '2025-02-05', '2025-01-05'])
+
+    def test_inverted_date_range_is_rejected(self):
+        response = self.dashboard(start_date='2025-03-01', end_date='2025-02-01')
+        self.assertEqual(response.status_code, 400)
+
+    def test_members_see_no_rows(self):
+        self.assertEqual(self.dashboard(self.member).json(), [])
+
+    def test_page_costs_a_fixed_number_of_queries(self):
+        client = self.api(self.admin)
+        with self.assertNumQueries(1):
+            client.get('/api/dashboard/')
+        for _ in range(5):
+            self.add_entry()
+        with self.assertNumQueries(1):
+            client.get('/api/dashboard/')
+
+
+class ValuesSerializerTests(TenantTestCase):
+    """The values_list() read path must render exactly what the ModelSerializers do."""
+
+    def setUp(self):
+        self.add_entry(quantity=3)
+        self.add_entry(project=None)
+
+    def assertSameOutput(self, serializer_class, values_serializer_class, queryset):
+        values_serializer = values_serializer_class()
+        render = JSONRenderer().render
+        self.assertEqual(
+            render(values_serializer.to_representation(values_serializer.get_rows(queryset))),
+            render(serializer_class(queryset, many=True).data))
+
+    def test_work_entries(self):
+        self.assertSameOutput(WorkEntrySerializer, WorkEntryValuesSerializer, WorkEntry.objects.order_by('id'))
+
+    def test_dashboard_rows(self):
+        self.assertSameOutput(WorkDashboardSerializer, WorkDashboardValuesSerializer, WorkEntry.objects.order_by('id'))
+
+    def test_prices(self):
+        self.assertSameOutput(PriceSerializer, PriceValuesSerializer, Price.objects.order_by('id'))
+
+    def test_projects(self):
+        self.assertSameOutput(ClientProjectSerializer, ClientProjectValuesSerializer, ClientProject.objects.order_by('id'))
+
+    def test_fast_renderer_matches_the_json_renderer(self):
+        data = [{'rate': Decimal('2.50'), 'date': datetime.date(2025, 1, 2), 'name': 'Line\u2028break', 'id': None}]
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class SparseFieldsetTests(TenantTestCase):
+
+    def setUp(self):
+        self.entry = self.add_entry(quantity=3)
+        self.client = self.api(self.member)
+
+    def test_fields_limits_the_output(self):
+        response = self.client.get('/api/work-entries/', {'fields': 'id,quantity'})
+        self.assertEqual(response.json(), [{'id': self.entry.pk, 'quantity': 3}])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/api/work-entries/', {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.json())
+
+    def test_include_sideloads_related_objects(self):
+        response = self.client.get('/api/work-entries/', {'fields': 'id', 'include': 'project,price'})
+        body = response.json()
+        self.assertEqual(body['results'], [{'id': self.entry.pk}])
+        self.assertEqual([project['name'] for project in body['included']['project']], ['Catalogue'])
+        self.assertEqual(body['included']['price'][0]['rate'], '2.50')
+
+    def test_include_costs_one_query_per_relation(self):
+        self.add_entry(project=None)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/work-entries/', {'include': 'project,user'})
+        self.assertEqual(len(response.json()['included']['project']), 1)
+
+    def test_unknown_include_is_rejected(self):
+        response = self.client.get('/api/work-entries/', {'include': 'tenant'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ConditionalGetTests(TenantTestCase):
+
+    def setUp(self):
+        self.client = self.api(self.admin)
+
+    def test_unchanged_prices_answer_304(self):
+        first = self.client.get('/api/prices/')
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('private', first['Cache-Control'])
+        again = self.client.get('/api/prices/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], first['ETag'])
+
+    def test_a_write_changes_the_etag(self):
+        etag = self.client.get('/api/prices/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/prices/', {'category': 'Bags', 'rate': '1.00'}, format='json')
+        response = self.client.get('/api/prices/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_the_query_string(self):
+        etag = self.client.get('/api/prices/')['ETag']
+        response = self.client.get('/api/prices/', {'fields': 'id'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etags_are_per_user(self):
+        etag = self.client.get('/api/projects/')['ETag']
+        other = User.objects.create_user(
+            username='rival', email='rival@example.com', password='pw12345!x', role='admin')
+        response = self.api(other).get('/api/projects/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile_answers_304_until_it_changes(self):
+        etag = self.client.get('/api/profile/')['ETag']
+        self.assertEqual(self.client.get('/api/profile/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.admin.email = 'chief@example.com'
+        self.admin.save()
+        self.assertEqual(self.client.get('/api/profile/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class BatchTests(TenantTestCase):
+
+    def setUp(self):
+        self.client = self.api(self.admin)
+
+    def batch(self, *operations, **options):
+        operations = [{'method': method, 'path': path, **({'body': body} if body else {})}
+                      for method, path, body in operations]
+        return self.client.post('/api/batch/', {'operations': operations, **options}, format='json')
+
+    def test_operations_report_their_own_status(self):
+        response = self.batch(
+            ('POST', '/api/prices/', {'category': 'Bags', 'rate': '1.00'}),
+            ('POST', '/api/prices/', {'category': 'Hats'}),
+            ('GET', '/api/nowhere/', None),
+        )
+        body = response.json()
+        self.assertEqual([result['status'] for result in body['results']], [201, 400, 404])
+        self.assertTrue(body['committed'])
+        self.assertTrue(Price.objects.filter(category='Bags').exists())
+
+    def test_atomic_batch_rolls_back_on_failure(self):
+        response = self.batch(
+            ('POST', '/api/prices/', {'category': 'Bags', 'rate': '1.00'}),
+            ('POST', '/api/prices/', {'category': 'Hats'}),
+            ('POST', '/api/prices/', {'category': 'Caps', 'rate': '1.00'}),
+            atomic=True,
+        )
+        body = response.json()
+        self.assertEqual([result['status'] for result in body['results']], [201, 400, 424])
+        self.assertFalse(body['committed'])
+        self.assertFalse(Price.objects.exclude(pk=self.price.pk).exists())
+
+    def test_batches_cannot_be_nested_or_leave_the_api(self):
+        response = self.batch(('POST', '/api/batch/', {'operations': []}))
+        self.assertEqual(response.json()['results'][0]['status'], 400)
+        self.assertEqual(self.batch(('GET', '/admin/', None)).status_code, 400)
+
+    def test_a_crashing_operation_does_not_fail_the_batch(self):
+        with mock.patch('Invoice.views.ProfileView.get_object', side_effect=RuntimeError), \
+                self.assertLogs('Invoice.views', 'ERROR'):
+            response = self.batch(('GET', '/api/profile/', None), ('GET', '/api/prices/', None))
+        self.assertEqual([result['status'] for result in response.json()['results']], [500, 200])
+
+    def test_operations_are_not_charged_to_the_user_rate_again(self):
+        store = mock.Mock()
+        store.consume.return_value = (True, 0.0)
+        with mock.patch('Invoice.throttling.get_bucket_store', return_value=store):
+            self.batch(('GET', '/api/prices/', None), ('GET', '/api/projects/', None))
+        keys = [call.args[0] for call in store.consume.call_args_list]
+        self.assertEqual(len(keys), 2)  # The batch's user and 'batch' buckets.
+
+    def test_scoped_rates_still_apply_inside_a_batch(self):
+        store = mock.Mock()
+        store.consume.return_value = (True, 0.0)
+        with mock.patch('Invoice.throttling.get_bucket_store', return_value=store):
+            self.batch(('POST', '/api/prices/adjust/', {'percent': '1'}))
+        keys = [call.args[0] for call in store.consume.call_args_list]
+        self.assertEqual(len(keys), 3)
+        self.assertTrue(any('import' in key for key in keys))
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class DeltaSyncTests(TenantTestCase):
+
+    def sync(self, user, since=None):
+        params = {} if since is None else {'since': since}
+        return self.api(user).get('/api/sync/', params).json()
+
+    def test_snapshot_then_delta(self):
+        entry = self.add_entry()
+        snapshot = self.sync(self.member)
+        self.assertTrue(snapshot['full'])
+        self.assertEqual([row['id'] for row in snapshot['changes']['work_entries']], [entry.pk])
+
+        newer = self.add_entry(quantity=7)
+        delta = self.sync(self.member, snapshot['token'])
+        self.assertFalse(delta['full'])
+        self.assertEqual([row['id'] for row in delta['changes']['work_entries']], [newer.pk])
+        self.assertEqual(self.sync(self.member, delta['token'])['changes']['work_entries'], [])
+
+    def test_deletes_are_sent_as_tombstones(self):
+        entry = self.add_entry()
+        token = self.sync(self.admin)['token']
+        entry_id = entry.pk
+        entry.delete()
+        delta = self.sync(self.admin, token)
+        self.assertEqual(delta['deleted']['work_entries'], [entry_id])
+        self.assertEqual(delta['changes']['work_entries'], [])
+
+    def test_admins_also_sync_prices_but_only_their_own(self):
+        token = self.sync(self.admin)['token']
+        Price.objects.create(category='Bags', rate='1.00', managed_by=self.admin)
+        other = User.objects.create_user(
+            username='rival', email='rival@example.com', password='pw12345!x', role='admin')
+        Price.objects.create(category='Rival', rate='1.00', managed_by=other)
+        delta = self.sync(self.admin, token)
+        self.assertEqual([row['category'] for row in delta['changes']['prices']], ['Bags'])
+
+    def test_limit_pages_through_changes(self):
+        token = self.sync(self.member)['token']
+        for _ in range(3):
+            self.add_entry()
+        page = self.api(self.member).get('/api/sync/', {'since': token, 'limit': 2}).json()
+        self.assertTrue(page['has_more'])
+        self.assertEqual(len(page['changes']['work_entries']), 2)
+        rest = self.sync(self.member, page['token'])
+        self.assertFalse(rest['has_more'])
+        self.assertEqual(len(rest['changes']['work_entries']), 1)
+
+    @override_settings(SYNC_SETTLE_SECONDS=60)
+    def test_unsettled_changes_are_resent(self):
+        token = self.sync(self.member)['token']
+        entry = self.add_entry()
+        delta = self.sync(self.member, token)
+        self.assertEqual([row['id'] for row in delta['changes']['work_entries']], [entry.pk])
+        self.assertEqual(delta['token'], token)
+
+
+class AsyncEndpointTests(TenantTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for day in (2, 3, 4):
+            WorkEntry.objects.create(
+                user=cls.member, project=cls.project, price=cls.price, quantity=day, date=datetime.date(2025, 1, day))
+
+    def call(self, view, user, path='/', method='get', **params):
+        request = getattr(AsyncRequestFactory(), method)(path, params)
+
+        async def auser():
+            return user or AnonymousUser()
+        request.auser = auser
+        return async_to_sync(view)(request)
+
+    def test_work_entries_match_the_drf_list(self):
+        response = self.call(async_views.work_entry_list_view, self.member, '/api/async/work-entries/')
+        self.assertEqual(json.loads(response.content), self.api(self.member).get('/api/work-entries/').json())
+
+    def test_dashboard_pages_match_the_drf_view(self):
+        params = {'limit': 1, 'offset': 1, 'start_date': '2025-01-03'}
+        response = self.call(async_views.dashboard_view, self.admin, '/api/dashboard/', **params)
+        expected = self.api(self.admin).get('/api/dashboard/', params).json()
+        self.assertEqual(json.loads(response.content), expected)
+
+    def test_invalid_filters_are_a_400(self):
+        response = self.call(async_views.dashboard_view, self.admin, start_date='soon')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('start_date', json.loads(response.content))
+
+    def test_charts(self):
+        charts = json.loads(self.call(async_views.dashboard_charts_view, self.admin).content)
+        self.assertEqual(charts['pie_chart_labels'], ['Shoes'])
+        self.assertEqual(charts['bar_chart_data'], [3])
+        self.assertEqual(charts['most_productive_user'], 'worker')
+
+    def test_anonymous_and_non_get_requests_are_refused(self):
+        self.assertEqual(self.call(async_views.work_entry_list_view, None).status_code, 401)
+        self.assertEqual(self.call(async_views.work_entry_list_view, self.member, method='post').status_code, 405)
+
+
+class UserCacheTests(TenantTestCase):
+
+    def setUp(self):
+        usercache.clear()
+        self.addCleanup(usercache.clear)
+
+    def test_users_are_cached_with_their_admin(self):
+        usercache.get_user(self.member.pk)
+        with self.assertNumQueries(0):
+            user = usercache.get_user(self.member.pk)
+            self.assertEqual(user.managed_by.username, 'boss')
+
+    def test_saving_an_admin_drops_their_members(self):
+        usercache.get_user(self.member.pk)
+        self.admin.username = 'chief'
+        self.admin.save()
+        self.assertEqual(usercache.get_user(self.member.pk).managed_by.username, 'chief')
+
+    def test_callers_get_their_own_copy(self):
+        usercache.get_user(self.member.pk).managed_by.username = 'changed'
+        self.assertEqual(usercache.get_user(self.member.pk).managed_by.username, 'boss')
+
+    def test_jwt_requests_reuse_the_cached_user(self):
+        token = self.client.post(
+            '/api/token/', {'email': 'worker@example.com', 'password': 'pw12345!x'}).json()['access']
+        self.client.get('/api/profile/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/profile/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.json()['username'], 'worker')
+
+    def test_deleted_users_are_not_authenticated(self):
+        token = self.client.post(
+            '/api/token/', {'email': 'worker@example.com', 'password': 'pw12345!x'}).json()['access']
+        self.client.get('/api/profile/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        User.objects.get(pk=self.member.pk).delete()
+        response = self.client.get('/api/profile/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.json()['code'], 'user_not_found')
+
+
+class EmailBackendTests(TenantTestCase):
+
+    def test_emails_match_case_insensitively(self):
+        user = EmailBackend().authenticate(None, username='Worker@Example.COM', password='pw12345!x')
+        self.assertEqual(user, self.member)
+
+    def test_exact_match_wins_over_case_variants(self):
+        twin = User.objects.create_user(
+            username='twin', email='WORKER@example.com', password='pw12345!x', role='user')
+        self.assertEqual(EmailBackend().authenticate(None, username='WORKER@example.com', password='pw12345!x'), twin)
+        self.assertEqual(EmailBackend().authenticate(None, username='worker@example.com', password='pw12345!x'), self.member)
+        self.assertIsNone(EmailBackend().authenticate(None, username='Worker@example.com', password='pw12345!x'))
+
+    def test_wrong_password_and_unknown_email(self):
+        self.assertIsNone(EmailBackend().authenticate(None, username='worker@example.com', password='wrong'))
+        self.assertIsNone(EmailBackend().authenticate(None, username='nobody@example.com', password='pw12345!x'))
+
+    def test_a_login_costs_one_query(self):
+        with self.assertNumQueries(1):
+            EmailBackend().authenticate(None, email='worker@example.com', password='wrong')
+
+    def test_token_view_and_session_login(self):
+        response = self.client.post('/api/token/', {'email': 'WORKER@example.com', 'password': 'pw12345!x'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json())
+        self.assertTrue(self.client.login(username='worker@example.com', password='pw12345!x'))
+
+
+class WorkEntryTenantKeyTests(TenantTestCase):
+
+    def test_tenant_follows_the_project(self):
+        self.assertEqual(self.add_entry().tenant_id, self.admin.pk)
+        self.assertIsNone(self.add_entry(project=None).tenant_id)
+
+    def test_reassigned_projects_move_their_entries(self):
+        entry = self.add_entry()
+        other = User.objects.create_user(
+            username='rival', email='rival@example.com', password='pw12345!x', role='admin')
+        self.project.managed_by = other
+        self.project.save()
+        entry.refresh_from_db()
+        self.assertEqual(entry.tenant_id, other.pk)
+        self.assertEqual(list(WorkEntry.objects.for_user(other)), [entry])
+        self.assertFalse(WorkEntry.objects.for_user(self.admin).exists())
+
+
+class TenantBackfillTests(MigrationTestCase):
+    migrate_from = '0012_user_email_lower_idx'
+    migrate_to = '0013_workentry_tenant'
+
+    def setUpBeforeMigration(self, apps):
+        User = apps.get_model('Invoice', 'User')
+        ClientProject = apps.get_model('Invoice', 'ClientProject')
+        WorkEntry = apps.get_model('Invoice', 'WorkEntry')
+        self.admin = User.objects.create(username='boss', email='boss@example.com', role='admin')
+        member = User.objects.create(username='worker', email='worker@example.com', role='user')
+        project = ClientProject.objects.create(
+            name='Catalogue', start_date=datetime.date(2025, 1, 1), created_by=self.admin, managed_by=self.admin)
+        self.with_project = WorkEntry.objects.create(
+            user=member, project=project, category='Shoes', quantity=1, date=datetime.date(2025, 1, 2)).pk
+        self.without_project = WorkEntry.objects.create(
+            user=member, category='Shoes', quantity=1, date=datetime.date(2025, 1, 2)).pk
+
+    def test_entries_get_their_projects_admin(self):
+        WorkEntry = self.apps.get_model('Invoice', 'WorkEntry')
+        self.assertEqual(WorkEntry.objects.get(pk=self.with_project).tenant_id, self.admin.pk)
+        self.assertIsNone(WorkEntry.objects.get(pk=self.without_project).tenant_id)
+
+
+class PriceBackfillTests(MigrationTestCase):
+    migrate_from = '0013_workentry_tenant'
+    migrate_to = '0014_workentry_price'
+
+    def setUpBeforeMigration(self, apps):
+        User = apps.get_model('Invoice', 'User')
+        ClientProject = apps.get_model('Invoice', 'ClientProject')
+        Price = apps.get_model('Invoice', 'Price')
+        WorkEntry = apps.get_model('Invoice', 'WorkEntry')
+        admin = User.objects.create(username='boss', email='boss@example.com', role='admin')
+        rival = User.objects.create(username='rival', email='rival@example.com', role='admin')
+        member = User.objects.create(username='worker', email='worker@example.com', role='user', managed_by=admin)
+        project = ClientProject.objects.create(
+            name='Catalogue', start_date=datetime.date(2025, 1, 1), created_by=admin, managed_by=admin)
+        self.prices = {
+            'own': Price.objects.create(category='Shoes', rate='2.50', managed_by=admin).pk,
+            'system': Price.objects.create(category='Hats', rate='1.00').pk,
+        }
+        Price.objects.create(category='Bags', rate='9.00', managed_by=rival)
+
+        def entry(category, **fields):
+            fields = {'user': member, 'project': project, 'tenant': admin, **fields}
+            return WorkEntry.objects.create(category=category, quantity=1, date=datetime.date(2025, 1, 2), **fields).pk
+        self.entries = {
+            'exact': entry('Shoes'),
+            'case': entry(' shoes '),
+            'no_project': entry('Shoes', project=None, tenant=None),
+            'system': entry('hats'),
+            'other_tenant': entry('Bags'),
+        }
+
+    def price_of(self, name):
+        return self.apps.get_model('Invoice', 'WorkEntry').objects.get(pk=self.entries[name]).price_id
+
+    def test_entries_link_to_their_admins_price(self):
+        self.assertEqual(self.price_of('exact'), self.prices['own'])
+        self.assertEqual(self.price_of('case'), self.prices['own'])
+        self.assertEqual(self.price_of('no_project'), self.prices['own'])
+
+    def test_system_prices_are_the_fallback(self):
+        self.assertEqual(self.price_of('system'), self.prices['system'])
+
+    def test_other_admins_prices_are_never_used(self):
+        self.assertIsNone(self.price_of('other_tenant'))
+        WorkEntry = self.apps.get_model('Invoice', 'WorkEntry')
+        self.assertEqual(WorkEntry.objects.get(pk=self.entries['other_tenant']).legacy_category, 'Bags')
+
+
+class WorkEntryFormSetTests(TenantTestCase):
+
+    def setUp(self):
+        self.client.force_login(self.member)
+
+    def submit(self, *rows):
+        data = {'form-TOTAL_FORMS': len(rows), 'form-INITIAL_FORMS': 0}
+        for index, row in enumerate(rows):
+            data.update({f'form-{index}-{name}': value for name, value in row.items()})
+        return self.client.post('/submit-work/bulk/', data)
+
+    def row(self, **fields):
+        return {'project': self.project.pk, 'price': self.price.pk, 'quantity': 2, 'date': '2025-03-01', **fields}
+
+    def test_rows_are_created_with_their_tenant(self):
+        response = self.submit(self.row(), self.row(quantity=5), {})
+        self.assertRedirects(response, '/my-work/', fetch_redirect_response=False)
+        entries = WorkEntry.objects.order_by('quantity')
+        self.assertEqual([entry.quantity for entry in entries], [2, 5])
+        self.assertTrue(all(entry.tenant_id == self.admin.pk and entry.user_id == self.member.pk for entry in entries))
+        self.assertEqual(ChangeLog.objects.filter(model='workentry').count(), 2)
+
+    def test_one_bad_row_saves_nothing(self):
+        other = User.objects.create_user(
+            username='rival', email='rival@example.com', password='pw12345!x', role='admin')
+        rival_price = Price.objects.create(category='Bags', rate='9.00', managed_by=other)
+        response = self.submit(self.row(), self.row(price=rival_price.pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['formset'].errors[1])
+        self.assertFalse(WorkEntry.objects.exists())
+
+
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        self.row = queue_email('ann@example.com', 'Hello', 'Text body', '<p>HTML body</p>')
+
+    def failing_connection(self):
+        connection = mock.Mock()
+        connection.send_messages.side_effect = OSError('mail server down')
+        return connection
+
+    def test_sent_emails_are_cleared(self):
+        self.assertEqual(send_due_emails(), (1, 0))
+        self.assertEqual(mail.outbox[0].alternatives[0][0], '<p>HTML body</p>')
+        self.row.refresh_from_db()
+        self.assertEqual((self.row.status, self.row.body, self.row.html_body), ('sent', '', ''))
+        self.assertEqual(send_due_emails(), (0, 0))
+
+    def test_failures_are_retried_with_backoff(self):
+        before = timezone.now()
+        self.assertEqual(send_due_emails(connection=self.failing_connection()), (0, 1))
+        self.row.refresh_from_db()
+        self.assertEqual((self.row.status, self.row.attempts), ('pending', 1))
+        self.assertIn('mail server down', self.row.last_error)
+        self.assertGreaterEqual(self.row.next_attempt_at, before + RETRY_BASE)
+        # Not due again until the backoff has passed.
+        self.assertEqual(send_due_emails(), (0, 0))
+
+    def test_gives_up_after_max_attempts(self):
+        EmailOutbox.objects.update(attempts=MAX_ATTEMPTS - 1)
+        send_due_emails(connection=self.failing_connection())
+        self.row.refresh_from_db()
+        self.assertEqual(self.row.status, 'failed')
+
+    def test_leased_rows_are_not_claimed_twice(self):
+        now = timezone.now()
+        self.assertEqual(claim_due_emails(now=now), [self.row])
+        self.assertEqual(claim_due_emails(now=now), [])
+
+    def test_expired_leases_are_taken_over(self):
+        now = timezone.now()
+        claim_due_emails(now=now)
+        rows = claim_due_emails(now=now + SEND_LEASE)
+        self.assertEqual(rows, [self.row])
+        self.assertEqual(rows[0].locked_until, now + 2 * SEND_LEASE)
+
+
+class AttachmentTests(TenantTestCase):
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+        self.client.force_login(self.member)
+
+    def attach(self, name, content=b'0123456789'):
+        project = ClientProject.objects.create(
+            name=name, start_date=datetime.date(2025, 1, 1), created_by=self.admin, managed_by=self.admin,
+            attachment=ContentFile(content, name=name))
+        return project.attachment
+
+    def test_identical_uploads_are_stored_once(self):
+        first, second = self.attach('a.pdf'), self.attach('b.pdf')
+        self.assertEqual(first.name, second.name)
+        self.assertRegex(first.name, r'/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$')
+
+    def test_served_with_immutable_caching_and_a_sandbox(self):
+        response = self.client.get(self.attach('a.pdf').url)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Content-Security-Policy'], 'sandbox')
+        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+        self.assertTrue(response['Content-Disposition'].startswith('inline'))
+        again = self.client.get(self.attach('a.pdf').url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_scriptable_types_are_downloads(self):
+        response = self.client.get(self.attach('page.html', b'<script>alert(1)</script>').url)
+        self.assertTrue(response['Content-Disposition'].startswith('attachment'))
+
+    def test_byte_ranges(self):
+        url = self.attach('a.pdf').url
+        response = self.client.get(url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(b''.join(self.client.get(url, HTTP_RANGE='bytes=-3').streaming_content), b'789')
+        response = self.client.get(url, HTTP_RANGE='bytes=10-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_only_the_tenant_can_fetch_it(self):
+        url = self.attach('a.pdf').url
+        other = User.objects.create_user(
+            username='rival', email='rival@example.com', password='pw12345!x', role='admin')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+
+@skipUnless(connection.vendor == 'sqlite', "SQLite only.")
+class SQLiteConnectionTests(TestCase):
+
+    def pragma(self, name):
+        # The test's own connection is inside a transaction, where some
+        # pragmas cannot change, so open a separate one.
+        new_connection = connections.create_connection(DEFAULT_DB_ALIAS)
+        self.addCleanup(new_connection.close)
+        with new_connection.cursor() as cursor:
+            return cursor.execute(f"PRAGMA {name}").fetchone()[0]
+
+    def test_new_connections_are_tuned(self):
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(connection.settings_dict['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 1234})
+    def test_pragmas_can_be_overridden(self):
+        self.assertEqual(self.pragma('busy_timeout'), 1234)
+
+    def test_other_databases_are_left_alone(self):
+        other = mock.Mock(vendor='postgresql')
+        configure_connection(None, other)
+        other.cursor.assert_not_called()
+
+
+class ArchiveTests(TenantTestCase):
+
+    def setUp(self):
+        self.old = [self.add_entry(quantity=2, date=datetime.date(2022, 3, day)) for day in (1, 2)]
+        self.recent = self.add_entry(quantity=5, date=datetime.date(2025, 3, 1))
+
+    def test_horizon_is_the_start_of_a_month(self):
+        self.assertEqual(archive_horizon(24, today=datetime.date(2026, 10, 19)), datetime.date(2024, 10, 1))
+        self.assertEqual(archive_horizon(10, today=datetime.date(2026, 10, 19)), datetime.date(2025, 12, 1))
+
+    def test_old_entries_move_to_the_archive(self):
+        moved, months = archive_batch(datetime.date(2024, 1, 1))
+        self.assertEqual((moved, months), (2, {datetime.date(2022, 3, 1)}))
+        self.assertEqual(list(WorkEntry.objects.all()), [self.recent])
+        self.assertEqual(ArchivedWorkEntry.objects.filter(tenant=self.admin).count(), 2)
+        tombstones = ChangeLog.objects.filter(action='delete', tenant_id=self.admin.pk)
+        self.assertEqual(sorted(tombstones.values_list('object_id', flat=True)), [entry.pk for entry in self.old])
+        self.assertEqual(archive_batch(datetime.date(2024, 1, 1)), (0, set()))
+
+    def test_monthly_totals_are_rebuilt(self):
+        _, months = archive_batch(datetime.date(2024, 1, 1))
+        refresh_monthly_totals(months)
+        refresh_monthly_totals(months)
+        total = WorkEntryMonthlyTotal.objects.get()
+        self.assertEqual((total.quantity, total.entry_count, total.category), (4, 2, 'Shoes'))
+
+    def test_include_archived_reads_both_tables(self):
+        archive_batch(datetime.date(2024, 1, 1))
+        self.assertEqual(list(work_entries_for(self.admin)), [self.recent])
+        entries = work_entries_for(self.admin, include_archived=True)
+        self.assertEqual([entry.quantity for entry in entries], [2, 2, 5])
+        self.assertEqual(len(work_entries_for(self.member, {'start_date': '2022-03-02'}, include_archived=True)), 2)
+
+    def test_raw_deletes_need_an_unreferenced_model(self):
+        check_raw_deletable(WorkEntry)
+        with self.assertRaises(RuntimeError):
+            check_raw_deletable(Price)
+
+
+class ProjectArchiveTests(TenantTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.finished = ClientProject.objects.create(
+            name='Finished', start_date=datetime.date(2024, 1, 1), end_date=datetime.date(2025, 6, 30),
+            created_by=cls.admin, managed_by=cls.admin)
+
+    def test_finished_projects_are_archived(self):
+        self.assertEqual(archive_finished_projects(today=datetime.date(2025, 7, 1)), 1)
+        self.assertEqual(list(ClientProject.objects.active()), [self.project])
+        self.assertTrue(ChangeLog.objects.filter(model='clientproject', object_id=self.finished.pk).exists())
+        self.assertEqual(archive_finished_projects(today=datetime.date(2025, 7, 1)), 0)
+
+    def test_api_lists_active_projects_unless_asked(self):
+        archive_finished_projects(today=datetime.date(2025, 7, 1))
+        client = self.api(self.admin)
+
+        def names(**params):
+            return sorted(project['name'] for project in client.get('/api/projects/', params).json())
+        self.assertEqual(names(), ['Catalogue'])
+        self.assertEqual(names(status='archived'), ['Finished'])
+        self.assertEqual(names(status='all'), ['Catalogue', 'Finished'])
+        self.assertEqual(client.get('/api/projects/', {'status': 'old'}).status_code, 400)
+
+    def test_dropdowns_only_offer_active_projects(self):
+        archive_finished_projects(today=datetime.date(2025, 7, 1))
+        self.client.force_login(self.member)
+        formset = self.client.get('/submit-work/bulk/').context['formset']
+        self.assertEqual(
+            [label for value, label in formset.forms[0].fields['project'].choices if value], ['Catalogue'])
+
+
+class PivotReportTests(TenantTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.second = User.objects.create_user(
+            username='helper', email='helper@example.com', password='pw12345!x', role='user', managed_by=cls.admin)
+        bags = Price.objects.create(category='Bags', rate='1.00', managed_by=cls.admin)
+        for user, price, quantity, date in [
+            (cls.member, cls.price, 4, datetime.date(2025, 1, 5)),
+            (cls.member, cls.price, 6, datetime.date(2025, 2, 5)),
+            (cls.member, bags, 1, datetime.date(2025, 2, 9)),
+            (cls.second, bags, 3, datetime.date(2025, 1, 7)),
+        ]:
+            WorkEntry.objects.create(user=user, project=cls.project, price=price, quantity=quantity, date=date)
+
+    def test_user_by_month_with_totals(self):
+        report = pivot(WorkEntry.objects.all(), 'user', 'month', ['quantity', 'amount'])
+        self.assertEqual([header['label'] for header in report['rows']['headers']], ['helper', 'worker'])
+        self.assertEqual([header['label'] for header in report['columns']['headers']], ['2025-01', '2025-02'])
+        self.assertEqual(report['values']['quantity'], [[3, 0], [4, 7]])
+        self.assertEqual(report['row_totals']['quantity'], [3, 11])
+        self.assertEqual(report['column_totals']['quantity'], [7, 7])
+        self.assertEqual(report['grand_total']['amount'], Decimal('29.00'))
+
+    def test_rows_only(self):
+        report = pivot(WorkEntry.objects.all(), 'category', None, ['count'])
+        self.assertEqual([header['label'] for header in report['rows']['headers']], ['Bags', 'Shoes'])
+        self.assertEqual(report['values']['count'], [[2], [2]])
+
+    def test_api_validates_the_query(self):
+        client = self.api(self.admin)
+        self.assertEqual(client.get('/api/reports/pivot/', {'rows': 'user', 'columns': 'user'}).status_code, 400)
+        self.assertEqual(client.get('/api/reports/pivot/', {'measures': 'profit'}).status_code, 400)
+        self.assertEqual(self.api(self.member).get('/api/reports/pivot/').status_code, 403)
+        with mock.patch('Invoice.reports.MAX_CELLS', 1):
+            self.assertEqual(client.get('/api/reports/pivot/').status_code, 400)
+
+    def test_api_applies_the_dashboard_filters(self):
+        response = self.api(self.admin).get(
+            '/api/reports/pivot/', {'rows': 'category', 'columns': '', 'start_date': '2025-02-01'})
+        self.assertEqual(response.json()['grand_total'], {'quantity': 7})
+
+    def test_xlsx_has_a_sheet_per_measure(self):
+        response = self.api(self.admin).get('/api/reports/pivot/xlsx/', {'measures': 'count,quantity'})
+        workbook = load_workbook(io.BytesIO(response.content))
+        self.assertEqual(workbook.sheetnames, ['Entries', 'Quantity'])
+        rows = list(workbook['Quantity'].values)
+        self.assertEqual(rows[0], ('User', '2025-01', '2025-02', 'Total'))
+        self.assertEqual(rows[-1], ('Total', 7, 7, 14))
+
+
+class LiveUpdateTests(TenantTestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def subscribe(self, channel):
+        async def subscribe():
+            return live.subscribe(channel)
+        queue = self.loop.run_until_complete(subscribe())
+        self.addCleanup(live.unsubscribe, channel, queue)
+        return queue
+
+    def next_event(self, queue):
+        return self.loop.run_until_complete(asyncio.wait_for(queue.get(), 1))
+
+    def test_new_entries_reach_their_tenants_dashboards(self):
+        queue = self.subscribe(live.channel_for(self.admin))
+        with self.captureOnCommitCallbacks(execute=True):
+            entry = self.add_entry(quantity=3)
+        event = self.next_event(queue)
+        self.assertEqual(event['entries'][0]['id'], entry.pk)
+        self.assertEqual(event['entries'][0]['month'], '2025-01')
+
+    def test_other_tenants_hear_nothing(self):
+        other = User.objects.create_user(
+            username='rival', email='rival@example.com', password='pw12345!x', role='admin')
+        queue = self.subscribe(live.channel_for(other))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_entry()
+        self.assertTrue(queue.empty())
+
+    def test_nothing_is_queued_without_listeners(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.add_entry()
+        self.assertEqual(callbacks, [])
+
+    def test_stream_is_only_served_under_asgi(self):
+        def stream(user, factory):
+            request = factory().get('/api/async/dashboard/stream/')
+
+            async def auser():
+                return user
+            request.auser = auser
+            return async_to_sync(async_views.dashboard_stream_view)(request)
+        self.assertEqual(stream(self.admin, RequestFactory).status_code, 204)
+        self.assertEqual(stream(self.member, AsyncRequestFactory).status_code, 403)
+        response = stream(self.admin, AsyncRequestFactory)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+    def test_dashboard_page_does_not_connect_under_wsgi(self):
+        self.client.force_login(self.admin)
+        self.assertFalse(self.client.get('/dashboard/').context['live_updates'])
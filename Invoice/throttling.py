@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         throttling.py
+# Purpose:      Token-bucket API throttling shared across worker processes.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Rate limiting for the Invoice application.
+
+DRF's stock throttles keep a list of request timestamps per client in the
+default cache, so every check rewrites a growing list and, with a per-process
+cache, every gunicorn worker counts separately. The throttles here keep one
+token bucket per client and scope instead: a check is a single keyed upsert,
+whatever the rate.
+
+Buckets live in a small SQLite file by default, which every worker on the
+host shares (settings.THROTTLE_STORE). The 'cache' backend uses the Django
+cache instead, for deployments with a shared cache server.
+"""
+
+import functools
+import math
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+from rest_framework.throttling import AnonRateThrottle, ScopedRateThrottle, UserRateThrottle
+
+
+class SQLiteBucketStore:
+    """Token buckets in a SQLite file; each check is one atomic statement."""
+
+    def __init__(self, location, **options):
+        self.location = str(location)
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.location, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS throttle_bucket ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def consume(self, key, capacity, refill_rate, now):
+        """
+        Takes one token from the bucket if it has one. Returns (allowed, wait)
+        where wait is the number of seconds until a token is available.
+        """
+        connection = self._connection()
+        # Refill for the elapsed time, then take a token only if one is left.
+        row = connection.execute(
+            "INSERT INTO throttle_bucket (key, tokens, updated) VALUES (?1, ?2 - 1, ?4) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "tokens = MIN(?2, tokens + (?4 - updated) * ?3) - 1, updated = ?4 "
+            "WHERE MIN(?2, tokens + (?4 - updated) * ?3) >= 1 "
+            "RETURNING tokens",
+            (key, capacity, refill_rate, now),
+        ).fetchone()
+        if row is not None:
+            return True, 0.0
+
+        tokens, updated = connection.execute(
+            "SELECT tokens, updated FROM throttle_bucket WHERE key = ?", (key,)
+        ).fetchone()
+        available = min(capacity, tokens + (now - updated) * refill_rate)
+        return False, (1 - available) / refill_rate
+
+
+class CacheBucketStore:
+    """
+    Token buckets in a Django cache. Only as shared as the cache itself, and
+    get/set is not atomic, so concurrent requests may occasionally both pass.
+    """
+
+    def __init__(self, location='default', **options):
+        self.cache = caches[location]
+
+    def consume(self, key, capacity, refill_rate, now):
+        tokens, updated = self.cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_rate)
+        timeout = math.ceil(capacity / refill_rate)
+        if tokens < 1:
+            self.cache.set(key, (tokens, now), timeout)
+            return False, (1 - tokens) / refill_rate
+        self.cache.set(key, (tokens - 1, now), timeout)
+        return True, 0.0
+
+
+STORE_BACKENDS = {
+    'sqlite': SQLiteBucketStore,
+    'cache': CacheBucketStore,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_bucket_store():
+    """Returns the process-wide bucket store configured in THROTTLE_STORE."""
+    config = dict(settings.THROTTLE_STORE)
+    backend = config.pop('BACKEND', 'sqlite')
+    store_class = STORE_BACKENDS.get(backend) or import_string(backend)
+    return store_class(**{key.lower(): value for key, value in config.items()})
+
+
+class BucketThrottleMixin:
+    """
+    Replaces SimpleRateThrottle's timestamp history with a token bucket that
+    holds ``num_requests`` tokens and refills over ``duration``.
+
+    Sub-requests dispatched by the batch endpoint were already counted as
+    part of the batch, so they skip the throttle unless ``counts_batched``.
+    """
+    counts_batched = False
+
+    def allow_request(self, request, view):
+        # DRF views pass a Request wrapping the HttpRequest; throttle_scope() the HttpRequest.
+        batched = getattr(getattr(request, '_request', request), 'batched', False)
+        if batched and not self.counts_batched:
+            return True
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        allowed, self._wait = get_bucket_store().consume(
+            self.key, self.num_requests, self.num_requests / self.duration, self.timer())
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class AnonBucketThrottle(BucketThrottleMixin, AnonRateThrottle):
+    """Limits unauthenticated requests per client IP ('anon' rate)."""
+
+
+class UserBucketThrottle(BucketThrottleMixin, UserRateThrottle):
+    """Limits authenticated requests per user ('user' rate)."""
+
+
+class ScopedBucketThrottle(BucketThrottleMixin, ScopedRateThrottle):
+    """
+    Limits views that set ``throttle_scope`` using that scope's rate, on top
+    of the general user/anon limits. These guard the expensive endpoints, so
+    they still apply inside a batch.
+    """
+    counts_batched = True
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+
+def throttle_scope(scope):
+    """
+    Applies a scoped rate from DEFAULT_THROTTLE_RATES to a regular Django
+    view, answering 429 with Retry-After once the bucket is empty.
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            throttle = ScopedBucketThrottle()
+            view = type('ThrottledView', (), {'throttle_scope': scope})
+            if not throttle.allow_request(request, view):
+                response = HttpResponse("Too many requests. Please try again later.", status=429)
+                response['Retry-After'] = str(math.ceil(throttle.wait()))
+                return response
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
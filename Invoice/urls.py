@@ -20,13 +20,17 @@ from .views import (
     home_view,
     CustomLoginView,
     work_entry_form_view,
+    work_entry_formset_view,
     my_work_entries_view,
     dashboard_template_view,
     admin_panel_view,
     my_team_view,
+    import_team_view,
     manage_projects_view,
     delete_project_view,
     manage_prices_view,
+    import_prices_view,
+    adjust_prices_view,
     price_edit_view,
     delete_price_view,
     export_page_view,
@@ -42,17 +46,21 @@ urlpatterns = [
 
     # --- User-Specific Pages ---
     path('submit-work/', work_entry_form_view, name='submit_work_entry'),
+    path('submit-work/bulk/', work_entry_formset_view, name='submit_work_entries'),
     path('my-work/', my_work_entries_view, name='my_work_entries'),
 
     # --- Admin Dashboards ---
     path('dashboard/', dashboard_template_view, name='dashboard'),
     path('admin-panel/', admin_panel_view, name='admin_panel'),
     path('my-team/', my_team_view, name='my_team'),
+    path('my-team/import/', import_team_view, name='import_team'),
 
     # --- Management Pages ---
     path('manage/projects/', manage_projects_view, name='manage_projects'),
     path('manage/projects/delete/<int:project_id>/', delete_project_view, name='delete_project'),
     path('manage/prices/', manage_prices_view, name='manage_prices'),
+    path('manage/prices/import/', import_prices_view, name='import_prices'),
+    path('manage/prices/adjust/', adjust_prices_view, name='adjust_prices'),
     path('manage/prices/<int:id>/edit/', price_edit_view, name='price_edit'),
     path('manage/prices/delete/<int:id>/', delete_price_view, name='delete_price'),
     
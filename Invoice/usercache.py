@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Name:         usercache.py
+# Purpose:      Short-lived, per-worker cache of authenticated users.
+#
+# Author:       AnikRoy
+# GitHub:       https://github.com/aroyslipk
+#
+# Created:      2026-10-19
+# Copyright:    (c) AnikRoy 2025
+# Licence:      Proprietary
+# -----------------------------------------------------------------------------
+
+"""
+Per-worker cache of the users that requests authenticate as.
+
+Both the session backend and JWT authentication resolve the request's user
+by primary key on every request, and most views then follow
+``user.managed_by``. Users are cached here together with their managing
+admin for USER_CACHE_TTL seconds, so a warm worker serves those requests
+without a user query.
+
+Entries are dropped in this worker by the User signal receivers as soon as a
+user (or their managing admin) is saved or deleted, which covers password
+and role changes. Other workers keep their copy until it expires, so the TTL
+bounds how long a change can take to apply everywhere.
+"""
+
+import copy
+import time
+
+from django.conf import settings
+
+from .models import User
+
+# Upper bound on cached users per worker; the cache is simply emptied when
+# it is exceeded.
+MAX_ENTRIES = 10000
+
+_entries = {}
+
+
+def _ttl():
+    return getattr(settings, 'USER_CACHE_TTL', 30)
+
+
+def _detached(user):
+    """
+    Returns a copy of a cached user, so a request that modifies its user (or
+    the user's admin) can't leak the change into other requests.
+    """
+    user = copy.copy(user)
+    if user.managed_by_id is not None:
+        user.managed_by = copy.copy(user.managed_by)
+    return user
+
+
+def get_user(user_id):
+    """
+    Returns the user with the given primary key, with its managing admin
+    loaded, or None if there is no such user.
+    """
+    key = str(user_id)
+    entry = _entries.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return _detached(entry[1])
+
+    user = User.objects.select_related('managed_by').filter(pk=user_id).first()
+    if user is None:
+        _entries.pop(key, None)
+        return None
+    if len(_entries) >= MAX_ENTRIES:
+        _entries.clear()
+    _entries[key] = (time.monotonic() + _ttl(), user)
+    return _detached(user)
+
+
+def invalidate_user(user_id):
+    """
+    Drops a user from this worker's cache, along with every cached user
+    managed by them (whose cached ``managed_by`` would otherwise be stale).
+    """
+    key = str(user_id)
+    _entries.pop(key, None)
+    for other_key, (_, user) in list(_entries.items()):
+        if str(user.managed_by_id) == key:
+            _entries.pop(other_key, None)
+
+
+def clear():
+    """Empties this worker's cache."""
+    _entries.clear()
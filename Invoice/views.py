@@ -18,6 +18,10 @@ API endpoints, and business logic for the multi-tenant permission system.
 
 # Python Standard Library Imports
 import datetime
+import hashlib
+import io
+import logging
+from urllib.parse import urlsplit
 from pathlib import Path
 from copy import copy
 import os
@@ -28,20 +32,24 @@ from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.views import LoginView
+from django.core.handlers.asgi import ASGIRequest
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.db.models.deletion import RestrictedError
 from django.http import HttpResponse, Http404
+from django.urls import Resolver404, resolve
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.dateparse import parse_date
 from django.conf import settings
 from .forms import PriceForm, WorkEntryForm, AdminUserCreationForm
 from django.contrib import messages
-from .forms import PriceForm, WorkEntryForm, AdminUserCreationForm, ClientProjectForm
-from django.db.models import Count, Sum
+from .forms import PriceForm, WorkEntryForm, AdminUserCreationForm, ClientProjectForm, PriceImportForm, PriceAdjustForm, TeamImportForm, WorkEntryFormSet
+from django.db.models import Count, Q, Sum
 from django.utils import timezone
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.crypto import get_random_string
-from django.db.models.functions import ExtractWeekDay
 
 
 # Third-Party Library Imports
@@ -49,17 +57,40 @@ from openpyxl import Workbook, load_workbook
 from num2words import num2words
 from openpyxl.styles import Font, Border, Side, Alignment, PatternFill
 from rest_framework import generics, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 # Local Application Imports
+from .analytics import dashboard_entries_for, dashboard_querysets, filter_work_entries, summarize_dashboard
+from .archive import work_entries_for
+from . import live
+from .caching import PRICES, PROJECTS, get_change_stamp, tenant_for_user
+from .idempotency import IdempotentCreateMixin, idempotent_response
+from .importers import (
+    ImportValidationError, adjust_prices, create_team_members, parse_price_book,
+    parse_team_roster, read_table, upsert_prices,
+)
+from .outbox import queue_email, welcome_email
+from .purge import soft_delete
+from .reports import PivotTooLarge, pivot, pivot_workbook
+from .routers import ReplicaReadMixin, use_replica
+from .sync import UPSERT, build_delta, build_snapshot, record_changes
+from .throttling import throttle_scope
 from .forms import PriceForm, WorkEntryForm
-from .models import ClientProject, Price, User, WorkEntry
+from .models import ClientProject, Price, PurgeJob, User, WorkEntry
 from .serializers import (
-    ClientProjectSerializer, PriceSerializer, RegisterSerializer,
-    UserSerializer, WorkDashboardSerializer, WorkEntrySerializer,
+    BatchSerializer, ClientProjectSerializer, ClientProjectValuesSerializer,
+    DashboardFilterSerializer, ExportFilterSerializer, PivotQuerySerializer, PriceAdjustSerializer, PriceImportSerializer,
+    PriceSerializer, PriceValuesSerializer, TeamImportSerializer,
+    RegisterSerializer, SyncQuerySerializer, UserSerializer, WorkDashboardSerializer,
+    WorkDashboardValuesSerializer, WorkEntrySerializer,
+    WorkEntryValuesSerializer,
 )
 
+logger = logging.getLogger(__name__)
+
 
 # --- Core & Template Views ---
 
@@ -69,6 +100,7 @@ def home_view(request):
 
 
 @login_required
+@use_replica
 def dashboard_template_view(request):
     """
     Renders a comprehensive, interactive dashboard that includes summary cards,
@@ -81,12 +113,12 @@ def dashboard_template_view(request):
     # --- Step 1: Initial Querysets based on User Role ---
     projects_qs = ClientProject.objects.all()
     users_qs = User.objects.filter(role='user')
-    entries_qs = WorkEntry.objects.select_related('user', 'project')
+    entries_qs = WorkEntry.objects.visible().select_related('user', 'project', 'price')
 
     if user.role == 'admin':
         projects_qs = projects_qs.filter(managed_by=user)
         users_qs = users_qs.filter(managed_by=user)
-        entries_qs = entries_qs.filter(project__managed_by=user)
+        entries_qs = entries_qs.filter(tenant=user)
 
     # --- Step 2: Apply Advanced Filtering from GET Parameters ---
     selected_project_id = request.GET.get('project')
@@ -94,89 +126,59 @@ def dashboard_template_view(request):
     start_date = request.GET.get('start_date')
     end_date = request.GET.get('end_date')
 
-    if selected_project_id:
-        entries_qs = entries_qs.filter(project_id=selected_project_id)
-    if selected_user_id:
-        entries_qs = entries_qs.filter(user_id=selected_user_id)
-    if start_date:
-        entries_qs = entries_qs.filter(date__gte=start_date)
-    if end_date:
-        entries_qs = entries_qs.filter(date__lte=end_date)
+    entries_qs = filter_work_entries(
+        entries_qs,
+        project=selected_project_id,
+        user=selected_user_id,
+        start_date=start_date,
+        end_date=end_date,
+    )
     
     # --- Step 3: Calculate Data for Existing Cards (using filtered data) ---
     total_projects = projects_qs.count()
     total_team_members = users_qs.count()
-    current_month_entries = entries_qs.filter(
-        date__year=timezone.now().year,
-        date__month=timezone.now().month
-    ).count()
 
-    # --- Step 4: Calculate Data for New Analytics Cards ---
-    # Busiest Day of the Week
-    busiest_day_query = entries_qs.annotate(
-        weekday=ExtractWeekDay('date')
-    ).values('weekday').annotate(count=Count('id')).order_by('-count').first()
-    
-    if busiest_day_query:
-        weekday_map = {1: 'Sunday', 2: 'Monday', 3: 'Tuesday', 4: 'Wednesday', 5: 'Thursday', 6: 'Friday', 7: 'Saturday'}
-        busiest_day = weekday_map.get(busiest_day_query['weekday'], 'N/A')
-    else:
-        busiest_day = 'N/A'
-
-    # Most Productive User (by Quantity)
-    most_productive_user_query = entries_qs.values('user__username').annotate(
-        total_quantity=Sum('quantity')
-    ).order_by('-total_quantity').first()
-    
-    most_productive_user = most_productive_user_query['user__username'] if most_productive_user_query else 'N/A'
-    
-    # --- Step 5: Calculate Data for Charts ---
-    category_data = entries_qs.values('category').annotate(count=Count('id')).order_by('-count')
-    pie_chart_labels = [item['category'] for item in category_data]
-    pie_chart_data = [item['count'] for item in category_data]
-
-    monthly_data = (
-        entries_qs.values('date__year', 'date__month')
-        .annotate(count=Count('id'))
-        .order_by('date__year', 'date__month')
+    # --- Step 4 & 5: Calculate Data for Analytics Cards and Charts ---
+    analytics = dashboard_querysets(entries_qs)
+    summary = summarize_dashboard(
+        current_month_entries=analytics['current_month_entries'].count(),
+        busiest_day=analytics['busiest_day'].first(),
+        most_productive_user=analytics['most_productive_user'].first(),
+        category=list(analytics['category']),
+        monthly=list(analytics['monthly']),
     )
-    bar_chart_labels = [f"{item['date__year']}-{item['date__month']:02d}" for item in monthly_data]
-    bar_chart_data = [item['count'] for item in monthly_data]
 
     # --- Step 6: Prepare the Final Context for the Template ---
     context = {
         'total_projects': total_projects,
         'total_team_members': total_team_members,
-        'current_month_entries': current_month_entries,
-        'busiest_day': busiest_day, # নতুন ডেটা যোগ করা হয়েছে
-        'most_productive_user': most_productive_user, # নতুন ডেটা যোগ করা হয়েছে
-        
+        **summary,
+
         'entries': entries_qs.order_by('-date'),
-        
-        'pie_chart_labels': pie_chart_labels,
-        'pie_chart_data': pie_chart_data,
-        'bar_chart_labels': bar_chart_labels,
-        'bar_chart_data': bar_chart_data,
 
-        'all_projects': projects_qs.order_by('name'),
+        'all_projects': projects_qs.active().order_by('name'),
         'all_users': users_qs.order_by('username'),
 
         'selected_project_id': selected_project_id,
         'selected_user_id': selected_user_id,
         'start_date': start_date,
         'end_date': end_date,
+
+        # The live stream needs an async server; see async_views.dashboard_stream_view.
+        'live_updates': isinstance(request, ASGIRequest),
     }
     
     return render(request, 'dashboard.html', context)
 
 
 @login_required
+@use_replica
 def admin_panel_view(request):
     """Displays the super admin panel with access to all system data."""
     if request.user.role != 'super_admin':
         return render(request, 'unauthorized.html')
     context = {
-        'work_entries': WorkEntry.objects.all().order_by('-date'),
+        'work_entries': WorkEntry.objects.visible().select_related('user', 'project', 'price').order_by('-date'),
         'prices': Price.objects.all(),
         'projects': ClientProject.objects.all(),
         'users': User.objects.all(),
@@ -203,6 +205,49 @@ def work_entry_form_view(request):
     return render(request, 'work_entry_form.html', {'form': form})
 
 
+@login_required
+def work_entry_formset_view(request):
+    """
+    Lets a user submit several work entries at once. The admin's projects
+    and prices are fetched once for all rows, and the entries are inserted
+    with a single bulk_create.
+    """
+    user = request.user
+    if user.role != 'user':
+        return render(request, 'unauthorized.html')
+
+    admin_id = user.managed_by_id
+    form_kwargs = {'project_choices': [], 'price_choices': []}
+    if admin_id is not None:
+        form_kwargs = {
+            'project_choices': list(
+                ClientProject.objects.active().filter(managed_by_id=admin_id)
+                .order_by('name').values_list('id', 'name')),
+            'price_choices': list(
+                Price.objects.filter(managed_by_id=admin_id)
+                .order_by('category').values_list('id', 'category')),
+        }
+
+    if request.method == 'POST':
+        formset = WorkEntryFormSet(request.POST, form_kwargs=form_kwargs)
+        if formset.is_valid():
+            # Every offered project is managed by the user's admin, who is
+            # therefore the tenant of every row.
+            entries = formset.entries(user=user, tenant_id=admin_id)
+            with transaction.atomic():
+                WorkEntry.objects.bulk_create(entries)
+                record_changes(
+                    WorkEntry, [entry.pk for entry in entries], UPSERT, admin_id,
+                    {entry.pk: user.pk for entry in entries},
+                )
+                live.publish_entries(entries)
+            messages.success(request, f"{len(entries)} work entries submitted.")
+            return redirect('my_work_entries')
+    else:
+        formset = WorkEntryFormSet(form_kwargs=form_kwargs)
+    return render(request, 'work_entry_formset.html', {'formset': formset})
+
+
 @login_required
 def my_work_entries_view(request):
     """
@@ -214,7 +259,7 @@ def my_work_entries_view(request):
 
     user = request.user
     now = timezone.now()
-    work_entries = WorkEntry.objects.filter(user=user).select_related('project')
+    work_entries = WorkEntry.objects.for_user(user).select_related('project', 'price')
 
     # --- ফিল্টার লজিক ---
     start_date = request.GET.get('start_date')
@@ -226,7 +271,8 @@ def my_work_entries_view(request):
     if end_date:
         work_entries = work_entries.filter(date__lte=end_date)
     if query:
-        work_entries = work_entries.filter(category__icontains=query)
+        work_entries = work_entries.filter(
+            Q(price__category__icontains=query) | Q(legacy_category__icontains=query))
 
     # --- সারসংক্ষেপ কার্ডের জন্য ডেটা গণনা ---
     total_entries_month = work_entries.filter(
@@ -301,10 +347,69 @@ def manage_prices_view(request):
     context = {
         'form': form,
         'prices': prices,
+        'import_form': PriceImportForm(),
+        'adjust_form': PriceAdjustForm(),
     }
     return render(request, 'manage_prices.html', context)
 
 
+@login_required
+@throttle_scope('import')
+def import_prices_view(request):
+    """
+    Imports a CSV/XLSX price book for the current admin, creating new folder
+    names and updating the rates of existing ones in one batched upsert.
+    """
+    user = request.user
+    if user.role not in ['admin', 'super_admin']:
+        return render(request, 'unauthorized.html')
+    if request.method != 'POST':
+        return redirect('manage_prices')
+
+    form = PriceImportForm(request.POST, request.FILES)
+    if not form.is_valid():
+        messages.error(request, "Please choose a .csv or .xlsx file to import.")
+        return redirect('manage_prices')
+
+    try:
+        rates = parse_price_book(*read_table(form.cleaned_data['file']))
+    except ImportValidationError as exc:
+        for error in exc.errors[:10]:
+            messages.error(request, error)
+        return redirect('manage_prices')
+
+    summary = upsert_prices(user, rates)
+    messages.success(
+        request,
+        f"Price book imported: {summary['created']} added, {summary['updated']} updated.",
+    )
+    return redirect('manage_prices')
+
+
+@login_required
+def adjust_prices_view(request):
+    """Raises or lowers all of the current admin's rates by a percentage."""
+    user = request.user
+    if user.role not in ['admin', 'super_admin']:
+        return render(request, 'unauthorized.html')
+    if request.method != 'POST':
+        return redirect('manage_prices')
+
+    form = PriceAdjustForm(request.POST)
+    if form.is_valid():
+        percent = form.cleaned_data['percent']
+        try:
+            updated = adjust_prices(Price.objects.filter(managed_by=user), percent)
+        except ImportValidationError as exc:
+            for error in exc.errors:
+                messages.error(request, error)
+            return redirect('manage_prices')
+        messages.success(request, f"Adjusted {updated} rate(s) by {percent}%.")
+    else:
+        messages.error(request, "Please enter a valid percentage.")
+    return redirect('manage_prices')
+
+
 
 @login_required
 def price_edit_view(request, id):
@@ -337,7 +442,11 @@ def delete_price_view(request, id):
         return render(request, 'unauthorized.html')
     
     category_name = price.category
-    price.delete()
+    try:
+        price.delete()
+    except RestrictedError:
+        messages.error(request, f"Price for '{category_name}' is used by work entries and cannot be deleted.")
+        return redirect('manage_prices')
     messages.success(request, f"Price for '{category_name}' has been deleted.")
     return redirect('manage_prices')
 
@@ -355,7 +464,7 @@ def export_page_view(request):
 def my_team_view(request):
     """
     Allows an admin to view their managed users and add new ones.
-    Sends a welcome email with a temporary password to the new user.
+    Queues a welcome email with a temporary password to the new user.
     """
     if request.user.role not in ['admin', 'super_admin']:
         return render(request, 'unauthorized.html')
@@ -371,25 +480,15 @@ def my_team_view(request):
             
             new_user.role = 'user'
             new_user.managed_by = request.user
-            new_user.save()
 
             # --- নতুন ইউজারকে ওয়েলকাম ইমেইল পাঠানো ---
-            mail_subject = 'Welcome to InvoiceApp!'
-            message = render_to_string('welcome_email.html', {
-                'user': new_user,
-                'password': password,
-                'admin_name': request.user.username,
-            })
+            # The email is queued in the same transaction as the user and
+            # delivered by the send_outbox command.
+            with transaction.atomic():
+                new_user.save()
+                queue_email(*welcome_email(new_user, password, request.user.username))
             
-            send_mail(
-                subject=mail_subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[new_user.email],
-                html_message=message
-            )
-            
-            messages.success(request, f"User '{new_user.username}' was created successfully! A welcome email with credentials has been sent.")
+            messages.success(request, f"User '{new_user.username}' was created successfully! A welcome email with credentials has been queued.")
             return redirect('my_team')
     else:
         form = AdminUserCreationForm()
@@ -401,10 +500,40 @@ def my_team_view(request):
     
     context = {
         'form': form,
+        'import_form': TeamImportForm(),
         'managed_users': managed_users
     }
     return render(request, 'my_team.html', context)
 
+
+@login_required
+@throttle_scope('import')
+def import_team_view(request):
+    """
+    Adds every team member listed in a CSV/XLSX roster. All rows are
+    validated before any user is created.
+    """
+    if request.user.role not in ['admin', 'super_admin']:
+        return render(request, 'unauthorized.html')
+    if request.method != 'POST':
+        return redirect('my_team')
+
+    form = TeamImportForm(request.POST, request.FILES)
+    if not form.is_valid():
+        messages.error(request, "Please choose a .csv or .xlsx file to import.")
+        return redirect('my_team')
+
+    try:
+        members = parse_team_roster(*read_table(form.cleaned_data['file']))
+        users = create_team_members(request.user, members)
+    except ImportValidationError as exc:
+        for error in exc.errors[:10]:
+            messages.error(request, error)
+        return redirect('my_team')
+
+    messages.success(request, f"{len(users)} users were created. Welcome emails with credentials have been queued.")
+    return redirect('my_team')
+
 @login_required
 def manage_projects_view(request):
     """
@@ -436,13 +565,17 @@ def manage_projects_view(request):
     context = {
         'form': form,
         'projects': projects,
+        # Deletions still being purged in the background.
+        'purge_jobs': PurgeJob.objects.filter(requested_by=user, model='clientproject')
+                      .exclude(status='done').order_by('-id')[:10],
     }
     return render(request, 'manage_projects.html', context)
 
 @login_required
 def delete_project_view(request, project_id):
     """
-    Deletes a specific project after ownership verification.
+    Deletes a specific project after ownership verification. The project is
+    hidden at once; its work entries are purged in the background.
     """
     user = request.user
     project = get_object_or_404(ClientProject, id=project_id)
@@ -451,13 +584,14 @@ def delete_project_view(request, project_id):
     if user.role != 'super_admin' and project.managed_by != user:
         return render(request, 'unauthorized.html')
 
-    project_name = project.name
-    project.delete()
-    messages.success(request, f"Project '{project_name}' has been deleted.")
+    soft_delete(project, requested_by=user)
+    messages.success(request, f"Project '{project.name}' has been deleted. Its work entries are being removed in the background.")
     return redirect('manage_projects')
 
 
 @login_required
+@throttle_scope('invoice')
+@use_replica
 def generate_invoice(request, project_id):
     """
     Generates and downloads a secure, role-filtered XLSX invoice,
@@ -470,15 +604,11 @@ def generate_invoice(request, project_id):
     if user.role != 'super_admin' and project.managed_by != user:
         return render(request, 'unauthorized.html')
 
-    # Filter data based on user role.
-    if user.role == 'super_admin':
-        entries = WorkEntry.objects.filter(project=project).order_by('date')
-        prices_qs = Price.objects.all()
-    else:  # 'admin' role
-        entries = WorkEntry.objects.filter(project=project, project__managed_by=user).order_by('date')
-        prices_qs = Price.objects.filter(managed_by=user)
-    
-    prices = {p.category.lower(): p.rate for p in prices_qs}
+    # Filter data based on user role; ?include_archived=1 adds archived entries.
+    entries = work_entries_for(
+        user, {'project': project.id},
+        include_archived=request.GET.get('include_archived') in ('1', 'true', 'on'),
+    )
     
     template_path = os.path.join(settings.BASE_DIR, 'static', 'template', 'InvoiceTemplate.xlsx')
 
@@ -500,7 +630,7 @@ def generate_invoice(request, project_id):
         total_quantity_sum, total_amount_numeric = 0, 0
         
         for entry in entries:
-            rate_for_entry = float(prices.get(entry.category.lower(), 0))
+            rate_for_entry = float(entry.price.rate) if entry.price_id else 0.0
             amount_for_entry = entry.quantity * rate_for_entry
             total_quantity_sum += entry.quantity
             total_amount_numeric += amount_for_entry
@@ -549,6 +679,76 @@ def generate_invoice(request, project_id):
 # --- API Views (DRF) with full security and role-based filtering ---
 # --------------------------------------------------------------------------
 
+class ValuesListMixin:
+    """
+    Serves list responses through a ``ValuesSerializer`` so large lists are
+    built from row tuples rather than model instances. Writes still go
+    through the regular ``serializer_class``.
+
+    Supports ``?fields=a,b`` to return (and select) only some fields and,
+    where the serializer declares sideloads, ``?include=project,user`` to
+    return the related objects in an ``included`` block of the same payload.
+    """
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.values_serializer_class.from_request(
+            request, context=self.get_serializer_context())
+        rows = serializer.get_rows(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is None and serializer.include:
+            page_rows = list(rows)
+        else:
+            page_rows = page if page is not None else rows
+        data = serializer.to_representation(page_rows)
+
+        if page is not None:
+            response = self.get_paginated_response(data)
+            if serializer.include:
+                response.data['included'] = serializer.get_included(page_rows)
+            return response
+        if serializer.include:
+            data = {'results': data, 'included': serializer.get_included(page_rows)}
+        return Response(data)
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag/Last-Modified validators to GET responses and answers matching
+    If-None-Match / If-Modified-Since requests with 304 before the view runs.
+
+    Views either set ``change_scope`` to use the per-tenant change stamp of
+    that scope, or override ``get_validators()``.
+    """
+    change_scope = None
+
+    def get_validators(self, request):
+        """Returns (etag, last_modified) for the current request."""
+        stamp = get_change_stamp(self.change_scope, tenant_for_user(request.user))
+        # The representation also depends on the query string and media type.
+        variant = hashlib.md5(
+            f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}".encode(),
+            usedforsecurity=False,
+        ).hexdigest()[:12]
+        return f"{self.change_scope}-{request.user.pk}-{stamp}-{variant}", stamp
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        etag = quote_etag(etag)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if 200 <= response.status_code < 300 or response.status_code == 304:
+            response.headers.setdefault('ETag', etag)
+            if last_modified is not None:
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Accept', 'Authorization', 'Cookie'))
+        return response
+
+
 class RegisterView(generics.CreateAPIView):
     """API endpoint for public user registration."""
     queryset = User.objects.all()
@@ -556,63 +756,150 @@ class RegisterView(generics.CreateAPIView):
     permission_classes = [permissions.AllowAny]
 
 
-class ProfileView(generics.RetrieveAPIView):
+class ProfileView(ConditionalGetMixin, generics.RetrieveAPIView):
     """API endpoint to view the profile of the currently logged-in user."""
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
     def get_object(self):
         return self.request.user
 
+    def get_validators(self, request):
+        # The profile is built from the already-loaded user, so hash it directly.
+        user = request.user
+        fingerprint = f"{user.pk}|{user.username}|{user.email}|{user.role}|{request.META.get('HTTP_ACCEPT', '')}"
+        return hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest(), None
+
 
-class WorkEntryListCreateView(generics.ListCreateAPIView):
-    """API endpoint to list and create work entries."""
+class WorkEntryListCreateView(IdempotentCreateMixin, ValuesListMixin, generics.ListCreateAPIView):
+    """API endpoint to list and create work entries (POST honours Idempotency-Key)."""
     serializer_class = WorkEntrySerializer
+    values_serializer_class = WorkEntryValuesSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        user = self.request.user
-        if user.role == 'super_admin':
-            return WorkEntry.objects.all()
-        if user.role == 'admin':
-            return WorkEntry.objects.filter(project__managed_by=user)
-        return WorkEntry.objects.filter(user=user)
+        return WorkEntry.objects.for_user(self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
-class ExportWorkEntriesXLSXView(generics.GenericAPIView):
-    """API endpoint to export work entries to an XLSX file."""
+class ExportWorkEntriesXLSXView(ReplicaReadMixin, generics.GenericAPIView):
+    """
+    API endpoint to export work entries to an XLSX file.
+
+    Accepts the dashboard filters (?project=, ?user=, ?start_date=,
+    ?end_date=); ?include_archived=1 adds entries moved to the archive.
+    """
+    throttle_scope = 'export'
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request, *args, **kwargs):
         user = request.user
         if user.role not in ["admin", "super_admin"]:
             return Response({"detail": "Not authorized."}, status=403)
-        # ... (Your Export logic from previous version, now secured) ...
-        return Response({"detail": "Export successful."}) # Placeholder response
+
+        filters = ExportFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        include_archived = filters.validated_data.pop('include_archived')
+        entries = work_entries_for(
+            user, filters.validated_data, include_archived=include_archived,
+            select_related=('user', 'project', 'price'),
+        )
+
+        # A write-only workbook streams rows out instead of keeping cells in memory.
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Work Entries")
+        ws.append(["Date", "User", "Project", "Folder Name", "Quantity", "Rate", "Amount"])
+        for entry in entries:
+            rate = entry.price.rate if entry.price_id else 0
+            ws.append([
+                entry.date, entry.user.username, entry.project.name if entry.project_id else "",
+                entry.category, entry.quantity, rate, entry.quantity * rate,
+            ])
+
+        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        response['Content-Disposition'] = f'attachment; filename="WorkEntries_{datetime.date.today()}.xlsx"'
+        wb.save(response)
+        return response
+
+
+class PivotReportView(ReplicaReadMixin, generics.GenericAPIView):
+    """
+    API endpoint for pivot reports of work entries, for admins.
+
+    ?rows= and ?columns= choose the dimensions (user, project, category, day,
+    week or month; columns may be left empty) and ?measures= a comma-separated
+    list of count, quantity and amount. The dashboard filters apply too.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_report(self, request):
+        query = PivotQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = dict(query.validated_data)
+        dimensions = {key: params.pop(key) for key in ('rows', 'columns', 'measures')}
+        entries = filter_work_entries(WorkEntry.objects.for_user(request.user), **params)
+        try:
+            return pivot(entries, **dimensions)
+        except PivotTooLarge as exc:
+            raise ValidationError(str(exc))
+
+    def get(self, request, *args, **kwargs):
+        if request.user.role not in ['admin', 'super_admin']:
+            return Response({"detail": "Not authorized."}, status=403)
+        return Response(self.get_report(request))
+
+
+class PivotReportXLSXView(PivotReportView):
+    """The pivot report as an XLSX workbook, one sheet per measure."""
+    throttle_scope = 'export'
+
+    def get(self, request, *args, **kwargs):
+        if request.user.role not in ['admin', 'super_admin']:
+            return Response({"detail": "Not authorized."}, status=403)
+        wb = pivot_workbook(self.get_report(request))
+        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        response['Content-Disposition'] = f'attachment; filename="Report_{datetime.date.today()}.xlsx"'
+        wb.save(response)
+        return response
 
 
-class DashboardView(generics.ListAPIView):
-    """API endpoint for dashboard data, filtered by role."""
+class DashboardView(ReplicaReadMixin, ValuesListMixin, generics.ListAPIView):
+    """
+    API endpoint for dashboard data, filtered by role.
+
+    Supports the same ?project=, ?user=, ?start_date= and ?end_date= filters
+    as the dashboard page. Users and projects are joined in the same query and
+    only the serialized columns are fetched, so a page costs a fixed number of
+    queries. Pass ?limit= (and ?offset=) to paginate.
+    """
     serializer_class = WorkDashboardSerializer
+    values_serializer_class = WorkDashboardValuesSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = LimitOffsetPagination
 
     def get_queryset(self):
         user = self.request.user
-        if user.role == 'super_admin':
-            queryset = WorkEntry.objects.all()
-        elif user.role == 'admin':
-            queryset = WorkEntry.objects.filter(project__managed_by=user)
-        else:
+        if user.role not in ['admin', 'super_admin']:
             return WorkEntry.objects.none()
-        # ... (Your query parameter filtering logic remains here) ...
-        return queryset
+        queryset = dashboard_entries_for(user)
+
+        filters = DashboardFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        queryset = filter_work_entries(queryset, **filters.validated_data)
+
+        return (
+            queryset.select_related('user', 'project', 'price')
+            .only('id', 'legacy_category', 'quantity', 'date', 'user__username', 'project__name', 'price__category')
+            .order_by('-date', '-id')
+        )
 
 
-class PriceListCreateView(generics.ListCreateAPIView):
-    """API endpoint for listing and creating prices."""
+class PriceListCreateView(IdempotentCreateMixin, ConditionalGetMixin, ValuesListMixin, generics.ListCreateAPIView):
+    """API endpoint for listing and creating prices (POST honours Idempotency-Key)."""
     serializer_class = PriceSerializer
+    values_serializer_class = PriceValuesSerializer
+    change_scope = PRICES
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -625,9 +912,72 @@ class PriceListCreateView(generics.ListCreateAPIView):
         serializer.save(managed_by=self.request.user)
 
 
-class PriceDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PriceImportView(generics.GenericAPIView):
+    """
+    API endpoint to upsert the caller's price book from a CSV/XLSX upload.
+    Every row is validated first; nothing is written if any row is invalid.
+    """
+    serializer_class = PriceImportSerializer
+    throttle_scope = 'import'
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        if request.user.role not in ['admin', 'super_admin']:
+            return Response({"detail": "Not authorized."}, status=403)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            rates = parse_price_book(*read_table(serializer.validated_data['file']))
+        except ImportValidationError as exc:
+            return Response({"errors": exc.errors}, status=400)
+        return Response(upsert_prices(request.user, rates))
+
+
+class TeamImportView(generics.GenericAPIView):
+    """
+    API endpoint to create the caller's team members from a CSV/XLSX roster.
+    Every row is validated first; nothing is written if any row is invalid.
+    """
+    serializer_class = TeamImportSerializer
+    throttle_scope = 'import'
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        if request.user.role not in ['admin', 'super_admin']:
+            return Response({"detail": "Not authorized."}, status=403)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            members = parse_team_roster(*read_table(serializer.validated_data['file']))
+            users = create_team_members(request.user, members)
+        except ImportValidationError as exc:
+            return Response({"errors": exc.errors}, status=400)
+        return Response({"created": UserSerializer(users, many=True).data}, status=201)
+
+
+class PriceAdjustView(generics.GenericAPIView):
+    """API endpoint to scale all of the caller's rates by a percentage in one UPDATE."""
+    serializer_class = PriceAdjustSerializer
+    throttle_scope = 'import'
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        if request.user.role not in ['admin', 'super_admin']:
+            return Response({"detail": "Not authorized."}, status=403)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            updated = adjust_prices(
+                Price.objects.filter(managed_by=request.user), serializer.validated_data['percent'])
+        except ImportValidationError as exc:
+            return Response({"errors": exc.errors}, status=400)
+        return Response({"updated": updated})
+
+
+class PriceDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """API endpoint for retrieving, updating, or deleting a specific price."""
     serializer_class = PriceSerializer
+    change_scope = PRICES
     permission_classes = [permissions.IsAuthenticated]
     lookup_field = 'id'
 
@@ -639,24 +989,180 @@ class PriceDetailView(generics.RetrieveUpdateDestroyAPIView):
             return Price.objects.filter(managed_by=user)
         return Price.objects.none()
 
+    def destroy(self, request, *args, **kwargs):
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except RestrictedError:
+            return Response({"detail": "This price is used by work entries and cannot be deleted."}, status=409)
 
-class ClientProjectListCreateView(generics.ListCreateAPIView):
-    """API endpoint for listing and creating client projects."""
+
+class ClientProjectListCreateView(ConditionalGetMixin, ValuesListMixin, generics.ListCreateAPIView):
+    """
+    API endpoint for listing and creating client projects. Lists active
+    projects unless ?status=archived or ?status=all is given.
+    """
     serializer_class = ClientProjectSerializer
+    values_serializer_class = ClientProjectValuesSerializer
+    change_scope = PROJECTS
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
         user = self.request.user
         if user.role == 'super_admin':
-            return ClientProject.objects.all()
-        if user.role == 'admin':
-            return ClientProject.objects.filter(managed_by=user)
-        return ClientProject.objects.none()
+            queryset = ClientProject.objects.all()
+        elif user.role == 'admin':
+            queryset = ClientProject.objects.filter(managed_by=user)
+        else:
+            return ClientProject.objects.none()
+
+        if self.request.method != 'GET':
+            return queryset
+        status = self.request.query_params.get('status', 'active')
+        if status == 'all':
+            return queryset
+        if status not in dict(ClientProject.STATUS_CHOICES):
+            raise ValidationError({'status': "Must be 'active', 'archived' or 'all'."})
+        return queryset.filter(status=status)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user, managed_by=self.request.user)
 
 
+class SyncView(generics.GenericAPIView):
+    """
+    API endpoint for delta sync of work entries, prices and projects.
+
+    Without ?since= it returns a full snapshot and a sync token. With
+    ?since=<token> it returns only the rows changed and the ids deleted
+    since that token, plus the next token; 'has_more' asks the client to
+    call again straight away.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        params = SyncQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        since = params.validated_data.get('since')
+        context = self.get_serializer_context()
+        if since is None:
+            return Response(build_snapshot(request.user, context))
+        return Response(build_delta(request.user, since, context, params.validated_data['limit']))
+
+
+class BatchView(generics.GenericAPIView):
+    """
+    API endpoint that runs an ordered list of API sub-requests in one call.
+
+    The batch request is authenticated once; each operation is dispatched to
+    its regular DRF view as the same user. Results are returned per operation
+    as {"status", "headers", "body"}. With "atomic": true all operations run in
+    one transaction, the batch stops at the first failed operation and every
+    change is rolled back.
+
+    An Idempotency-Key header applies to the whole batch: a retried batch
+    gets the first response back and runs none of its operations again.
+    """
+    serializer_class = BatchSerializer
+    throttle_scope = 'batch'
+    permission_classes = [permissions.IsAuthenticated]
+
+    # Response headers worth passing back to the client per operation.
+    forwarded_headers = ('ETag', 'Last-Modified', 'Location')
+
+    def post(self, request, *args, **kwargs):
+        return idempotent_response(request, lambda: self.run_batch(request))
+
+    def run_batch(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data['operations']
+
+        if not serializer.validated_data['atomic']:
+            results = [self.run_operation(request, operation) for operation in operations]
+            return Response({'atomic': False, 'committed': True, 'results': results})
+
+        results = []
+        with transaction.atomic():
+            for operation in operations:
+                result = self.run_operation(request, operation)
+                results.append(result)
+                if result['status'] >= 400:
+                    transaction.set_rollback(True)
+                    break
+
+        committed = len(results) == len(operations) and results[-1]['status'] < 400
+        skipped = {
+            'status': 424, 'headers': {},
+            'body': {'detail': "Not run because an earlier operation failed."},
+        }
+        results += [skipped] * (len(operations) - len(results))
+        return Response({'atomic': True, 'committed': committed, 'results': results})
+
+    def run_operation(self, request, operation):
+        """Dispatches one operation to its view and returns its result."""
+        url = urlsplit(operation['path'])
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            return {'status': 404, 'headers': {}, 'body': {'detail': "Not found."}}
+        if getattr(match.func, 'view_class', None) is type(self):
+            return {'status': 400, 'headers': {}, 'body': {'detail': "Batches cannot be nested."}}
+        if getattr(match.func, 'cls', None) is None:
+            return {'status': 400, 'headers': {},
+                    'body': {'detail': "Only JSON API endpoints can be batched."}}
+
+        subrequest = self.build_subrequest(request, operation['method'], url, operation.get('body'))
+        try:
+            # A savepoint, so a failed operation leaves an enclosing
+            # transaction (atomic or idempotent batches) usable.
+            with transaction.atomic():
+                response = match.func(subrequest, *match.args, **match.kwargs)
+        except Exception:
+            # One failing operation must not take the others' results with it.
+            logger.exception("Batch operation %s %s failed", operation['method'], url.path)
+            return {'status': 500, 'headers': {}, 'body': {'detail': "A server error occurred."}}
+
+        if not hasattr(response, 'data'):
+            return {'status': 400, 'headers': {},
+                    'body': {'detail': "Only JSON API endpoints can be batched."}}
+        headers = {name: response[name] for name in self.forwarded_headers if response.has_header(name)}
+        return {'status': response.status_code, 'headers': headers, 'body': response.data}
+
+    def build_subrequest(self, request, method, url, body):
+        """
+        Builds a request for one operation that shares the batch request's
+        headers and already-authenticated user, so sub-requests skip
+        re-authentication and CSRF checks. They are marked ``batched`` so the
+        general user/anon throttles, already charged for the batch, skip them.
+        """
+        payload = b'' if body is None else json.dumps(body).encode()
+        # Conditional headers and an Idempotency-Key apply to the batch itself
+        # (see post()), not to each operation.
+        environ = {
+            key: value for key, value in request.META.items()
+            if not key.startswith(('HTTP_IF_', 'HTTP_IDEMPOTENCY_KEY', 'wsgi.', 'CONTENT_'))
+        }
+        environ.update({
+            'REQUEST_METHOD': method,
+            'PATH_INFO': url.path,
+            'SCRIPT_NAME': '',
+            'QUERY_STRING': url.query,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(payload)),
+            'wsgi.input': io.BytesIO(payload),
+            'wsgi.url_scheme': request.scheme,
+        })
+        subrequest = WSGIRequest(environ)
+        subrequest.user = request.user
+        subrequest._force_auth_user = request.user
+        subrequest._force_auth_token = request.auth
+        subrequest._dont_enforce_csrf_checks = True
+        subrequest.batched = True
+        if hasattr(request._request, 'session'):
+            subrequest.session = request._request.session
+        return subrequest
+
+
 class CustomLoginView(LoginView):
     """Custom login view using a template."""
     template_name = 'login.html'
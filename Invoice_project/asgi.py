@@ -3,6 +3,9 @@ ASGI config for Invoice_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Live dashboard updates (api/async/dashboard/stream/) need ASGI, and a single
+worker process: new entries are broadcast in memory (Invoice/live.py).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
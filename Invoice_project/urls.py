@@ -16,20 +16,20 @@ Root URL Configuration for Invoice_project.
 This file routes top-level URLs to the appropriate applications.
 - '/admin/'   -> Django admin site.
 - '/api/'     -> All API endpoints, handled by 'Invoice.api_urls'.
+- '/media/'   -> Uploaded files, served to authorised users only.
 - '/'         -> All web pages, handled by 'Invoice.urls'.
 """
 
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from Invoice.media_views import media_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('Invoice.api_urls')),
+    # Media is always served through an access check, in development too.
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:name>", media_view, name='media'),
     path('', include('Invoice.urls')),
-]
-
-# Serves media files during development (when DEBUG is True).
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+]
\ No newline at end of file